@@ -3,6 +3,12 @@ import ipaddress
 from concurrent.futures import ThreadPoolExecutor
 import platform
 import socket
+import asyncio
+import struct
+import sys
+
+# Default UDP ports where PX4 / companion computers speak MAVLink
+MAVLINK_UDP_PORTS = [14540, 14445, 14550]
 
 
 def ping_ip(ip):
@@ -63,12 +69,156 @@ def scan_network(network='192.168.1.0/24', ports=None):
     return results
 
 
+def _x25_crc(data, crc=0xFFFF):
+    """MAVLink CRC-16/MCRF4XX (X.25) checksum."""
+    for byte in data:
+        tmp = byte ^ (crc & 0xFF)
+        tmp = (tmp ^ (tmp << 4)) & 0xFF
+        crc = ((crc >> 8) ^ (tmp << 8) ^ (tmp << 3) ^ (tmp >> 4)) & 0xFFFF
+    return crc
+
+
+def mavlink_heartbeat(seq=0, sysid=255, compid=190):
+    """Build a MAVLink v1 HEARTBEAT packet as sent by a ground station."""
+    # custom_mode, type=GCS(6), autopilot=INVALID(8), base_mode, system_status, mavlink_version=3
+    payload = struct.pack('<IBBBBB', 0, 6, 8, 0, 0, 3)
+    header = struct.pack('<BBBBB', len(payload), seq & 0xFF, sysid, compid, 0)
+    crc = _x25_crc(header + payload + bytes([50]))  # HEARTBEAT CRC_EXTRA is 50
+    return b'\xfe' + header + payload + struct.pack('<H', crc)
+
+
+def parse_mavlink_heartbeat(data):
+    """Return (sysid, compid) if data starts with a MAVLink v1/v2 HEARTBEAT, else None."""
+    if len(data) >= 6 and data[0] == 0xFE and data[5] == 0:
+        return data[3], data[4]
+    if len(data) >= 10 and data[0] == 0xFD and data[7:10] == b'\x00\x00\x00':
+        return data[5], data[6]
+    return None
+
+
+async def probe_tcp(ip, port, timeout=0.5):
+    """Return True if a TCP connection to ip:port succeeds within timeout."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(str(ip), port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+class _MavlinkProbe(asyncio.DatagramProtocol):
+    def __init__(self, reply):
+        self.reply = reply
+
+    def datagram_received(self, data, addr):
+        info = parse_mavlink_heartbeat(data)
+        if info is not None and not self.reply.done():
+            self.reply.set_result(info)
+
+    def error_received(self, exc):
+        # ICMP port unreachable: nothing is listening
+        if not self.reply.done():
+            self.reply.set_result(None)
+
+
+async def probe_mavlink_udp(ip, port, timeout=1.0):
+    """
+    Send a GCS heartbeat to ip:port over UDP and wait for a MAVLink heartbeat back.
+
+    Returns (sysid, compid) of the responding vehicle, or None.
+    """
+    loop = asyncio.get_running_loop()
+    reply = loop.create_future()
+    try:
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _MavlinkProbe(reply), remote_addr=(str(ip), port))
+    except OSError:
+        return None
+    try:
+        transport.sendto(mavlink_heartbeat())
+        return await asyncio.wait_for(reply, timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        transport.close()
+
+
+async def discover(network='192.168.1.0/24', ports=None, udp_ports=None,
+                   concurrency=512, timeout=0.5, udp_timeout=1.0):
+    """
+    Probe every host/port of a network concurrently and yield results as they arrive.
+
+    Yields tuples (ip, 'tcp', port, None) for open TCP ports and
+    (ip, 'mavlink', port, (sysid, compid)) for MAVLink heartbeats over UDP.
+    At most `concurrency` probes are in flight at once.
+    """
+    if ports is None:
+        ports = [21, 22, 23, 25, 53, 80, 443, 445, 3306, 3389, 8080]
+    if udp_ports is None:
+        udp_ports = MAVLINK_UDP_PORTS
+    hosts = list(ipaddress.ip_network(network, strict=False).hosts())
+    limit = asyncio.Semaphore(concurrency)
+    results = asyncio.Queue()
+
+    async def run_probe(ip, proto, port):
+        async with limit:
+            if proto == 'tcp':
+                found, info = await probe_tcp(ip, port, timeout), None
+            else:
+                info = await probe_mavlink_udp(ip, port, udp_timeout)
+                found = info is not None
+        if found:
+            await results.put((str(ip), proto, port, info))
+
+    probes = [(ip, 'tcp', port) for ip in hosts for port in ports]
+    probes += [(ip, 'mavlink', port) for ip in hosts for port in udp_ports]
+    tasks = [asyncio.create_task(run_probe(*probe)) for probe in probes]
+    done = asyncio.gather(*tasks)
+    try:
+        while not (done.done() and results.empty()):
+            getter = asyncio.ensure_future(results.get())
+            await asyncio.wait([getter, done], return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def scan_network_async(network='192.168.1.0/24', ports=None, udp_ports=None, **kwargs):
+    """Async counterpart of scan_network: print results as they arrive and return them."""
+    results = {}
+    async for ip, proto, port, info in discover(network, ports, udp_ports, **kwargs):
+        if proto == 'tcp':
+            print(f"{ip} - {port}/tcp open")
+        else:
+            print(f"{ip} - {port}/udp MAVLink heartbeat (sysid={info[0]}, compid={info[1]})")
+        results.setdefault(ip, []).append((port, proto))
+    return results
+
+
 if __name__ == "__main__":
     # You can customize the ports to scan
     ports_to_scan = [21, 22, 23, 25, 53, 80,554, 443, 445, 3306, 3389, 8080, 8443]
 
-    print("Scanning network 192.168.1.0/24...")
-    scan_results = scan_network(ports=ports_to_scan)
+    # Usage: python IP_port_scan.py [network] [--async]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    network_to_scan = args[0] if args else '192.168.1.0/24'
+
+    if '--async' in sys.argv:
+        print(f"Probing {network_to_scan} (TCP + MAVLink UDP {MAVLINK_UDP_PORTS}) concurrently...")
+        asyncio.run(scan_network_async(network_to_scan, ports_to_scan))
+        sys.exit(0)
+
+    print(f"Scanning network {network_to_scan}...")
+    scan_results = scan_network(network_to_scan, ports=ports_to_scan)
 
     if scan_results:
         print("\nResults:")
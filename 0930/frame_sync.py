@@ -0,0 +1,197 @@
+import os
+import sys
+import time
+
+
+class FrameSync:
+    """
+    串口图像帧同步器：在预分配缓冲区中用 bytes.find 批量查找帧头/帧尾，
+    完整帧以 memoryview 的形式交给使用者，不做逐字节 Python 循环，也不复制数据
+
+    参数:
+        on_frame: 回调函数 on_frame(payload)，payload 为帧数据（不含帧头帧尾）的 memoryview。
+                  该 memoryview 只在回调期间有效，需要保留数据时请自行 bytes(payload)
+        header: 帧头
+        footer: 帧尾
+        frame_size: 已知帧数据长度时按长度取帧并校验帧尾（图像数据中出现 FE 01 也不会截断），
+                    为 None 时以遇到的第一个帧尾为准
+        capacity: 缓冲区大小（字节），需大于最大帧长
+        hex_dump: 是否打印16进制数据（限频，仅打印每个周期内收到的第一段数据）
+        hex_interval: 16进制打印的最小间隔(秒)
+        hex_bytes: 每次打印的最大字节数
+    """
+
+    def __init__(self, on_frame, header=b'\xFE\x01', footer=b'\xFE\x01', frame_size=None,
+                 capacity=1 << 20, hex_dump=False, hex_interval=1.0, hex_bytes=64):
+        self.on_frame = on_frame
+        self.header = bytes(header)
+        self.footer = bytes(footer)
+        self.frame_size = frame_size
+        self.capacity = capacity
+        if frame_size is not None and frame_size + len(header) + len(footer) > capacity:
+            raise ValueError(f"缓冲区 {capacity} 字节小于一帧所需长度")
+        self.hex_dump = hex_dump
+        self.hex_interval = hex_interval
+        self.hex_bytes = hex_bytes
+
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0       # 尚未丢弃的数据起点（帧头位置或待检查数据）
+        self._scan = 0        # 下一次查找的起点
+        self._end = 0         # 有效数据终点
+        self._payload = -1    # 当前帧数据起点，-1 表示正在找帧头
+        self._last_hex = 0.0
+
+        # 统计
+        self.bytes_in = 0
+        self.frames = 0
+        self.dropped = 0      # 超出缓冲区而丢弃的帧
+        self.resyncs = 0      # 定长模式下帧尾校验失败的次数
+
+    def writable(self, size):
+        """
+        返回可直接写入的缓冲区 memoryview（供 serial.readinto 使用），写入后调用 commit(n)；
+        剩余空间不足 size 时返回的视图会更短，未写完的数据下次再写
+        """
+        size = min(size, self.capacity)
+        if self.capacity - self._end < size:
+            self._compact()
+        if self._end == self.capacity:
+            # 整个缓冲区都是同一个未完成的帧，无处可写，只能丢弃
+            self._drop_partial()
+        return self._view[self._end:self._end + min(size, self.capacity - self._end)]
+
+    def commit(self, n):
+        """提交通过 writable() 写入的 n 个字节并处理"""
+        if n:
+            self._hex(self._view[self._end:self._end + n])
+            self._end += n
+            self.bytes_in += n
+            self._process()
+
+    def feed(self, data):
+        """送入一段数据（会复制一次到内部缓冲区）"""
+        data = memoryview(data)
+        while len(data):
+            target = self.writable(len(data))
+            n = len(target)
+            target[:] = data[:n]
+            self.commit(n)
+            data = data[n:]
+
+    def _compact(self):
+        # 把未处理的数据整体移动到缓冲区开头（memoryview 赋值为 memmove，不经过 Python 对象）
+        n = self._end - self._start
+        if self._start:
+            self._view[:n] = self._view[self._start:self._end]
+            shift = self._start
+            self._start = 0
+            self._end = n
+            self._scan -= shift
+            if self._payload >= 0:
+                self._payload -= shift
+
+    def _drop_partial(self):
+        # 单帧已超过缓冲区容量：丢弃当前未完成的帧，从头重新同步
+        if self._payload >= 0:
+            self.dropped += 1
+        self._start = self._scan = self._end = 0
+        self._payload = -1
+
+    def _hex(self, chunk):
+        if not self.hex_dump:
+            return
+        now = time.monotonic()
+        if now - self._last_hex >= self.hex_interval:
+            self._last_hex = now
+            print(bytes(chunk[:self.hex_bytes]).hex(' ').upper())
+
+    def _process(self):
+        buf = self._buf
+        hlen, flen = len(self.header), len(self.footer)
+        while True:
+            if self._payload < 0:
+                i = buf.find(self.header, self._scan, self._end)
+                if i < 0:
+                    # 保留末尾可能是半个帧头的字节
+                    self._start = self._scan = max(self._start, self._end - hlen + 1)
+                    return
+                self._start = i
+                self._payload = self._scan = i + hlen
+                continue
+
+            if self.frame_size is not None:
+                j = self._payload + self.frame_size
+                if self._end < j + flen:
+                    return
+                if buf[j:j + flen] != self.footer:
+                    # 帧尾不在预期位置：从帧头后一个字节重新找帧头
+                    self.resyncs += 1
+                    self._scan = self._start + 1
+                    self._payload = -1
+                    continue
+            else:
+                j = buf.find(self.footer, self._scan, self._end)
+                if j < 0:
+                    self._scan = max(self._payload, self._end - flen + 1)
+                    return
+
+            self.frames += 1
+            self.on_frame(self._view[self._payload:j])
+            self._start = self._scan = j + flen
+            self._payload = -1
+
+    def stats(self):
+        return {
+            'bytes_in': self.bytes_in,
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'resyncs': self.resyncs,
+        }
+
+
+def synthetic_stream(frame_size=320 * 240 * 3, frames=20, gap=16, header=b'\xFE\x01', footer=b'\xFE\x01'):
+    """生成测试用字节流：帧间夹杂噪声，帧数据中不含 0xFE 以免与帧头帧尾冲突"""
+    payload = os.urandom(frame_size).replace(b'\xFE', b'\xFD')
+    noise = os.urandom(gap).replace(b'\xFE', b'\xFD')
+    return (noise + header + payload + footer) * frames
+
+
+def benchmark(total_mb=64, frame_size=320 * 240 * 3, chunk=4096, fixed_size=False):
+    """
+    吞吐量测试：把合成字节流按 chunk 大小分块送入 FrameSync，返回 MB/s
+
+    参数:
+        total_mb: 大约送入的数据量(MB)
+        frame_size: 每帧数据长度
+        chunk: 每次送入的字节数（模拟串口每次 read 的长度）
+        fixed_size: 是否使用定长模式
+    """
+    one = synthetic_stream(frame_size, 1)
+    repeats = max(1, int(total_mb * 1e6 // len(one)))
+    stream = memoryview(one * repeats)
+    received = []
+    sync = FrameSync(lambda payload: received.append(len(payload)),
+                     frame_size=frame_size if fixed_size else None,
+                     capacity=max(1 << 20, 2 * frame_size))
+    t0 = time.perf_counter()
+    for i in range(0, len(stream), chunk):
+        sync.feed(stream[i:i + chunk])
+    elapsed = time.perf_counter() - t0
+    assert sync.frames == repeats and all(n == frame_size for n in received)
+    return {
+        'bytes': len(stream),
+        'frames': sync.frames,
+        'seconds': elapsed,
+        'mb_per_s': len(stream) / elapsed / 1e6,
+    }
+
+
+if __name__ == "__main__":
+    # 用法: python frame_sync.py [每次送入字节数]
+    chunk = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    for fixed in (False, True):
+        r = benchmark(chunk=chunk, fixed_size=fixed)
+        mode = "定长模式" if fixed else "帧尾查找模式"
+        print(f"{mode}: {r['bytes'] / 1e6:.1f} MB, {r['frames']} 帧, "
+              f"{r['seconds']:.3f} s, {r['mb_per_s']:.1f} MB/s (chunk={chunk})")
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+
+def frame_to_image(data, width=320, height=240, format='RGB'):
+    """
+    把原始图像数据转换为 PIL 图像；数据不足时按原逻辑缩小尺寸
+
+    参数:
+        data: 原始图像数据（bytes / memoryview）
+        width: 图像宽度
+        height: 图像高度
+        format: 'RGB' 或 'L'(灰度图)
+    """
+    from PIL import Image
+
+    if format == 'RGB':
+        channels = 3
+    elif format == 'L':
+        channels = 1
+    else:
+        raise ValueError(f"不支持的图像格式: {format}")
+
+    if len(data) < width * height * channels:
+        print(f"警告: 数据大小 ({len(data)}) 小于预期 ({width * height * channels})")
+        # 裁剪尺寸以适应数据
+        while len(data) < width * height * channels:
+            if width > height:
+                width -= 1
+            else:
+                height -= 1
+
+    img_array = np.frombuffer(data, dtype=np.uint8)[:width * height * channels]
+    if format == 'RGB':
+        return Image.fromarray(img_array.reshape((height, width, 3)))
+    return Image.fromarray(img_array.reshape((height, width)), mode='L')
+
+
+def encode_frame(data, filename, width, height, format, mode, compress_level):
+    """
+    工作线程/进程中执行的编码与写盘，返回 (文件名, 编码耗时秒)
+
+    mode:
+        'png': PNG，压缩级别 compress_level（0-9，越小越快、文件越大）
+        'raw': 原始字节直接写盘（文件名带尺寸和格式），事后再转换
+    """
+    t0 = time.perf_counter()
+    if mode == 'raw':
+        with open(filename, 'wb') as f:
+            f.write(data)
+    else:
+        frame_to_image(data, width, height, format).save(filename, compress_level=compress_level)
+    return filename, time.perf_counter() - t0
+
+
+class ImageWriterPool:
+    """
+    后台图像编码池：串口读取线程只负责提交帧数据，PNG 编码和写盘在工作线程/进程中完成
+
+    队列满时直接丢弃新帧并计数（不阻塞读取），保证串口缓冲区不会溢出
+
+    参数:
+        width, height, format: 图像参数
+        mode: 'png' 或 'raw'
+        compress_level: PNG 压缩级别，默认 1（低压缩，编码快）
+        workers: 工作线程/进程数
+        max_pending: 最多排队+编码中的帧数，超过则丢帧
+        use_processes: True 使用进程池（绕开 GIL），False 使用线程池
+        out_dir: 保存目录
+    """
+
+    def __init__(self, width=320, height=240, format='RGB', mode='png', compress_level=1,
+                 workers=2, max_pending=8, use_processes=False, out_dir='captured_images'):
+        if mode not in ('png', 'raw'):
+            raise ValueError(f"不支持的保存模式: {mode}")
+        self.width = width
+        self.height = height
+        self.format = format
+        self.mode = mode
+        self.compress_level = compress_level
+        self.max_pending = max_pending
+        self.out_dir = out_dir
+        if not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_cls(max_workers=workers)
+        self._lock = threading.Lock()
+        self._seq = 0
+
+        # 统计
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.encode_total = 0.0
+        self.encode_max = 0.0
+        self.latency_total = 0.0   # 提交到写盘完成
+        self.latency_max = 0.0
+
+    def _filename(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self._seq += 1
+        if self.mode == 'raw':
+            return os.path.join(self.out_dir, f"image_{timestamp}_{self._seq}_{self.width}x{self.height}_{self.format}.raw")
+        return os.path.join(self.out_dir, f"image_{timestamp}_{self._seq}.png")
+
+    def submit(self, data):
+        """
+        提交一帧（会复制数据，调用方的缓冲区可立即复用），返回是否被接受
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self.pending += 1
+            self.submitted += 1
+            self.max_pending_seen = max(self.max_pending_seen, self.pending)
+        filename = self._filename()
+        submit_time = time.perf_counter()
+        future = self._executor.submit(encode_frame, bytes(data), filename, self.width, self.height,
+                                       self.format, self.mode, self.compress_level)
+        future.add_done_callback(lambda f: self._done(f, submit_time))
+        return True
+
+    def _done(self, future, submit_time):
+        latency = time.perf_counter() - submit_time
+        with self._lock:
+            self.pending -= 1
+            try:
+                _, encode_time = future.result()
+            except Exception as e:
+                self.failed += 1
+                print(f"保存图像时出错: {e}")
+                return
+            self.written += 1
+            self.encode_total += encode_time
+            self.encode_max = max(self.encode_max, encode_time)
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def stats(self):
+        with self._lock:
+            done = self.written or 1
+            return {
+                'submitted': self.submitted,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'queued': self.pending,
+                'max_queued': self.max_pending_seen,
+                'encode_avg_ms': self.encode_total / done * 1000,
+                'encode_max_ms': self.encode_max * 1000,
+                'latency_avg_ms': self.latency_total / done * 1000,
+                'latency_max_ms': self.latency_max * 1000,
+            }
+
+    def close(self, wait=True):
+        """停止接收新帧，默认等待排队中的帧全部写完"""
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
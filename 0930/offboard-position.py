@@ -1,7 +1,14 @@
 import asyncio
+import os
+import sys
 from mavsdk import System
 from mavsdk.offboard import (OffboardError,PositionNedYaw,VelocityNedYaw,VelocityBodyYawspeed,AttitudeRate)
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from offboard_stream import OffboardStreamer, ainput
+
+SETPOINT_RATE_HZ = 50  # offboard 设定点发送频率(Hz)，PX4 在设定点中断约0.5s后会退出offboard
+
 
 #END坐标，高度为-数，以下程序做了修改，正常数输入即可
 
@@ -35,24 +42,26 @@ async def move_right(drone):
     async for heading in drone.telemetry.attitude_euler():
         print(heading.yaw_deg)
         break
-    await drone.offboard.set_position_ned(PositionNedYaw(0.0, 0.0, 0.0, heading.yaw_deg)) 
+    # 设定点由后台任务按固定频率持续发送，下面只更新目标值
+    streamer = OffboardStreamer(drone, SETPOINT_RATE_HZ)
+    streamer.slot.set(PositionNedYaw(0.0, 0.0, 0.0, heading.yaw_deg))
     if i==1:
         print("-- Arm")
         await drone.action.arm()
 
         x=-x
-        await drone.offboard.set_position_ned(PositionNedYaw(0.0, 0.0, x, heading.yaw_deg))
+        streamer.slot.set(PositionNedYaw(0.0, 0.0, x, heading.yaw_deg))
         
         
     print("-- Starting offboard")
     try:
-        await drone.offboard.start()
+        await streamer.start()
     except OffboardError as error:
         print(f"切换 offboard mode 失败，错误代码: \
             {error._result.result}")
         print("-- Disarming")
         await drone.action.disarm()
-        return
+        return None
 
         
 
@@ -60,7 +69,8 @@ async def move_right(drone):
 
     while True:
         
-        input_str = input("输入北东地（地坐标已转换正数）控制模式下X轴,Y轴,z轴对应,航向角/油门0-1行程(注意：共4个参数，高度为相对高度，输入负数意味着低于起飞高度，行程为百分比，0-1为百分之0-百分之100)   空格隔开\n ")
+        # 在线程中等待键盘输入，期间设定点照常发送
+        input_str = await ainput("输入北东地（地坐标已转换正数）控制模式下X轴,Y轴,z轴对应,航向角/油门0-1行程(注意：共4个参数，高度为相对高度，输入负数意味着低于起飞高度，行程为百分比，0-1为百分之0-百分之100)   空格隔开\n ")
         try:
             var1, var2, var3, var4 = map(float, input_str.split())
             if var3>0:
@@ -74,7 +84,7 @@ async def move_right(drone):
         if var1 != 0 or var2 != 0 or var33 != 0 or var4 != 0 :
                 print(var1,var2,var3,var4)
                 print("-- 执行")
-                await drone.offboard.set_position_ned(PositionNedYaw(var1, var2, var33, var4))  
+                streamer.slot.set(PositionNedYaw(var1, var2, var33, var4))  
                 #END坐标下航点及航向
                 #await drone.offboard.set_velocity_body(VelocityBodyYawspeed(var1, var2, var33, var4))
                 #await asyncio.sleep(5)
@@ -86,10 +96,13 @@ async def move_right(drone):
                 #END坐标设置姿态角度及油门杆量
 
             
-        input_str = input("输入 回车继续，'q' 退出: ")
+        input_str = await ainput("输入 回车继续，'q' 退出: ")
         if input_str == 'q':
             break
 
+    print(streamer.summary())
+    return streamer
+
 
 
 
@@ -116,7 +129,7 @@ async def run():
     
 
 
-    await move_right(drone)
+    streamer = await move_right(drone)
 
 
 
@@ -125,7 +138,10 @@ async def run():
 
     print("-- Stopping offboard")
     try:
-        await drone.offboard.stop()
+        if streamer is not None:
+            await streamer.stop()
+        else:
+            await drone.offboard.stop()
     except OffboardError as error:
         print(f"Stopping offboard mode failed with error code: \
               {error._result.result}")
@@ -1,9 +1,8 @@
 import serial
-import time
-import numpy as np
-from PIL import Image
 import os
 from datetime import datetime
+from frame_sync import FrameSync
+from image_writer import ImageWriterPool, frame_to_image
 
 
 def save_image_data(data, width=320, height=240, format='RGB'):
@@ -17,42 +16,7 @@ def save_image_data(data, width=320, height=240, format='RGB'):
         format: 图像格式，例如'RGB'或'L'(灰度图)
     """
     try:
-        if format == 'RGB':
-            # 如果是RGB格式，每个像素3字节
-            if len(data) < width * height * 3:
-                print(f"警告: 数据大小 ({len(data)}) 小于预期 ({width * height * 3})")
-                # 裁剪尺寸以适应数据
-                while len(data) < width * height * 3:
-                    if width > height:
-                        width -= 1
-                    else:
-                        height -= 1
-
-            # 将原始数据转换为NumPy数组，然后重塑为图像尺寸
-            img_array = np.frombuffer(data, dtype=np.uint8)
-            img_array = img_array[:width * height * 3].reshape((height, width, 3))
-
-            # 创建PIL图像
-            img = Image.fromarray(img_array)
-
-        elif format == 'L':
-            # 如果是灰度图，每个像素1字节
-            if len(data) < width * height:
-                print(f"警告: 数据大小 ({len(data)}) 小于预期 ({width * height})")
-                # 裁剪尺寸以适应数据
-                while len(data) < width * height:
-                    if width > height:
-                        width -= 1
-                    else:
-                        height -= 1
-
-            img_array = np.frombuffer(data, dtype=np.uint8)
-            img_array = img_array[:width * height].reshape((height, width))
-
-            img = Image.fromarray(img_array, mode='L')
-
-        else:
-            raise ValueError(f"不支持的图像格式: {format}")
+        img = frame_to_image(data, width, height, format)
 
         # 创建保存目录
         if not os.path.exists('captured_images'):
@@ -73,9 +37,11 @@ def save_image_data(data, width=320, height=240, format='RGB'):
 
 
 def monitor_serial_and_save_images(port, baudrate=115200, timeout=1,
-                                   width=320, height=240, format='RGB'):
+                                   width=320, height=240, format='RGB',
+                                   hex_dump=False, fixed_size=False,
+                                   save_mode='png', compress_level=1, workers=2):
     """
-    监控串口，打印16进制数据，并保存检测到的图像
+    监控串口，检测帧头帧尾并保存图像
 
     参数:
         port: 串口名称
@@ -84,6 +50,11 @@ def monitor_serial_and_save_images(port, baudrate=115200, timeout=1,
         width: 图像宽度
         height: 图像高度
         format: 图像格式
+        hex_dump: 是否打印16进制数据（每秒最多打印一次，避免拖慢接收）
+        fixed_size: 按 width*height 计算的固定帧长取帧（图像数据中含 FE 01 时使用）
+        save_mode: 'png' 或 'raw'（原始字节直接写盘，最快）
+        compress_level: PNG 压缩级别 0-9，越小编码越快
+        workers: 后台编码线程数
     """
     try:
         # 打开串口，设置停止位1，数据位8，校验位None
@@ -102,86 +73,41 @@ def monitor_serial_and_save_images(port, baudrate=115200, timeout=1,
         print("正在监听串口数据，按Ctrl+C停止...")
 
         # 帧头和帧尾
-        frame_header = [0xFE, 0x01]
-        frame_footer = [0xFE, 0x01]  # 假设帧尾也是FE 01，如需更改请修改这里
-
-        buffer = bytearray()
-        in_frame = False
-        header_index = 0
-        footer_index = 0
-        byte_count = 0
+        frame_header = b'\xFE\x01'
+        frame_footer = b'\xFE\x01'  # 假设帧尾也是FE 01，如需更改请修改这里
+        frame_size = width * height * (3 if format == 'RGB' else 1)
+
+        def on_frame(image_data):
+            # 检查数据是否非空
+            if len(image_data):
+                print(f"接收到图像数据: {len(image_data)} 字节")
+                # 提交到后台编码池保存，不阻塞串口读取；队列满时丢帧
+                if not writer.submit(image_data):
+                    print("编码队列已满，丢弃该帧")
+            else:
+                print("接收到空图像数据")
+
+        writer = ImageWriterPool(width, height, format, mode=save_mode,
+                                 compress_level=compress_level, workers=workers)
+        sync = FrameSync(on_frame, frame_header, frame_footer,
+                         frame_size=frame_size if fixed_size else None,
+                         capacity=max(1 << 20, 2 * frame_size), hex_dump=hex_dump)
 
         while True:
-            # 读取数据
-            data = ser.read(ser.in_waiting or 1)
-            if not data:
-                continue
-
-            # 处理接收到的数据
-            for byte in data:
-                # 打印16进制数据
-                hex_str = f"{byte:02X}"
-                print(hex_str, end=" ")
-                byte_count += 1
-                if byte_count % 16 == 0:  # 每16个字节换行
-                    print()
-
-                buffer.append(byte)
-
-                # 检查帧头
-                if not in_frame:
-                    if byte == frame_header[header_index]:
-                        header_index += 1
-                        if header_index == len(frame_header):
-                            print("\n检测到帧头: FE 01")
-                            in_frame = True
-                            # 保留帧头
-                            buffer = buffer[-len(frame_header):]
-                            header_index = 0
-                    else:
-                        header_index = 0
-                        # 如果第一个字节是0xFE，但第二个不是0x01，重新检查
-                        if byte == frame_header[0]:
-                            header_index = 1
-                        # 清空无用数据
-                        buffer = buffer[-1:] if header_index > 0 else bytearray()
-
-                # 检查帧尾
-                elif in_frame:
-                    if byte == frame_footer[footer_index]:
-                        footer_index += 1
-                        if footer_index == len(frame_footer):
-                            print("\n检测到帧尾: FE 01")
-                            in_frame = False
-                            footer_index = 0
-
-                            # 提取图像数据 (移除帧头和帧尾)
-                            image_data = buffer[len(frame_header):-len(frame_footer)]
-
-                            # 检查数据是否非空
-                            if image_data:
-                                print(f"接收到图像数据: {len(image_data)} 字节")
-                                # 保存图像
-                                save_image_data(image_data, width, height, format)
-                            else:
-                                print("接收到空图像数据")
-
-                            # 清空缓冲区
-                            buffer.clear()
-                    else:
-                        footer_index = 0
-                        # 如果第一个字节是0xFE，但第二个不是0x01，重新检查
-                        if byte == frame_footer[0]:
-                            footer_index = 1
-
-            # 短暂延时，以降低CPU占用
-            time.sleep(0.01)
+            # 批量读入帧同步缓冲区；无数据时按 timeout 阻塞等待，不再逐字节处理和 sleep
+            target = sync.writable(ser.in_waiting or 1)
+            sync.commit(ser.readinto(target))
 
     except KeyboardInterrupt:
         print("\n程序已停止")
     except Exception as e:
         print(f"\n发生错误: {e}")
     finally:
+        if 'sync' in locals():
+            print(f"统计: {sync.stats()}")
+        if 'writer' in locals():
+            writer.close()
+            print(f"图像保存统计: {writer.stats()}")
         if 'ser' in locals() and ser.is_open:
             ser.close()
             print("串口已关闭")
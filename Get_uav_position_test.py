@@ -2,38 +2,37 @@ import asyncio
 import time
 import os
 from datetime import datetime
-from mavsdk import System
+from sim_system import System
+from preflight import bring_up, default_checks
+from rate_profile import RateProfile
 from mavsdk.offboard import PositionNedYaw
+from telemetry_logger import TelemetryLogger, export_position_csv
+from metrics import Metrics
+
+POSITION_RATE_HZ = 20  # 请求的位置流频率(Hz)
+PRINT_INTERVAL = 0.5   # 控制台打印坐标的最小间隔(秒)，只限制输出量，每条位置都记录
 
 # 初始化连接函数 - 只运行一次
 async def initialize_drone():
     drone = System(mavsdk_server_address='localhost', port=50051) #仿真需要注释，真机解开注释
     print("等待连接...")
     await drone.connect(system_address="udp://:14540")
-   
-    async for state in drone.core.connection_state():
-        if state.is_connected:
-            print(f"-- 连接成功!")
-            break
 
-    print("GPS定点估算...")
-    async for health in drone.telemetry.health():
-        if health.is_global_position_ok and health.is_home_position_ok:
-            print("-- GPS位置就绪")
-            break
+    # 连接、GPS、电池、GPS信息并发检查，总耗时取决于最慢的一项
+    report = await bring_up(drone, default_checks(drone, info=False), timeout=60.0)
+    if not report.ready:
+        raise RuntimeError(f"就绪检查未通过: {', '.join(report.failed())}")
 
     #电池电压百分比
-    async for bat in drone.telemetry.battery():
-        x4 = bat.voltage_v
-        y4 = bat.remaining_percent
-        print('%.2f'%x4,"V",'%.1f'%y4,"%")
-        break
+    bat = report.value('battery')
+    print('%.2f'%bat.voltage_v,"V",'%.1f'%bat.remaining_percent,"%")
     #GPS状态及卫星数量
-    async for a1 in drone.telemetry.gps_info(): 
-        x5=a1.fix_type
-        y5=a1.num_satellites
-        print("gps：",x5,y5)
-        break
+    a1 = report.value('gps_info')
+    if a1 is not None:
+        print("gps：",a1.fix_type,a1.num_satellites)
+
+    # 请求位置流频率并实测（飞控默认约 2 Hz）
+    await RateProfile(drone, profiles={'record': {'position': POSITION_RATE_HZ}}).set_phase('record')
     
     return drone
 
@@ -46,70 +45,50 @@ async def read_position_continuously(drone):
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
     
-    # 创建日志文件名（包含日期时间）
-    log_filename = os.path.join(log_dir, f"gps_position_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+    # 创建日志文件名（包含日期时间），二进制记录，结束时导出CSV
+    log_filename = os.path.join(log_dir, f"gps_position_{datetime.now().strftime('%Y%m%d_%H%M%S')}.bin")
+    logger = TelemetryLogger(log_filename)
+    # 位置流频率/间隔/处理耗时与写盘耗时，每5秒打印一次
+    metrics = Metrics()
+    metrics.start_printer(5.0)
     
     # 频率统计变量
     read_count = 0
     start_time = time.time()
     last_stats_time = start_time
+    last_print_time = 0.0
     
-    # 数据缓存列表
-    data_buffer = []
-    
-    # 写入TXT文件头
-    with open(log_filename, 'w', encoding='utf-8') as txtfile:
-        txtfile.write("GPS位置数据记录\n")
-        txtfile.write("=" * 80 + "\n")
-        txtfile.write("格式: 时间戳 | 纬度(度) | 经度(度) | 相对高度(米) | GPS高度(米) | 读取次数 | 频率(Hz)\n")
-        txtfile.write("=" * 80 + "\n\n")
-    
-    async for position in drone.telemetry.position():
-        # 获取当前时间戳
-        current_time = datetime.now()
-        timestamp = current_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]  # 精确到毫秒
-        
-        x1 = position.latitude_deg 
-        y1 = position.longitude_deg
-        z1 = position.relative_altitude_m
-        g1 = position.absolute_altitude_m
-        
-        # 更新频率统计
-        read_count += 1
-        current_timestamp = time.time()
-        
-        # 将数据添加到缓存
-        data_buffer.append({
-            'timestamp': timestamp,
-            'latitude': x1,
-            'longitude': y1,
-            'relative_altitude': z1,
-            'gps_altitude': g1,
-            'count': read_count
-        })
-        
-        # 计算频率（每5秒统计一次并写入文件）
-        if current_timestamp - last_stats_time >= 5.0:
-            elapsed_time = current_timestamp - start_time
-            frequency = read_count / elapsed_time if elapsed_time > 0 else 0
-            last_stats_time = current_timestamp
-            
-            print(f"GPS坐标（相对高度与GPS高）{x1}, {y1}, {z1}, {g1} | 读取次数: {read_count} | 频率: {frequency:.2f} Hz")
+    try:
+        async for position in metrics.observe('position', drone.telemetry.position()):
+            x1 = position.latitude_deg 
+            y1 = position.longitude_deg
+            z1 = position.relative_altitude_m
+            g1 = position.absolute_altitude_m
             
-            # 一次性写入缓存中的所有数据到TXT文件
-            with open(log_filename, 'a', encoding='utf-8') as txtfile:
-                txtfile.write(f"\n--- 频率统计时间: {timestamp} | 总读取次数: {read_count} | 当前频率: {frequency:.2f} Hz ---\n")
-                for data in data_buffer:
-                    txtfile.write(f"{data['timestamp']} | {data['latitude']:.7f} | {data['longitude']:.7f} | {data['relative_altitude']:.3f} | {data['gps_altitude']:.3f} | {data['count']} | {frequency:.2f}\n")
-                txtfile.write("\n")
+            # 更新频率统计
+            current_timestamp = time.time()
+            with metrics.time('disk_write'):
+                read_count = logger.append(x1, y1, z1, g1, current_timestamp)
             
-            # 清空缓存
-            data_buffer = []
-        else:
-            print(f"GPS坐标（相对高度与GPS高）{x1}, {y1}, {z1}, {g1}")
-        
-        # 添加短暂延时避免输出过快
-        await asyncio.sleep(0.5)
+            # 计算频率（每5秒统计一次并写盘）
+            if current_timestamp - last_stats_time >= 5.0:
+                elapsed_time = current_timestamp - start_time
+                frequency = read_count / elapsed_time if elapsed_time > 0 else 0
+                last_stats_time = current_timestamp
+                
+                print(f"GPS坐标（相对高度与GPS高）{x1}, {y1}, {z1}, {g1} | 读取次数: {read_count} | 频率: {frequency:.2f} Hz")
+                with metrics.time('disk_flush'):
+                    logger.flush()
+            elif current_timestamp - last_print_time >= PRINT_INTERVAL:
+                # 只限制打印频率，不再每条 sleep（否则记录频率被限制在约 2 Hz）
+                last_print_time = current_timestamp
+                print(f"GPS坐标（相对高度与GPS高）{x1}, {y1}, {z1}, {g1}")
+    finally:
+        await metrics.stop_printer()
+        logger.close()
+        csv_filename = export_position_csv(log_filename, os.path.splitext(log_filename)[0] + ".csv")
+        print(f"日志已导出: {csv_filename}")
+        print(f"指标已导出: {metrics.dump(os.path.splitext(log_filename)[0] + '_metrics.json')}")
 
 # 主运行函数
 async def main():
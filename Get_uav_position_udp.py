@@ -2,44 +2,43 @@ import asyncio
 import time
 import os
 import socket
-import json
-from datetime import datetime
-from mavsdk import System
+from sim_system import System
+from preflight import bring_up, default_checks
+from rate_profile import RateProfile
 from mavsdk.offboard import PositionNedYaw
+from position_packet import PacketEncoder
+from metrics import Metrics
 
 # UDP配置
 UDP_IP = "192.168.137.3"  # 目标IP地址
 UDP_PORT = 12346      # 目标端口
+WIRE_FORMAT = "binary"  # 报文格式: "binary"（紧凑二进制）或 "json"（旧格式）
+BATCH_SIZE = 1          # 每个报文携带的样本数，>1 时减少报文数量但增加延迟
+BATCH_MAX_DELAY = 0.2   # 样本最长等待打包时间(秒)
+VEHICLE_ID = 1          # 飞机编号，多机时区分数据来源
+POSITION_RATE_HZ = 20   # 请求的位置流频率(Hz)
 
 # 初始化连接函数 - 只运行一次
 async def initialize_drone():
     drone = System(mavsdk_server_address='localhost', port=50051) 
     print("等待连接...")
     await drone.connect(system_address="udp://:14540")
-   
-    async for state in drone.core.connection_state():
-        if state.is_connected:
-            print(f"-- 连接成功!")
-            break
 
-    print("GPS定点估算...")
-    async for health in drone.telemetry.health():
-        if health.is_global_position_ok:
-            print("-- GPS位置就绪")
-            break
+    # 连接、GPS、电池、GPS信息并发检查，总耗时取决于最慢的一项
+    report = await bring_up(drone, default_checks(drone, info=False, require_home=False), timeout=60.0)
+    if not report.ready:
+        raise RuntimeError(f"就绪检查未通过: {', '.join(report.failed())}")
 
     #电池电压百分比
-    async for bat in drone.telemetry.battery():
-        x4 = bat.voltage_v
-        y4 = bat.remaining_percent
-        print('%.2f'%x4,"V",'%.1f'%y4,"%")
-        break
+    bat = report.value('battery')
+    print('%.2f'%bat.voltage_v,"V",'%.1f'%bat.remaining_percent,"%")
     #GPS状态及卫星数量
-    async for a1 in drone.telemetry.gps_info(): 
-        x5=a1.fix_type
-        y5=a1.num_satellites
-        print("gps：",x5,y5)
-        break
+    a1 = report.value('gps_info')
+    if a1 is not None:
+        print("gps：",a1.fix_type,a1.num_satellites)
+
+    # 请求位置流频率并实测（飞控默认约 2 Hz）
+    await RateProfile(drone, profiles={'record': {'position': POSITION_RATE_HZ}}).set_phase('record')
     
     return drone
 
@@ -47,29 +46,45 @@ async def initialize_drone():
 async def read_position_continuously(drone):
     # 创建UDP socket
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    
-    async for position in drone.telemetry.position():
-        x1 = position.latitude_deg 
-        y1 = position.longitude_deg
-        z1 = position.absolute_altitude_m  # 使用z1替代g1
-    
-        print(f"{x1}, {y1}, {z1}")
-        
-        # 准备UDP数据
-        position_data = {
-            "x1": x1,
-            "y1": y1, 
-            "z1": z1,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        # 发送UDP数据
+    encoder = PacketEncoder(VEHICLE_ID, BATCH_SIZE, BATCH_MAX_DELAY, WIRE_FORMAT)
+    # 位置流频率/间隔与 UDP 发送耗时，每5秒打印一次
+    metrics = Metrics()
+    metrics.start_printer(5.0)
+
+    def send(messages):
         try:
-            message = json.dumps(position_data)
-            sock.sendto(message.encode('utf-8'), (UDP_IP, UDP_PORT))
-            print(f"UDP发送: {message}")
+            for message in messages:
+                with metrics.time('udp_send'):
+                    sock.sendto(message, (UDP_IP, UDP_PORT))
         except Exception as e:
             print(f"UDP发送错误: {e}")
+
+    # 位置流停顿时不会再调用 encoder.add，定时检查缓存样本是否超过 BATCH_MAX_DELAY
+    async def flush_stale():
+        while True:
+            await asyncio.sleep(BATCH_MAX_DELAY / 2)
+            send(encoder.poll())
+
+    flusher = asyncio.create_task(flush_stale())
+    try:
+        async for position in metrics.observe('position', drone.telemetry.position()):
+            x1 = position.latitude_deg 
+            y1 = position.longitude_deg
+            z1 = position.absolute_altitude_m  # 使用z1替代g1
+        
+            print(f"{x1}, {y1}, {z1}")
+            
+            # 打包并发送UDP数据
+            send(encoder.add(x1, y1, z1))
+    finally:
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
+        # 退出前发出仍在缓存中的样本
+        message = encoder.flush()
+        if message is not None:
+            send([message])
+        await metrics.stop_printer()
+        sock.close()
         
 # 主运行函数
 async def main():
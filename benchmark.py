@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# 热点路径基准测试：全部使用合成数据离线运行，结果保存为 JSON，便于在不同提交之间对比
+#
+# 测试项:
+#   record_*       每个定位点的 格式化+写文件（旧 TXT 逐行 flush / 二进制 TelemetryLogger）
+#   udp_*          每个定位点的 编码+UDP 发送（旧 JSON / position_packet 二进制，回环地址）
+#   ecef_to_enu_*  LocalFrame.ecef_to_enu 批量转换，1e3 - 1e7 点
+#   circle_*       圆形航点生成（circle + generate_waypoints，含偏差报告）
+#   tracking_*     tracking_error.analyze 跟踪误差分析（圆形计划路径，1e5 - 2e6 个轨迹点）
+#   frame_sync_*   uart_test.py 帧解析器吞吐量(MB/s)
+#
+# 用法:
+#   python benchmark.py                      运行全部并保存到 benchmark_results/
+#   python benchmark.py --quick              减小规模（ecef 最大 1e6 点）
+#   python benchmark.py --only udp,ecef      只运行名称包含这些关键字的测试
+#   python benchmark.py --compare 旧结果.json
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from geodesy import LocalFrame, geodetic_to_ecef
+from position_packet import PacketEncoder
+from telemetry_logger import TelemetryLogger
+from tracking_error import PathIndex, analyze, circle_mission_path
+from waypoints import circle, generate_waypoints
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '0930'))
+from frame_sync import benchmark as frame_sync_benchmark  # noqa: E402
+
+RESULT_DIR = "benchmark_results"
+REGRESSION_THRESHOLD = 0.10  # 对比时变差超过 10% 标记为回退
+
+CENTER_LAT = 30.5339964
+CENTER_LON = 104.0011512
+
+
+def measure(fn, repeat=5):
+    """运行 fn() repeat 次，返回每次耗时(秒)列表"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def result(times, count, unit_scale, unit, better='lower', **params):
+    """把耗时换算为每个单位的结果：取最快一次（受干扰最小），同时记录中位数"""
+    best, median = min(times), statistics.median(times)
+    return {
+        'value': best / count * unit_scale,
+        'median': median / count * unit_scale,
+        'unit': unit,
+        'better': better,
+        'params': params,
+    }
+
+
+def synthetic_fixes(n, seed=0):
+    """围绕起飞点的随机游走定位点 (纬度, 经度, 相对高度, GPS高度)"""
+    rng = np.random.default_rng(seed)
+    lat = CENTER_LAT + np.cumsum(rng.normal(0, 1e-6, n))
+    lon = CENTER_LON + np.cumsum(rng.normal(0, 1e-6, n))
+    rel = np.abs(np.cumsum(rng.normal(0, 0.01, n)))
+    return lat.tolist(), lon.tolist(), rel.tolist(), (rel + 486.664).tolist()
+
+
+# ---------------- 记录 ----------------
+def bench_record(n=20000, repeat=3):
+    lat, lon, rel, gps = synthetic_fixes(n)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "gps_position.txt")
+
+        def text():
+            # 与旧版 Get_uav_position_test.py 相同：每个点格式化时间戳、写一行并 flush
+            with open(path, 'w', encoding='utf-8') as f:
+                for i, (x1, y1, z1, g1) in enumerate(zip(lat, lon, rel, gps)):
+                    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+                    f.write(f"{timestamp} | {x1:.7f} | {y1:.7f} | {z1:.3f} | {g1:.3f} | {i + 1} | 0.00\n")
+                    f.flush()
+
+        def binary():
+            with TelemetryLogger(os.path.join(tmp, "gps_position.bin")) as log:
+                for x1, y1, z1, g1 in zip(lat, lon, rel, gps):
+                    log.append(x1, y1, z1, g1)
+
+        results['record_text_flush'] = result(measure(text, repeat), n, 1e6, 'us/fix', fixes=n)
+        results['record_binary_logger'] = result(measure(binary, repeat), n, 1e6, 'us/fix', fixes=n)
+    return results
+
+
+# ---------------- UDP 发送 ----------------
+def bench_udp(n=20000, repeat=3):
+    lat, lon, _, gps = synthetic_fixes(n)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    target = receiver.getsockname()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    results = {}
+
+    def send(fmt, batch):
+        def run():
+            encoder = PacketEncoder(1, batch, 1.0, fmt)
+            for x1, y1, z1 in zip(lat, lon, gps):
+                for message in encoder.add(x1, y1, z1):
+                    sock.sendto(message, target)
+            # 接收端缓冲区满时报文被内核丢弃，不影响发送端计时；每轮结束后清空
+            drain()
+        return run
+
+    def drain():
+        receiver.setblocking(False)
+        try:
+            while True:
+                receiver.recv(65536)
+        except BlockingIOError:
+            pass
+
+    try:
+        results['udp_json'] = result(measure(send('json', 1), repeat), n, 1e6, 'us/fix', fixes=n)
+        results['udp_binary'] = result(measure(send('binary', 1), repeat), n, 1e6, 'us/fix', fixes=n)
+        results['udp_binary_batch10'] = result(measure(send('binary', 10), repeat), n, 1e6, 'us/fix',
+                                               fixes=n, batch=10)
+    finally:
+        sock.close()
+        receiver.close()
+    return results
+
+
+# ---------------- 坐标转换 ----------------
+def bench_ecef_to_enu(sizes=(1000, 10000, 100000, 1000000, 10000000), repeat=3):
+    frame = LocalFrame(CENTER_LAT, CENTER_LON, 486.664)
+    rng = np.random.default_rng(0)
+    results = {}
+    for n in sizes:
+        lat = CENTER_LAT + rng.normal(0, 1e-3, n)
+        lon = CENTER_LON + rng.normal(0, 1e-3, n)
+        alt = 486.664 + rng.normal(0, 10, n)
+        x, y, z = geodetic_to_ecef(lat, lon, alt, use_pyproj=False)
+        del lat, lon, alt
+        results[f'ecef_to_enu_{n:.0e}'.replace('+0', '')] = result(
+            measure(lambda: frame.ecef_to_enu(x, y, z), repeat), n, 1e9, 'ns/point', points=n)
+    return results
+
+
+# ---------------- 航点生成 ----------------
+def bench_circle(sizes=(100, 10000, 1000000), repeat=3):
+    results = {}
+    for n in sizes:
+        def run():
+            east, north, up = circle(5.0, n, 3.0, closed=True)
+            generate_waypoints(CENTER_LAT, CENTER_LON, east, north, up)
+        results[f'circle_{n}'] = result(measure(run, repeat), n, 1e6, 'us/point', points=n)
+    return results
+
+
+# ---------------- 跟踪误差 ----------------
+def bench_tracking(sizes=(100000, 1000000, 2000000), repeat=3):
+    """圆形计划路径 + 横向误差 σ=0.3 m 的轨迹点"""
+    plan = PathIndex(*circle_mission_path(5.0, 20, 3.0))
+    rng = np.random.default_rng(0)
+    results = {}
+    for n in sizes:
+        angle = rng.uniform(0, 2 * np.pi, n)
+        radius = 5.0 + rng.normal(0, 0.3, n)
+        east, north = radius * np.cos(angle), radius * np.sin(angle)
+        up = np.full(n, 3.0)
+        ts = np.arange(n) * 0.05
+        results[f'tracking_{n:.0e}'.replace('+0', '')] = result(
+            measure(lambda: analyze(plan, east, north, up, ts, speed=0.5), repeat), n, 1e9, 'ns/point', points=n)
+    return results
+
+
+# ---------------- 帧解析 ----------------
+def bench_frame_sync(total_mb=32, chunk=4096, repeat=3):
+    results = {}
+    for fixed in (False, True):
+        rates = [frame_sync_benchmark(total_mb, chunk=chunk, fixed_size=fixed)['mb_per_s']
+                 for _ in range(repeat)]
+        results[f"frame_sync_{'fixed' if fixed else 'footer'}"] = {
+            'value': max(rates),
+            'median': statistics.median(rates),
+            'unit': 'MB/s',
+            'better': 'higher',
+            'params': {'total_mb': total_mb, 'chunk': chunk},
+        }
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_all(quick=False, only=None):
+    suites = {
+        'record': lambda: bench_record(5000 if quick else 20000),
+        'udp': lambda: bench_udp(5000 if quick else 20000),
+        'ecef': lambda: bench_ecef_to_enu((1000, 10000, 100000, 1000000) if quick else
+                                          (1000, 10000, 100000, 1000000, 10000000)),
+        'circle': lambda: bench_circle((100, 10000, 100000) if quick else (100, 10000, 1000000)),
+        'tracking': lambda: bench_tracking((100000, 1000000) if quick else (100000, 1000000, 2000000)),
+        'frame_sync': lambda: bench_frame_sync(8 if quick else 32),
+    }
+    results = {}
+    for name, suite in suites.items():
+        if only and not any(key in name for key in only):
+            continue
+        print(f"运行 {name} ...")
+        for key, r in suite().items():
+            results[key] = r
+            print(f"  {key:<24} {r['value']:>12.3f} {r['unit']:<9} (中位数 {r['median']:.3f})")
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(old, new, threshold=REGRESSION_THRESHOLD):
+    """逐项对比两次结果，返回回退项名称列表"""
+    regressions = []
+    print(f"对比 {old['meta']['commit']} -> {new['meta']['commit']}")
+    for key, r in new['results'].items():
+        if key not in old['results']:
+            continue
+        before, after = old['results'][key]['value'], r['value']
+        # 统一换算为"变差比例"：正数表示变慢
+        change = (after / before - 1) if r['better'] == 'lower' else (before / after - 1)
+        flag = "  <-- 回退" if change > threshold else ""
+        if flag:
+            regressions.append(key)
+        print(f"  {key:<24} {before:>12.3f} -> {after:>12.3f} {r['unit']:<9} {change * 100:+6.1f}%{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="遥测/坐标转换/帧解析热点路径基准测试")
+    parser.add_argument('--quick', action='store_true', help="减小测试规模")
+    parser.add_argument('--only', help="只运行名称包含这些关键字的测试（逗号分隔）")
+    parser.add_argument('--out', help="结果文件路径，默认 benchmark_results/<时间>_<提交>.json")
+    parser.add_argument('--compare', help="与之前的结果文件对比")
+    args = parser.parse_args()
+
+    report = run_all(args.quick, args.only.split(',') if args.only else None)
+    out = args.out
+    if out is None:
+        os.makedirs(RESULT_DIR, exist_ok=True)
+        out = os.path.join(RESULT_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['meta']['commit']}.json")
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {out}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            if compare(json.load(f), report):
+                sys.exit(1)
@@ -1,31 +1,29 @@
-import pyproj
 import matplotlib.pyplot as plt
 import numpy as np
 from mpl_toolkits.mplot3d import Axes3D
+from geodesy import LocalFrame, geodetic_to_ecef
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
 
-# 创建WGS84到ECEF的转换器
-transformer = pyproj.Transformer.from_crs("EPSG:4326", "EPSG:4978", always_xy=True)
-
 # 基站原点 (北京天安门)
 lat_origin, lon_origin, alt_origin = 39.9042, 116.4074, 0
-X0, Y0, Z0 = transformer.transform(lon_origin, lat_origin, alt_origin)   # 基站原点 ECEF
+frame = LocalFrame(lat_origin, lon_origin, alt_origin)
+X0, Y0, Z0 = frame.origin_ecef   # 基站原点 ECEF
 print(f"原点ECEF坐标: X={X0:.2f}, Y={Y0:.2f}, Z={Z0:.2f}")
 
 # 目标位置
 lat_target, lon_target, alt_target = 39.9042, 116.4075, 50
-X1, Y1, Z1 = transformer.transform(lon_target, lat_target, alt_target)   # 目标位置 ECEF
+X1, Y1, Z1 = geodetic_to_ecef(lat_target, lon_target, alt_target)   # 目标位置 ECEF
 print(f"目标ECEF坐标: X={X1:.2f}, Y={Y1:.2f}, Z={Z1:.2f}")
 
-# 计算相对于原点的xyz坐标
-dx = X1 - X0  # 东向
-dy = Y1 - Y0  # 北向  
-dz = Z1 - Z0  # 上向
+# ECEF坐标差只是地心坐标系下的差值，并不是东/北/天
+print(f"ECEF坐标差: dX={X1 - X0:.2f}m, dY={Y1 - Y0:.2f}m, dZ={Z1 - Z0:.2f}m")
 
-print(f"相对坐标: dx={dx:.2f}m, dy={dy:.2f}m, dz={dz:.2f}m")
+# 旋转到原点处的本地ENU坐标系，得到真正的东、北、天分量
+dx, dy, dz = frame.ecef_to_enu(X1, Y1, Z1)  # 东向, 北向, 上向
+print(f"相对坐标(ENU): dx={dx:.2f}m, dy={dy:.2f}m, dz={dz:.2f}m")
 
 # 创建3D可视化
 fig = plt.figure(figsize=(10, 8))
@@ -1,54 +1,25 @@
-import pyproj
 import matplotlib.pyplot as plt
 import numpy as np
 from mpl_toolkits.mplot3d import Axes3D
+from geodesy import LocalFrame, geodetic_to_ecef
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
 
-# 创建WGS84到ECEF的转换器
-transformer = pyproj.Transformer.from_crs("EPSG:4326", "EPSG:4978", always_xy=True)
-
-# 基站原点 (北京天安门)
+# 基站原点 (北京天安门)，原点ECEF坐标与旋转矩阵由 LocalFrame 缓存
 lat_origin, lon_origin, alt_origin = 39.9042, 116.4074, 0
-X0, Y0, Z0 = transformer.transform(lon_origin, lat_origin, alt_origin)   # 基站原点 ECEF
+frame = LocalFrame(lat_origin, lon_origin, alt_origin)
+X0, Y0, Z0 = frame.origin_ecef   # 基站原点 ECEF
 print(f"原点ECEF坐标: X={X0:.2f}, Y={Y0:.2f}, Z={Z0:.2f}")
 
 # 目标位置
 lat_target, lon_target, alt_target = 39.9042, 116.4073, 60
-X_target, Y_target, Z_target = transformer.transform(lon_target, lat_target, alt_target)   # 目标位置 ECEF
+X_target, Y_target, Z_target = geodetic_to_ecef(lat_target, lon_target, alt_target)   # 目标位置 ECEF
 print(f"目标ECEF坐标: X={X_target:.2f}, Y={Y_target:.2f}, Z={Z_target:.2f}")
 
-# ECEF到ENU坐标转换函数
-def ecef_to_enu(x, y, z, lat0, lon0, alt0):
-    """
-    将ECEF坐标转换为ENU坐标
-    """
-    # 转换为弧度
-    lat0_rad = np.radians(lat0)
-    lon0_rad = np.radians(lon0)
-    
-    # 计算相对于原点的ECEF坐标差
-    dx = x - X0
-    dy = y - Y0
-    dz = z - Z0
-    
-    # ENU转换矩阵
-    sin_lat = np.sin(lat0_rad)
-    cos_lat = np.cos(lat0_rad)
-    sin_lon = np.sin(lon0_rad)
-    cos_lon = np.cos(lon0_rad)
-    
-    # 转换到ENU坐标系
-    east = -sin_lon * dx + cos_lon * dy
-    north = -sin_lat * cos_lon * dx - sin_lat * sin_lon * dy + cos_lat * dz
-    up = cos_lat * cos_lon * dx + cos_lat * sin_lon * dy + sin_lat * dz
-    
-    return east, north, up
-
-# 计算目标位置的ENU坐标
-east_target, north_target, up_target = ecef_to_enu(X_target, Y_target, Z_target, lat_origin, lon_origin, alt_origin)
+# 计算目标位置的ENU坐标（geodetic_to_enu 同样接受整批经纬高数组）
+east_target, north_target, up_target = frame.ecef_to_enu(X_target, Y_target, Z_target)
 print(f"目标ENU坐标: East={east_target:.2f}, North={north_target:.2f}, Up={up_target:.2f}")
 
 # 创建3D图形
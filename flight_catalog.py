@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# 飞行记录目录库：把散落的记录文件（log/gps_position_*.csv/.txt、根目录与 0930/ 下的 csv、.bin 日志）
+# 导入本地 SQLite，保存每次飞行的摘要，并用 R-tree 按 (纬度, 经度, 时间) 建立航段索引，
+# "某时间段内经过某区域的飞行" 这类查询不再需要逐个解析文件，毫秒级返回
+import os
+import re
+import sqlite3
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from flight_replay import load_log
+from geodesy import LocalFrame
+
+DEFAULT_DB = os.path.join("log", "catalog.db")
+# 默认扫描的目录与文件后缀
+SCAN_DIRS = (".", "log", "0930")
+LOG_SUFFIXES = ('.csv', '.txt', '.bin')
+# 每个索引航段包含的采样点数：越小空间查询越精确，索引越大
+SEGMENT_SAMPLES = 100
+# 小于该值的时间戳不是 epoch（如 X,Y,Z 记录从 0 开始、gps_trajectory_complete.csv 为当天秒数）
+EPOCH_MIN = 1e9
+# 文件名中的记录开始时间，如 gps_position_20251016_213634.csv
+FILENAME_TIME = re.compile(r'(\d{8}_\d{6})')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    time_source TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    rate_hz REAL NOT NULL,
+    min_lat REAL NOT NULL,
+    max_lat REAL NOT NULL,
+    min_lon REAL NOT NULL,
+    max_lon REAL NOT NULL,
+    max_alt REAL NOT NULL,
+    distance_m REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING rtree(
+    id, min_lat, max_lat, min_lon, max_lon, start_time, end_time, +flight_id,
+    +lat0, +lat1, +lon0, +lon1, +t0, +t1
+);
+"""
+# R-tree 坐标以 float32 存储并向外取整（epoch 秒约 ±128 s、经纬度约 ±1 m），只用于粗筛；
+# 精确边界另存为辅助列 lat0/lat1/lon0/lon1/t0/t1 再判断一次。结构变化时递增版本号，旧库自动重建
+SCHEMA_VERSION = 2
+
+Flight = namedtuple('Flight', 'id path mtime size time_source start_time end_time samples rate_hz '
+                              'min_lat max_lat min_lon max_lon max_alt distance_m')
+
+
+def _absolute_times(t, path, mtime):
+    """
+    把记录时间戳换算为 epoch 秒，返回 (时间戳, 来源)：
+        log      记录本身就是 epoch 时间
+        filename 按文件名中的 YYYYmmdd_HHMMSS 作为开始时间
+        mtime    以文件修改时间作为结束时间（记录结束时写完文件）
+    """
+    if len(t) and t[0] >= EPOCH_MIN:
+        return t, 'log'
+    relative = t - t[0] if len(t) else t
+    match = FILENAME_TIME.search(os.path.basename(path))
+    if match:
+        start = datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').timestamp()
+        return start + relative, 'filename'
+    return mtime - (relative[-1] if len(relative) else 0.0) + relative, 'mtime'
+
+
+def _segment_bounds(values, starts):
+    """每个航段 [starts[k], starts[k+1]]（含下一段首点，保证段间连线也被覆盖）的最小/最大值"""
+    lo = np.minimum.reduceat(values, starts)
+    hi = np.maximum.reduceat(values, starts)
+    lo[:-1] = np.minimum(lo[:-1], values[starts[1:]])
+    hi[:-1] = np.maximum(hi[:-1], values[starts[1:]])
+    return lo, hi
+
+
+def parse_time(text):
+    """'YYYY-mm-dd[ HH:MM[:SS]]' 本地时间 -> epoch 秒"""
+    return datetime.fromisoformat(text).timestamp()
+
+
+class Catalog:
+    """
+    飞行记录目录库
+
+    参数:
+        path: SQLite 数据库文件，默认 log/catalog.db
+
+    用法:
+        with Catalog() as catalog:
+            catalog.scan()
+            for flight in catalog.query(bbox=(30.51, 104.01, 30.53, 104.03), start=parse_time("2025-10-01")):
+                print(catalog.describe(flight))
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # 目录库只是记录文件的索引，结构变化时清空重建，重新 scan 即可
+            self.db.executescript("DROP TABLE IF EXISTS segments; DROP TABLE IF EXISTS flights;")
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def ingest(self, path, force=False):
+        """
+        导入一个记录文件；文件未变化（修改时间、大小相同）时跳过
+
+        返回 'added' / 'updated' / 'unchanged' / 'skipped'（格式无法识别或没有数据）
+        """
+        path = os.path.normpath(path)
+        stat = os.stat(path)
+        row = self.db.execute("SELECT id, mtime, size FROM flights WHERE path = ?", (path,)).fetchone()
+        if row and not force and row[1] == stat.st_mtime and row[2] == stat.st_size:
+            return 'unchanged'
+        try:
+            data = load_log(path)
+        except (ValueError, OSError, IndexError):
+            return 'skipped'
+        data = data[np.isfinite(data['latitude']) & np.isfinite(data['longitude'])]
+        if not len(data):
+            return 'skipped'
+
+        lat = np.asarray(data['latitude'], dtype=float)
+        lon = np.asarray(data['longitude'], dtype=float)
+        alt = np.asarray(data['relative_altitude'], dtype=float)
+        t, source = _absolute_times(np.asarray(data['timestamp'], dtype=float), path, stat.st_mtime)
+        east, north, up = LocalFrame(lat[0], lon[0], 0.0).geodetic_to_enu(lat, lon, alt)
+        distance = float(np.sum(np.sqrt(np.diff(east) ** 2 + np.diff(north) ** 2 + np.diff(up) ** 2)))
+        duration = float(t[-1] - t[0])
+        summary = (path, stat.st_mtime, stat.st_size, source, float(t[0]), float(t[-1]), len(data),
+                   (len(data) - 1) / duration if duration > 0 else 0.0,
+                   float(lat.min()), float(lat.max()), float(lon.min()), float(lon.max()),
+                   float(np.nanmax(alt)), distance)
+
+        starts = np.arange(0, len(data), SEGMENT_SAMPLES)
+        lat_lo, lat_hi = _segment_bounds(lat, starts)
+        lon_lo, lon_hi = _segment_bounds(lon, starts)
+        t_lo, t_hi = _segment_bounds(t, starts)
+
+        with self.db:
+            if row:
+                self.db.execute("DELETE FROM segments WHERE flight_id = ?", (row[0],))
+                self.db.execute("DELETE FROM flights WHERE id = ?", (row[0],))
+            flight_id = self.db.execute(
+                "INSERT INTO flights (path, mtime, size, time_source, start_time, end_time, samples, rate_hz, "
+                "min_lat, max_lat, min_lon, max_lon, max_alt, distance_m) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", summary).lastrowid
+            self.db.executemany(
+                "INSERT INTO segments (min_lat, max_lat, min_lon, max_lon, start_time, end_time, flight_id, "
+                "lat0, lat1, lon0, lon1, t0, t1) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((*bounds, flight_id, *bounds) for bounds in zip(
+                    lat_lo.tolist(), lat_hi.tolist(), lon_lo.tolist(), lon_hi.tolist(),
+                    t_lo.tolist(), t_hi.tolist())))
+        return 'updated' if row else 'added'
+
+    def scan(self, dirs=SCAN_DIRS, force=False, verbose=True):
+        """导入各目录（不递归）下的记录文件，并删除已不存在文件的条目，返回 {结果: 文件数}"""
+        counts = {}
+        for directory in dirs:
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, name)
+                if not name.endswith(LOG_SUFFIXES) or not os.path.isfile(path):
+                    continue
+                result = self.ingest(path, force)
+                counts[result] = counts.get(result, 0) + 1
+                if verbose and result in ('added', 'updated'):
+                    print(f"{path}: {result}")
+        counts['removed'] = self.prune()
+        return counts
+
+    def prune(self):
+        """删除文件已不存在的条目，返回删除数量"""
+        missing = [(fid,) for fid, path in self.db.execute("SELECT id, path FROM flights")
+                   if not os.path.exists(path)]
+        with self.db:
+            self.db.executemany("DELETE FROM segments WHERE flight_id = ?", missing)
+            self.db.executemany("DELETE FROM flights WHERE id = ?", missing)
+        return len(missing)
+
+    def query(self, bbox=None, start=None, end=None):
+        """
+        查询在 [start, end] 时间内经过 bbox 区域的飞行（航段级 R-tree 判断，不读原始文件）
+
+        参数:
+            bbox: (最小纬度, 最小经度, 最大纬度, 最大经度)，None 表示不限区域
+            start / end: epoch 秒，None 表示不限
+        返回 Flight 列表（按开始时间排序）
+        """
+        min_lat, min_lon, max_lat, max_lon = bbox if bbox is not None else (-90.0, -180.0, 90.0, 180.0)
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        rows = self.db.execute(
+            "SELECT * FROM flights WHERE id IN ("
+            "  SELECT flight_id FROM segments"
+            "  WHERE max_lat >= :min_lat AND min_lat <= :max_lat AND max_lon >= :min_lon AND min_lon <= :max_lon"
+            "    AND end_time >= :start AND start_time <= :end"
+            # R-tree 为 float32 粗筛，再用精确边界确认
+            "    AND lat1 >= :min_lat AND lat0 <= :max_lat AND lon1 >= :min_lon AND lon0 <= :max_lon"
+            "    AND t1 >= :start AND t0 <= :end"
+            ") ORDER BY start_time",
+            {'min_lat': min_lat, 'max_lat': max_lat, 'min_lon': min_lon, 'max_lon': max_lon,
+             'start': float(start), 'end': float(end)}).fetchall()
+        return [Flight(*row) for row in rows]
+
+    def near(self, lat, lon, radius_m, start=None, end=None):
+        """查询经过某点 radius_m 米范围内的飞行（按外接矩形判断）"""
+        dlat = radius_m / 111320.0
+        dlon = radius_m / (111320.0 * max(np.cos(np.radians(lat)), 1e-6))
+        return self.query((lat - dlat, lon - dlon, lat + dlat, lon + dlon), start, end)
+
+    def flights(self):
+        return [Flight(*row) for row in self.db.execute("SELECT * FROM flights ORDER BY start_time")]
+
+    @staticmethod
+    def describe(flight):
+        start = datetime.fromtimestamp(flight.start_time).strftime('%Y-%m-%d %H:%M:%S')
+        duration = flight.end_time - flight.start_time
+        return (f"{flight.path} | {start}（{flight.time_source}）| {duration:.1f} s | {flight.samples} 点 "
+                f"{flight.rate_hz:.1f} Hz | 航程 {flight.distance_m:.1f} m | 最高 {flight.max_alt:.1f} m | "
+                f"纬度 {flight.min_lat:.6f}~{flight.max_lat:.6f} 经度 {flight.min_lon:.6f}~{flight.max_lon:.6f}")
+
+
+if __name__ == "__main__":
+    # 用法:
+    #   python flight_catalog.py scan [目录 ...]                         导入/更新记录（默认 . log 0930）
+    #   python flight_catalog.py list                                   列出全部飞行
+    #   python flight_catalog.py query 最小纬度,最小经度,最大纬度,最大经度 [开始时间] [结束时间]
+    #   python flight_catalog.py near 纬度,经度,半径米 [开始时间] [结束时间]
+    #   时间格式 "2025-10-16" 或 "2025-10-16 21:30:00"，"-" 表示不限
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    args = sys.argv[2:]
+    with Catalog() as catalog:
+        if command == 'scan':
+            print(catalog.scan(args or SCAN_DIRS))
+        elif command in ('query', 'near'):
+            values = [float(v) for v in args[0].split(',')]
+            start, end = (parse_time(v) if v != '-' else None for v in (args[1:] + ['-', '-'])[:2])
+            if command == 'query':
+                result = catalog.query(values, start, end)
+            else:
+                result = catalog.near(*values, start=start, end=end)
+            for flight in result:
+                print(catalog.describe(flight))
+            print(f"共 {len(result)} 次飞行")
+        else:
+            for flight in catalog.flights():
+                print(catalog.describe(flight))
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# 飞行记录回放：把三种历史记录格式统一解析为列式数组，再按实时 / N 倍速 / 最快速度作为异步遥测流回放
+#
+# 支持的格式:
+#   gps_trajectory_complete.csv   latitude,longitude,altitude,timestamp（miss2.py，altitude 为相对高度）
+#   0930/gps_recording.csv        X,Y,Z = 纬度,经度,相对高度（无时间戳，按固定频率补时间）
+#   log/gps_position_*.csv        时间戳,纬度(度),经度(度),相对高度(米),GPS高度(米),读取次数,频率(Hz)
+#   log/gps_position_*.txt        同上字段，以 " | " 分隔，含标题和频率统计行
+#   *.bin                         telemetry_logger.py 的二进制日志
+#
+# 用法:
+#   python flight_replay.py 记录文件 [倍速|max] [UDP目标IP:端口]
+import asyncio
+import socket
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from position_txt import local_epoch, read_txt
+from telemetry_logger import RECORD_DTYPE, read_log
+
+# 回放输出的样本，字段名与 mavsdk 的 Position 一致，可直接替代 drone.telemetry.position()
+ReplayPosition = namedtuple('ReplayPosition', 'timestamp latitude_deg longitude_deg '
+                                              'relative_altitude_m absolute_altitude_m')
+
+POSITION_CSV_HEADER = "时间戳,纬度(度),经度(度),相对高度(米),GPS高度(米),读取次数,频率(Hz)"
+
+
+def _table(timestamp, lat, lon, rel, gps=None, sequence=None):
+    data = np.zeros(len(timestamp), dtype=RECORD_DTYPE)
+    data['timestamp'] = timestamp
+    data['latitude'] = lat
+    data['longitude'] = lon
+    data['relative_altitude'] = rel
+    data['gps_altitude'] = np.nan if gps is None else gps
+    data['sequence'] = np.arange(1, len(timestamp) + 1) if sequence is None else sequence
+    return data
+
+
+def load_log(path, rate_hz=10.0):
+    """
+    读取任一格式的飞行记录，返回 telemetry_logger.RECORD_DTYPE 结构化数组
+    （timestamp, latitude, longitude, relative_altitude, gps_altitude, sequence）
+
+    参数:
+        path: 记录文件路径
+        rate_hz: 无时间戳格式（X,Y,Z）的记录频率，用于补时间戳；GPS高度缺失时为 NaN
+    """
+    if path.endswith('.bin'):
+        return read_log(path, mmap=False)
+    if path.endswith('.txt'):
+        return read_txt(path)[0]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.readline().strip()
+    columns = header.split(',')
+    if columns == ['latitude', 'longitude', 'altitude', 'timestamp']:
+        data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+        return _table(data[:, 3], data[:, 0], data[:, 1], data[:, 2])
+    if columns == ['X', 'Y', 'Z']:
+        data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+        return _table(np.arange(len(data)) / rate_hz, data[:, 0], data[:, 1], data[:, 2])
+    if header == POSITION_CSV_HEADER:
+        stamps = np.loadtxt(path, delimiter=',', skiprows=1, usecols=0, dtype=str, ndmin=1, encoding='utf-8')
+        data = np.loadtxt(path, delimiter=',', skiprows=1, usecols=range(1, 6), ndmin=2, encoding='utf-8')
+        return _table(local_epoch(stamps), data[:, 0], data[:, 1], data[:, 2], data[:, 3], data[:, 4])
+    raise ValueError(f"无法识别的记录格式: {path} ({header})")
+
+
+class Replay:
+    """
+    把记录作为异步遥测流回放
+
+    参数:
+        data: load_log() 返回的数组
+        speed: 回放倍速，1.0 为实时；None 或 0 表示不等待，以最快速度输出
+        loop: 播放完后是否从头循环（时间戳顺延）
+        yield_every: 最快速度模式下每输出多少个样本让出一次事件循环
+    """
+
+    def __init__(self, data, speed=1.0, loop=False, yield_every=256):
+        if not len(data):
+            raise ValueError("记录为空")
+        self.data = data
+        self.speed = speed or None
+        self.loop = loop
+        self.yield_every = yield_every
+        self.emitted = 0
+        self.late = 0           # 实时模式下晚于计划时间输出的样本数
+        self.max_lateness = 0.0
+
+    def duration(self):
+        return float(self.data['timestamp'][-1] - self.data['timestamp'][0])
+
+    def __aiter__(self):
+        return self._run()
+
+    async def _run(self):
+        aloop = asyncio.get_running_loop()
+        ts = self.data['timestamp'] - self.data['timestamp'][0]
+        # 一次性转为 Python 列表，避免逐样本访问 NumPy 标量
+        columns = (self.data['latitude'].tolist(), self.data['longitude'].tolist(),
+                   self.data['relative_altitude'].tolist(), self.data['gps_altitude'].tolist())
+        rel_ts = ts.tolist()
+        period = self.duration() + (float(ts[-1] - ts[-2]) if len(ts) > 1 else 0.0)
+        start = aloop.time()
+        offset = 0.0
+        while True:
+            for t, lat, lon, rel, gps in zip(rel_ts, *columns):
+                t += offset
+                if self.speed is None:
+                    if self.emitted % self.yield_every == 0:
+                        await asyncio.sleep(0)
+                else:
+                    # 按计划时间（起点 + t/倍速）等待，不累积误差
+                    delay = start + t / self.speed - aloop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    elif delay < 0:
+                        self.late += 1
+                        self.max_lateness = max(self.max_lateness, -delay)
+                self.emitted += 1
+                yield ReplayPosition(t, lat, lon, rel, gps)
+            if not self.loop:
+                return
+            offset += period
+
+    def stats(self):
+        return {
+            'emitted': self.emitted,
+            'late': self.late,
+            'max_lateness_ms': self.max_lateness * 1000,
+        }
+
+
+async def replay_to_udp(path, target, speed=1.0, vehicle_id=1, batch=1):
+    """
+    把记录按给定倍速经 position_packet 编码发给 UDP 接收端（udp_receiver_test.py），
+    样本时间戳换算为当前时间（最快速度模式下为发送时刻），接收端的延迟统计仍然有效
+    """
+    from position_packet import PacketEncoder
+
+    data = load_log(path)
+    encoder = PacketEncoder(vehicle_id=vehicle_id, batch=batch)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    replay = Replay(data, speed)
+    base = time.time()
+    sent = 0
+    try:
+        async for sample in replay:
+            ts = base + sample.timestamp / speed if speed else time.time()
+            for packet in encoder.add(sample.latitude_deg, sample.longitude_deg,
+                                      sample.relative_altitude_m, ts):
+                sock.sendto(packet, target)
+                sent += 1
+        packet = encoder.flush()
+        if packet is not None:
+            sock.sendto(packet, target)
+            sent += 1
+    finally:
+        sock.close()
+    return replay.stats(), sent
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python flight_replay.py 记录文件 [倍速|max] [UDP目标IP:端口]")
+        sys.exit(1)
+    log_path = sys.argv[1]
+    speed = 1.0
+    if len(sys.argv) > 2:
+        speed = None if sys.argv[2] == 'max' else float(sys.argv[2])
+    records = load_log(log_path)
+    print(f"{log_path}: {len(records)} 个样本, 时长 {records['timestamp'][-1] - records['timestamp'][0]:.1f} s")
+
+    if len(sys.argv) > 3:
+        host, port = sys.argv[3].rsplit(':', 1)
+        stats, packets = asyncio.run(replay_to_udp(log_path, (host, int(port)), speed))
+        print(f"已发送 {packets} 个报文: {stats}")
+    else:
+        async def show():
+            replay = Replay(records, speed)
+            async for sample in replay:
+                print(f"{sample.timestamp:8.3f}s  纬度 {sample.latitude_deg:.7f}  经度 {sample.longitude_deg:.7f}  "
+                      f"相对高度 {sample.relative_altitude_m:.2f} m")
+            print(replay.stats())
+        asyncio.run(show())
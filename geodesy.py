@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# WGS84 经纬高 <-> ECEF <-> 本地ENU/NED 坐标批量转换
+# 所有函数都接受标量或 NumPy 数组，整批一次计算，不逐点调用 pyproj
+# 装了 pyproj 时经纬高与 ECEF 互转走 pyproj（一次调用处理整个数组），否则用闭式公式
+import numpy as np
+
+try:
+    import pyproj
+except ImportError:
+    pyproj = None
+
+# WGS84 椭球参数
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+WGS84_E2 = WGS84_F * (2 - WGS84_F)               # 第一偏心率平方
+WGS84_EP2 = WGS84_E2 / (1 - WGS84_E2)            # 第二偏心率平方
+
+_transformers = {}
+
+
+def _transformer(inverse):
+    # 经纬高(EPSG:4326) <-> ECEF(EPSG:4978)，首次使用时创建并缓存
+    if inverse not in _transformers:
+        src, dst = ("EPSG:4978", "EPSG:4979") if inverse else ("EPSG:4979", "EPSG:4978")
+        _transformers[inverse] = pyproj.Transformer.from_crs(src, dst, always_xy=True)
+    return _transformers[inverse]
+
+
+def geodetic_to_ecef(lat, lon, alt, use_pyproj=True):
+    """经纬高(度, 度, 米) -> ECEF (x, y, z) 米"""
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    alt = np.asarray(alt, dtype=float)
+    if use_pyproj and pyproj is not None:
+        x, y, z = _transformer(False).transform(lon, lat, alt)
+        return np.asarray(x), np.asarray(y), np.asarray(z)
+
+    lat_rad = np.radians(lat)
+    lon_rad = np.radians(lon)
+    sin_lat = np.sin(lat_rad)
+    cos_lat = np.cos(lat_rad)
+    n = WGS84_A / np.sqrt(1 - WGS84_E2 * sin_lat ** 2)  # 卯酉圈曲率半径
+    x = (n + alt) * cos_lat * np.cos(lon_rad)
+    y = (n + alt) * cos_lat * np.sin(lon_rad)
+    z = (n * (1 - WGS84_E2) + alt) * sin_lat
+    return x, y, z
+
+
+def ecef_to_geodetic(x, y, z, use_pyproj=True):
+    """ECEF (x, y, z) 米 -> 经纬高(度, 度, 米)，闭式解采用 Heikkinen 公式（无迭代）"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    z = np.asarray(z, dtype=float)
+    if use_pyproj and pyproj is not None:
+        lon, lat, alt = _transformer(True).transform(x, y, z)
+        return np.asarray(lat), np.asarray(lon), np.asarray(alt)
+
+    a, b, e2, ep2 = WGS84_A, WGS84_B, WGS84_E2, WGS84_EP2
+    p = np.hypot(x, y)
+    f = 54 * b ** 2 * z ** 2
+    g = p ** 2 + (1 - e2) * z ** 2 - e2 * (a ** 2 - b ** 2)
+    c = e2 ** 2 * f * p ** 2 / g ** 3
+    s = np.cbrt(1 + c + np.sqrt(c ** 2 + 2 * c))
+    k = s + 1 + 1 / s
+    big_p = f / (3 * k ** 2 * g ** 2)
+    q = np.sqrt(1 + 2 * e2 ** 2 * big_p)
+    r0 = (-(big_p * e2 * p) / (1 + q)
+          + np.sqrt(0.5 * a ** 2 * (1 + 1 / q)
+                    - big_p * (1 - e2) * z ** 2 / (q * (1 + q))
+                    - 0.5 * big_p * p ** 2))
+    u = np.sqrt((p - e2 * r0) ** 2 + z ** 2)
+    v = np.sqrt((p - e2 * r0) ** 2 + (1 - e2) * z ** 2)
+    z0 = b ** 2 * z / (a * v)
+    alt = u * (1 - b ** 2 / (a * v))
+    lat = np.degrees(np.arctan2(z + ep2 * z0, p))
+    lon = np.degrees(np.arctan2(y, x))
+    return lat, lon, alt
+
+
+class LocalFrame:
+    """
+    以某一点为原点的本地切平面坐标系（ENU: 东-北-天，NED: 北-东-地）
+
+    原点的 ECEF 坐标和旋转矩阵在创建时计算一次并缓存，之后每次转换都是整批矩阵运算
+
+    参数:
+        lat0, lon0, alt0: 原点经纬高（度, 度, 米）
+        use_pyproj: 是否优先使用 pyproj 做经纬高与 ECEF 互转
+    """
+
+    def __init__(self, lat0, lon0, alt0=0.0, use_pyproj=True):
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        self.alt0 = float(alt0)
+        self.use_pyproj = use_pyproj
+        x0, y0, z0 = geodetic_to_ecef(self.lat0, self.lon0, self.alt0, use_pyproj)
+        self.origin_ecef = np.array([float(x0), float(y0), float(z0)])
+
+        sin_lat, cos_lat = np.sin(np.radians(self.lat0)), np.cos(np.radians(self.lat0))
+        sin_lon, cos_lon = np.sin(np.radians(self.lon0)), np.cos(np.radians(self.lon0))
+        # ECEF 差值 -> ENU 的旋转矩阵（行依次为 东、北、天 单位向量）
+        self.rotation = np.array([
+            [-sin_lon, cos_lon, 0.0],
+            [-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat],
+            [cos_lat * cos_lon, cos_lat * sin_lon, sin_lat],
+        ])
+
+    @classmethod
+    def from_position(cls, position, use_pyproj=True):
+        """以 MAVSDK telemetry.position() 的当前位置（GPS高度）为原点"""
+        return cls(position.latitude_deg, position.longitude_deg,
+                   position.absolute_altitude_m, use_pyproj)
+
+    def ecef_to_enu(self, x, y, z):
+        r = self.rotation
+        dx = np.asarray(x, dtype=float) - self.origin_ecef[0]
+        dy = np.asarray(y, dtype=float) - self.origin_ecef[1]
+        dz = np.asarray(z, dtype=float) - self.origin_ecef[2]
+        east = r[0, 0] * dx + r[0, 1] * dy + r[0, 2] * dz
+        north = r[1, 0] * dx + r[1, 1] * dy + r[1, 2] * dz
+        up = r[2, 0] * dx + r[2, 1] * dy + r[2, 2] * dz
+        return east, north, up
+
+    def enu_to_ecef(self, east, north, up):
+        r = self.rotation  # 正交矩阵，逆即转置
+        east = np.asarray(east, dtype=float)
+        north = np.asarray(north, dtype=float)
+        up = np.asarray(up, dtype=float)
+        x = r[0, 0] * east + r[1, 0] * north + r[2, 0] * up + self.origin_ecef[0]
+        y = r[0, 1] * east + r[1, 1] * north + r[2, 1] * up + self.origin_ecef[1]
+        z = r[0, 2] * east + r[1, 2] * north + r[2, 2] * up + self.origin_ecef[2]
+        return x, y, z
+
+    def geodetic_to_enu(self, lat, lon, alt):
+        """经纬高数组 -> (东, 北, 天) 米"""
+        return self.ecef_to_enu(*geodetic_to_ecef(lat, lon, alt, self.use_pyproj))
+
+    def enu_to_geodetic(self, east, north, up):
+        """(东, 北, 天) 米 -> 经纬高数组"""
+        return ecef_to_geodetic(*self.enu_to_ecef(east, north, up), use_pyproj=self.use_pyproj)
+
+    def geodetic_to_ned(self, lat, lon, alt):
+        """经纬高数组 -> (北, 东, 地) 米，与 PX4/MAVSDK 的 NED 约定一致"""
+        east, north, up = self.geodetic_to_enu(lat, lon, alt)
+        return north, east, -up
+
+    def ned_to_geodetic(self, north, east, down):
+        """(北, 东, 地) 米 -> 经纬高数组"""
+        return self.enu_to_geodetic(east, north, -np.asarray(down, dtype=float))
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# 遥测频率与延迟指标：按流（position / attitude_euler / battery / udp_send / disk_write ...）统计
+# 瞬时频率、到达间隔直方图、从 MAVSDK 到达到使用者取走的延迟 p50/p99、使用者处理耗时和队列深度，
+# 定期打印摘要，并可导出为 JSON 或 Prometheus 文本格式
+# 只看 "总次数 / 总时长" 的平均频率会掩盖抖动和卡顿，间隔直方图和 p99 能直接看出 10 Hz 在哪一环丢失
+import asyncio
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# 到达间隔直方图的桶上限(秒)，最后一个桶为 +Inf
+INTERVAL_BUCKETS = (0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+# 瞬时频率的统计窗口(秒)
+RATE_WINDOW = 1.0
+# Prometheus 指标名前缀
+PREFIX = 'f450'
+
+
+def _percentiles(values):
+    if not values:
+        return None
+    data = np.asarray(values) * 1000
+    return {'p50_ms': float(np.percentile(data, 50)), 'p99_ms': float(np.percentile(data, 99)),
+            'max_ms': float(data.max())}
+
+
+class StreamMetrics:
+    """
+    单个流的指标
+
+    参数:
+        name: 流名称
+        window: 间隔/延迟/耗时保留最近的样本数（百分位按窗口计算）
+    """
+
+    def __init__(self, name, window=1000):
+        self.name = name
+        self.count = 0
+        self.arrivals = deque(maxlen=window)    # 到达时刻 time.monotonic()
+        self.intervals = deque(maxlen=window)   # 相邻到达间隔(秒)
+        self.buckets = [0] * (len(INTERVAL_BUCKETS) + 1)
+        self.interval_sum = 0.0
+        self.latencies = deque(maxlen=window)   # 到达 -> 使用者取走(秒)
+        self.busy = deque(maxlen=window)        # 使用者处理一条数据的耗时(秒)
+        self.depth = 0                          # 最近一次的队列深度
+        self.max_depth = 0
+        self.dropped = 0                        # 使用者来不及取走而被丢弃的条数
+        self.started = time.monotonic()
+
+    def mark(self, now=None):
+        """记录一次到达，返回到达时刻"""
+        now = time.monotonic() if now is None else now
+        if self.arrivals:
+            interval = now - self.arrivals[-1]
+            self.intervals.append(interval)
+            self.interval_sum += interval
+            i = 0
+            while i < len(INTERVAL_BUCKETS) and interval > INTERVAL_BUCKETS[i]:
+                i += 1
+            self.buckets[i] += 1
+        self.arrivals.append(now)
+        self.count += 1
+        return now
+
+    def latency(self, seconds):
+        self.latencies.append(seconds)
+
+    def service(self, seconds):
+        self.busy.append(seconds)
+
+    def queue_depth(self, depth):
+        self.depth = depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def drop(self, n=1):
+        self.dropped += n
+
+    def rate(self, now=None):
+        """瞬时频率：最近 RATE_WINDOW 秒内的到达次数 / 窗口长度（停顿时下降到 0）"""
+        now = time.monotonic() if now is None else now
+        recent = 0
+        for t in reversed(self.arrivals):
+            if now - t > RATE_WINDOW:
+                break
+            recent += 1
+        return recent / RATE_WINDOW
+
+    def stats(self, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.started
+        result = {
+            'count': self.count,
+            'rate_hz': self.rate(now),
+            'avg_rate_hz': self.count / elapsed if elapsed > 0 else 0.0,
+            'histogram': dict(zip([str(b) for b in INTERVAL_BUCKETS] + ['+Inf'], self.buckets)),
+            'queue_depth': self.depth,
+            'max_queue_depth': self.max_depth,
+            'dropped': self.dropped,
+        }
+        for key, values in (('interval', self.intervals), ('latency', self.latencies), ('busy', self.busy)):
+            p = _percentiles(values)
+            if p is not None:
+                result.update({f'{key}_{k}': v for k, v in p.items()})
+        return result
+
+
+class Metrics:
+    """
+    指标注册表：按名称自动创建 StreamMetrics
+
+    用法:
+        metrics = Metrics()
+        async for position in metrics.observe('position', drone.telemetry.position()):
+            with metrics.time('disk_write'):
+                logger.append_position(position)
+        metrics.start_printer(5.0)
+        ...
+        metrics.dump("metrics.json")   # 或 .prom
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.streams = {}
+        self._printer = None
+
+    def stream(self, name):
+        metrics = self.streams.get(name)
+        if metrics is None:
+            metrics = self.streams[name] = StreamMetrics(name, self.window)
+        return metrics
+
+    def mark(self, name, now=None):
+        return self.stream(name).mark(now)
+
+    def latency(self, name, seconds):
+        self.stream(name).latency(seconds)
+
+    def queue_depth(self, name, depth):
+        self.stream(name).queue_depth(depth)
+
+    def drop(self, name, n=1):
+        self.stream(name).drop(n)
+
+    @contextmanager
+    def time(self, name):
+        """统计一次操作（UDP 发送、写盘等）：记为一次到达，耗时计入处理耗时"""
+        metrics = self.stream(name)
+        start = metrics.mark()
+        try:
+            yield
+        finally:
+            metrics.service(time.monotonic() - start)
+
+    async def observe(self, name, stream):
+        """
+        包装一个异步遥测流：每条数据记为一次到达，使用者处理该条数据（到请求下一条为止）的耗时
+        计入处理耗时；处理耗时接近或超过到达间隔时，流在使用者这里积压
+        """
+        metrics = self.stream(name)
+        async for value in stream:
+            start = metrics.mark()
+            yield value
+            metrics.service(time.monotonic() - start)
+
+    def stats(self):
+        now = time.monotonic()
+        return {name: metrics.stats(now) for name, metrics in self.streams.items()}
+
+    def summary(self):
+        lines = []
+        for name, s in self.stats().items():
+            text = f"{name}: {s['rate_hz']:.1f} Hz（平均 {s['avg_rate_hz']:.1f} Hz, {s['count']} 条）"
+            if 'interval_p50_ms' in s:
+                text += f" | 间隔 p50 {s['interval_p50_ms']:.1f} / p99 {s['interval_p99_ms']:.1f} ms"
+            if 'latency_p50_ms' in s:
+                text += f" | 延迟 p50 {s['latency_p50_ms']:.2f} / p99 {s['latency_p99_ms']:.2f} ms"
+            if 'busy_p50_ms' in s:
+                text += f" | 处理 p50 {s['busy_p50_ms']:.2f} / p99 {s['busy_p99_ms']:.2f} ms"
+            if s['max_queue_depth']:
+                text += f" | 队列 {s['queue_depth']}（最大 {s['max_queue_depth']}）"
+            if s['dropped']:
+                text += f" | 丢弃 {s['dropped']}"
+            lines.append(text)
+        return "\n".join(lines)
+
+    def to_json(self):
+        return json.dumps({'time': time.time(), 'streams': self.stats()}, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus 文本格式（可由 node_exporter 的 textfile 收集器读取）"""
+        stats = self.stats()
+        out = []
+
+        def gauge(metric, kind, key):
+            out.append(f"# TYPE {PREFIX}_{metric} {kind}")
+            for name, s in stats.items():
+                if key in s:
+                    out.append(f'{PREFIX}_{metric}{{stream="{name}"}} {s[key]:g}')
+
+        gauge('samples_total', 'counter', 'count')
+        gauge('dropped_total', 'counter', 'dropped')
+        gauge('rate_hz', 'gauge', 'rate_hz')
+        gauge('queue_depth', 'gauge', 'queue_depth')
+        gauge('queue_depth_max', 'gauge', 'max_queue_depth')
+        out.append(f"# TYPE {PREFIX}_interval_seconds histogram")
+        for name, metrics in self.streams.items():
+            cumulative = 0
+            for bound, n in zip([f"{b:g}" for b in INTERVAL_BUCKETS] + ['+Inf'], metrics.buckets):
+                cumulative += n
+                out.append(f'{PREFIX}_interval_seconds_bucket{{stream="{name}",le="{bound}"}} {cumulative}')
+            out.append(f'{PREFIX}_interval_seconds_sum{{stream="{name}"}} {metrics.interval_sum:g}')
+            out.append(f'{PREFIX}_interval_seconds_count{{stream="{name}"}} {cumulative}')
+        for metric, key in (('latency_seconds', 'latency'), ('busy_seconds', 'busy')):
+            out.append(f"# TYPE {PREFIX}_{metric} summary")
+            for name, s in stats.items():
+                for quantile, field in (('0.5', 'p50_ms'), ('0.99', 'p99_ms')):
+                    if f'{key}_{field}' in s:
+                        value = s[f'{key}_{field}'] / 1000
+                        out.append(f'{PREFIX}_{metric}{{stream="{name}",quantile="{quantile}"}} {value:g}')
+        return "\n".join(out) + "\n"
+
+    def dump(self, path):
+        """按后缀写出：.prom 为 Prometheus 文本格式，其余为 JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus() if path.endswith('.prom') else self.to_json())
+        return path
+
+    async def run_printer(self, interval=5.0, path=None):
+        """每 interval 秒打印一次摘要（path 给出时同时写出指标文件）"""
+        while True:
+            await asyncio.sleep(interval)
+            print("--- 指标 ---\n" + self.summary())
+            if path:
+                self.dump(path)
+
+    def start_printer(self, interval=5.0, path=None):
+        """在后台启动定期打印任务（重复调用无副作用）"""
+        if self._printer is None:
+            self._printer = asyncio.create_task(self.run_printer(interval, path))
+        return self._printer
+
+    async def stop_printer(self):
+        if self._printer is not None:
+            self._printer.cancel()
+            await asyncio.gather(self._printer, return_exceptions=True)
+            self._printer = None
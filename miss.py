@@ -1,10 +1,12 @@
 import asyncio
 import math
 import numpy as np
-import time
 import threading
 from mavsdk.offboard import PositionNedYaw
 from mavsdk import System, mission
+from telemetry_hub import TelemetryHub
+from rate_loop import RateLoop
+from waypoints import generate_waypoints, format_report, to_mission_items
 
 def generate_circle_points(radius,center=(0,0),num_points=20):
     angles = np.linspace(0, 2 * np.pi, num_points, endpoint=False)
@@ -12,6 +14,23 @@ def generate_circle_points(radius,center=(0,0),num_points=20):
     y = center[1] + radius * np.sin(angles)
 
     return x,y
+
+# 按固定频率记录位置（异步任务，漂移补偿排期，不阻塞事件循环）
+async def record_position(hub, recording_file="gps_recording.csv", rate_hz=10):
+    rate = RateLoop(rate_hz)
+    with open(recording_file, 'w') as f:
+        f.write("X,Y,Z\n")
+        try:
+            async for _ in rate:
+                position_data = hub.latest('position')
+                latitude = position_data.latitude_deg
+                longitude = position_data.longitude_deg
+                altitude = position_data.relative_altitude_m
+                f.write(f"{latitude},{longitude},{altitude}\n")
+                print(f"X: {latitude}, Y: {longitude}, Z: {altitude}")
+        finally:
+            print(f"-- 记录结束: {rate.summary()}")
+
 async def run():
     # 连接无人机
     drone = System()
@@ -25,21 +44,22 @@ async def run():
             print(f"链接成功!")
             break
 
-    async for att in drone.telemetry.attitude_euler():
-        heading_deg = att.yaw_deg
-        print(f"Current heading: {heading_deg} degrees")
-        break
+    # 遥测流只订阅一次，之后所有读取都从分发中心获取
+    hub = TelemetryHub(drone).start()
+
+    att = await hub.get('attitude_euler')
+    heading_deg = att.yaw_deg
+    print(f"Current heading: {heading_deg} degrees")
 
     g = 3  # 起飞高度
     i = 1  # 起飞指令
 
     # 打印GPS位置信息
-    async for position in drone.telemetry.position():
-        x = position.latitude_deg
-        y = position.longitude_deg
-        z = position.relative_altitude_m
-        print(x, y, z)
-        break
+    position = await hub.get('position')
+    x = position.latitude_deg
+    y = position.longitude_deg
+    z = position.relative_altitude_m
+    print(x, y, z)
 
     # 初始化变量，发布解锁起飞悬停命令
     x, y, z, s, time_1, yaw_1 = 0, 0, 0, -1, -1, -1
@@ -51,18 +71,16 @@ async def run():
     await asyncio.sleep(5)
 
     # 等待飞机真正升到空中
-    async for in_air in drone.telemetry.in_air():
-        if in_air:
-            print("In air!")
-            break
-        else :
-            print("Not in air!")
+    if not hub.latest('in_air'):
+        print("Not in air!")
+    await hub.wait_for('in_air', lambda in_air: in_air)
+    print("In air!")
 
     # await asyncio.sleep(g)
     print("hold")
 
     # 创建航线任务，并添加航点，按q执行
-    mission_items = []
+    # 航点格式："北向偏移(米),东向偏移(米),高度增量,速度,停留时间,偏航"
     input_str_list = ['0,0,3,0.5,1,0',
                       '0,4,3,0.5,1,0',
                       ]
@@ -71,33 +89,32 @@ async def run():
     for i in range(len(mission_x)):
         input_str_list.append(f'{mission_x[i]},{mission_y[i]},{g},-1,1,0')
 
-
-    for i in range(len(input_str_list)):
-        input_str = input_str_list[i]
+    rows = []
+    for input_str in input_str_list:
         if len(input_str) > 1:
             try:
-                # delta_x, delta_y, delta_z, s, time_1, yaw_1 = map(int, input_str.split(','))
                 delta_x, delta_y, delta_z, s, time_1, yaw_1 = map(float, input_str.split(','))
             except ValueError:
                 print("输入无效，请重试.")
                 continue
             if delta_x != 0 or delta_y != 0 or delta_z > 0 or s > 0 or time_1 > 0 or yaw_1 > 0:
-                # print(x, y, z, s, time_1, yaw_1)
-                async for position in drone.telemetry.position():
-                    x = position.latitude_deg + delta_x / 111111.0
-                    y = position.longitude_deg + delta_y / 111111.0
-                    z = position.relative_altitude_m + delta_z
-                    # print(x, y, z)
-                    break
-                print("-- 保存")
-                print(x, y, z)
-                mission_items.append(mission.MissionItem(x, y, z, s, True, float('nan'), float('nan'),
-                                                         mission.MissionItem.CameraAction.NONE, time_1, 1.0, 0, yaw_1,
-                                                         0))
+                rows.append((delta_x, delta_y, delta_z, s, time_1, yaw_1))
         else:
             if input_str == 'q':
                 break
-                break
+    if not rows:
+        print("错误：未生成航点！")
+        return
+
+    # 以当前位置为原点整批精确换算为经纬度（原 1/111111 近似对经度未做 cos(纬度) 修正）
+    position = hub.latest('position')
+    delta_x, delta_y, delta_z, s, time_1, yaw_1 = np.array(rows).T
+    x, y, _, report = generate_waypoints(position.latitude_deg, position.longitude_deg,
+                                         delta_y, delta_x, delta_z)
+    z = position.relative_altitude_m + delta_z
+    print("-- 保存")
+    print(format_report(report))
+    mission_items = to_mission_items(x, y, z, s, loiter_time=time_1, yaw=yaw_1)
 
     # 设置航线任务
     mission_plan = mission.MissionPlan(mission_items)
@@ -108,23 +125,15 @@ async def run():
 
 
 
-    recording_file = "gps_recording.csv"
-    with open(recording_file, 'w') as f:
-        f.write("X,Y,Z\n")
-
-        while True:
-            position = drone.telemetry.position()
-            async for data in position:
-                position_data = data
-                break
-
-            latitude = position_data.latitude_deg
-            longitude = position_data.longitude_deg
-            altitude = position_data.relative_altitude_m
-            f.write(f"{latitude},{longitude},{altitude}\n")
-            f.flush()
-            print(f"X: {latitude}, Y: {longitude}, Z: {altitude}")
-            time.sleep(0.1)
+    # 记录任务与任务进度监听并行运行
+    record_task = asyncio.create_task(record_position(hub, "gps_recording.csv", rate_hz=10))
+    async for mission_progress in drone.mission.mission_progress():
+        print(f"任务进度：{mission_progress.current}/{mission_progress.total}")
+        if mission_progress.current == mission_progress.total:
+            print("-- 航点任务完成")
+            break
+    record_task.cancel()  # 停止记录
+    await asyncio.gather(record_task, return_exceptions=True)
 
     input1 = input("'t' 清除任务: 任意则保存：")
 
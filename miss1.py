@@ -2,37 +2,25 @@
 import asyncio
 import numpy as np
 from mavsdk import System, mission
-from mavsdk.mission import MissionItem
+from waypoints import circle, generate_waypoints, format_report, to_mission_items
+from mission_phases import MissionPhases
 
 
 # 生成闭合圆形航点（含起飞点返回）
+# 在本地ENU平面按米生成圆，再整批精确换算为经纬度（不再使用 1/111111 度/米 近似）
 def generate_circle_waypoints(center_lat, center_lon, radius, num_points=20, altitude=3):
-    waypoints = []
-    angles = np.linspace(0, 2 * np.pi, num_points, endpoint=True)  # 包含2π，闭合圆形
-    # 经纬度换算系数：1米≈1/111111度（经度需按纬度修正）
-    lat_per_m = 1 / 111111.0
-    lon_per_m = 1 / (111111.0 * np.cos(np.radians(center_lat)))
-    
-    for angle in angles:
-        delta_x = radius * np.cos(angle)  # 东向偏移（X轴）
-        delta_y = radius * np.sin(angle)  # 北向偏移（Y轴）
-        lat = center_lat + delta_y * lat_per_m
-        lon = center_lon + delta_x * lon_per_m
-        waypoints.append(MissionItem(
-            lat, lon, altitude, 2.0,  # 纬度、经度、高度、速度（2m/s）
-            True, float('nan'), float('nan'),
-            mission.MissionItem.CameraAction.NONE,
-            float('nan'), 1.0, 0, 0, 0  # 接受半径1米，偏航角0
-        ))
-    
+    east, north, up = circle(radius, num_points, altitude, closed=True)  # 包含2π，闭合圆形
     # 添加起飞点作为最后一个航点，确保返回原点
-    waypoints.append(MissionItem(
-        center_lat, center_lon, altitude, 2.0,
-        True, float('nan'), float('nan'),
-        mission.MissionItem.CameraAction.NONE,
-        float('nan'), 1.0, 0, 0, 0
-    ))
-    return waypoints
+    east = np.append(east, 0.0)
+    north = np.append(north, 0.0)
+    up = np.append(up, altitude)
+    # 以密集采样的圆作为要求的连续路径，报告航点之间直线飞行偏离圆的距离（弦高）
+    path_east, path_north, _ = circle(radius, 720, altitude, closed=True)
+    lat, lon, alt, report = generate_waypoints(center_lat, center_lon, east, north, up,
+                                               path=(path_east, path_north))
+    print(format_report(report))
+    speed = 2.0  # 速度2m/s
+    return to_mission_items(lat, lon, alt, speed)
 
 
 async def run():
@@ -70,18 +58,16 @@ async def run():
         return
     print(f"生成{len(mission_items)}个航点（含返回起飞点）")
 
-    # 解锁并起飞
+    # 解锁并起飞，爬升到起飞高度后再进入任务（不再固定等待）
+    phases = MissionPhases(drone)
     print("-- Arming")
-    await drone.action.arm()
+    await phases.arm()
     print("-- Taking off")
-    await drone.action.takeoff()
-    await asyncio.sleep(5)  # 等待升至目标高度
+    await phases.takeoff()
 
-    # 上传并启动任务
+    # 上传任务
     mission_plan = mission.MissionPlan(mission_items)
     await drone.mission.upload_mission(mission_plan)
-    print("-- 启动航点任务（圆形轨迹+返回原点）")
-    await drone.mission.start_mission()
 
     # 实时记录GPS轨迹（非阻塞异步任务）
     async def record_gps():
@@ -99,20 +85,16 @@ async def run():
     # 启动GPS记录任务
     record_task = asyncio.create_task(record_gps())
 
-    # 监听任务完成状态
-    async for mission_progress in drone.mission.mission_progress():
-        print(f"任务进度：{mission_progress.current}/{mission_progress.total}")
-        if mission_progress.current == mission_progress.total:
-            print("-- 航点任务完成（已返回原点），开始降落")
-            await drone.action.land()
-            record_task.cancel()  # 停止GPS记录
-            break
+    # 启动任务并监听完成状态
+    print("-- 启动航点任务（圆形轨迹+返回原点）")
+    await phases.run_mission(on_progress=lambda p: print(f"任务进度：{p.current}/{p.total}"))
+    print("-- 航点任务完成（已返回原点），开始降落")
+    record_task.cancel()  # 停止GPS记录
 
-    # 等待降落完成
-    async for in_air in drone.telemetry.in_air():
-        if not in_air:
-            print("-- 无人机已降落至起飞点")
-            break
+    # 降落并等待完成
+    await phases.land()
+    print("-- 无人机已降落至起飞点")
+    print(phases.summary())
 
 
 if __name__ == "__main__":
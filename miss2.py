@@ -1,40 +1,39 @@
 #!/usr/bin/env python3
 import asyncio
 import numpy as np
-from mavsdk import System, mission
-from mavsdk.mission import MissionItem
+from mavsdk import mission
+from sim_system import System
+from waypoints import circle, generate_waypoints, format_report, to_mission_items
+from telemetry_logger import TelemetryLogger, export_trajectory_csv
+from telemetry_hub import TelemetryHub
+from preflight import bring_up, default_checks, first
+from mission_phases import MissionPhases, PhaseTimeout, MISSION
+from rate_profile import RateProfile
+from trajectory import circle_mission, fly
+from metrics import Metrics
+
+# 飞行方式: "mission" 上传圆形航点任务；"offboard" 连续轨迹（位置+速度+航向前馈，50Hz 取样发送）
+FLIGHT_MODE = "mission"
+CIRCLE_RADIUS = 5     # 圆半径(米)
+CIRCLE_SPEED = 0.5    # 圆周速度(m/s)
 
 
 # 生成闭合圆形航点（含起飞点返回）
+# 在本地ENU平面按米生成圆，再整批精确换算为经纬度（不再使用 1/111111 度/米 近似）
 def generate_circle_waypoints(center_lat, center_lon, radius, num_points=20, altitude=3):
-    waypoints = []
-    angles = np.linspace(0, 2 * np.pi, num_points, endpoint=True)  # 包含2π，闭合圆形
-    # 经纬度换算系数：1米≈1/111111度（经度需按纬度修正）
-    lat_per_m = 1 / 111111.0
-    lon_per_m = 1 / (111111.0 * np.cos(np.radians(center_lat)))
-    
-    for angle in angles:
-        delta_x = radius * np.cos(angle)  # 东向偏移（X轴）
-        delta_y = radius * np.sin(angle)  # 北向偏移（Y轴）
-        lat = center_lat + delta_y * lat_per_m
-        lon = center_lon + delta_x * lon_per_m
-        waypoints.append(MissionItem(
-            lat, lon, altitude, 0.5,  # 纬度、经度、高度、速度（0.5m/s）
-            True, float('nan'), float('nan'),
-            mission.MissionItem.CameraAction.NONE,
-            float('nan'), 1.0, 0, 0, 0,
-            mission.MissionItem.VehicleAction.NONE
-        ))
-    
+    east, north, up = circle(radius, num_points, altitude, closed=True)  # 包含2π，闭合圆形
     # 添加起飞点作为最后一个航点，确保返回原点
-    waypoints.append(MissionItem(
-        center_lat, center_lon, altitude, 2.0,
-        True, float('nan'), float('nan'),
-        mission.MissionItem.CameraAction.NONE,
-        float('nan'), 1.0, 0, 0, 0,
-        mission.MissionItem.VehicleAction.NONE
-    ))
-    return waypoints
+    east = np.append(east, 0.0)
+    north = np.append(north, 0.0)
+    up = np.append(up, altitude)
+    # 以密集采样的圆作为要求的连续路径，报告航点之间直线飞行偏离圆的距离（弦高）
+    path_east, path_north, _ = circle(radius, 720, altitude, closed=True)
+    lat, lon, alt, report = generate_waypoints(center_lat, center_lon, east, north, up,
+                                               path=(path_east, path_north))
+    print(format_report(report))
+    speed = np.full(len(lat), 0.5)  # 圆周速度0.5m/s
+    speed[-1] = 2.0                 # 返回起飞点速度2m/s
+    return to_mission_items(lat, lon, alt, speed)
 
 
 async def run():
@@ -43,110 +42,137 @@ async def run():
     drone = System(mavsdk_server_address='localhost', port=50051)  #仿真需要注释，真机解开注释
     await drone.connect(system_address="udp://:14540")
     print("等待连接...")
-    
-    # 等待无人机连接
-    async for state in drone.core.connection_state():
-        if state.is_connected:
-            print("-- 连接成功!")
-            break
-
-    # 等待GPS就绪（并确保系统可解锁）
-    print("GPS定点估算...")
-    async for health in drone.telemetry.health():
-        if health.is_global_position_ok and health.is_home_position_ok:
-            print("-- GPS位置就绪")
-            break
-
-    # 等待系统可以解锁（is_armable 为 True）
-    print("等待系统可解锁 (is_armable)...")
-    async for health in drone.telemetry.health():
-        if getattr(health, 'is_armable', False):
-            print("-- 系统可解除锁定")
-            break
-
-    # 获取起飞点GPS坐标（作为圆心和返回点）
-    async for position in drone.telemetry.position():
+
+    # 遥测流只订阅一次，之后所有读取（包括就绪检查）都从分发中心获取；各流频率/延迟/丢弃每10秒打印一次
+    metrics = Metrics()
+    hub = TelemetryHub(drone, metrics=metrics).start()
+    metrics.start_printer(10.0)
+
+    # 任何一步提前返回或出错都停止遥测分发任务和指标打印
+    try:
+        # 连接、GPS/Home 就绪、可解锁 (is_armable)、电池等并发检查
+        report = await bring_up(drone, default_checks(drone, timeout=120.0, require_armable=True, info=False, hub=hub),
+                                timeout=120.0)
+        if not report.ready:
+            print(f"错误：就绪检查未通过: {', '.join(report.failed())}")
+            return
+        # 遥测频率随飞行阶段切换（地面低频、任务中高频）
+        rates = RateProfile(drone, hub)
+        await rates.set_phase('idle', verify=False)
+
+        # 获取起飞点GPS坐标（作为圆心和返回点）
+        position = await hub.get('position')
         center_lat = position.latitude_deg
         center_lon = position.longitude_deg
         takeoff_alt = position.relative_altitude_m + 3  # 起飞后目标高度（相对高度+3米）
         print(f"起飞点坐标：{center_lat:.6f}, {center_lon:.6f}，目标高度：{takeoff_alt}米")
-        break
-
-    # 生成闭合圆形航点（含返回起飞点）
-    mission_items = generate_circle_waypoints(center_lat, center_lon, 5, 20, takeoff_alt)
-    if not mission_items:
-        print("错误：未生成航点！")
-        return
-    print(f"生成{len(mission_items)}个航点（含返回起飞点）")
-
-    # 解锁并起飞（带重试与状态确认）
-    print("-- Arming")
-    armed = False
-    for attempt in range(3):
-        try:
-            await drone.action.arm()
-            # 确认已解锁
-            for _ in range(20):
-                async for is_armed in drone.telemetry.armed():
-                    if is_armed:
-                        armed = True
-                    break
+
+        if FLIGHT_MODE == "mission":
+            # 生成闭合圆形航点（含返回起飞点）
+            mission_items = generate_circle_waypoints(center_lat, center_lon, CIRCLE_RADIUS, 20, takeoff_alt)
+            if not mission_items:
+                print("错误：未生成航点！")
+                return
+            print(f"生成{len(mission_items)}个航点（含返回起飞点）")
+        else:
+            # 以起飞点为原点预先生成连续轨迹，起飞后再平移到当前本地坐标
+            circle_path = circle_mission(CIRCLE_RADIUS, takeoff_alt - position.relative_altitude_m, CIRCLE_SPEED)
+            print(f"生成连续轨迹：{len(circle_path)} 个采样点，时长 {circle_path.duration:.1f} s")
+
+        # 解锁并起飞（带重试与状态确认）
+        print("-- Arming")
+        armed = False
+        for attempt in range(3):
+            try:
+                await drone.action.arm()
+                # 确认已解锁
+                for _ in range(20):
+                    async for is_armed in drone.telemetry.armed():
+                        if is_armed:
+                            armed = True
+                        break
+                    if armed:
+                        break
+                    await asyncio.sleep(0.25)
                 if armed:
+                    print("-- 已解锁 (armed)")
                     break
-                await asyncio.sleep(0.25)
-            if armed:
-                print("-- 已解锁 (armed)")
-                break
-            else:
-                print(f"尝试解锁 {attempt+1} 成功发送命令，但尚未报告解锁，重试...")
-        except Exception as e:
-            print(f"尝试解锁失败 ({attempt+1}): {e}")
-            await asyncio.sleep(1)
-
-    if not armed:
-        print("错误：无法解锁（arming failed / TIMEOUT）。请检查飞控、遥控器安全开关或仿真配置。")
-        return
-
-    print("-- Taking off")
-    await drone.action.takeoff()
-    await asyncio.sleep(10)  # 等待升至目标高度
-
-    # 上传并启动任务
-    mission_plan = mission.MissionPlan(mission_items)
-    await drone.mission.upload_mission(mission_plan)
-    print("-- 启动航点任务（圆形轨迹+返回原点）")
-    await drone.mission.start_mission()
-
-    # 实时记录GPS轨迹（非阻塞异步任务）
-    async def record_gps():
-        with open("gps_trajectory_complete.csv", 'w') as f:
-            f.write("latitude,longitude,altitude,timestamp\n")
-            while True:
-                async for position in drone.telemetry.position():
+                else:
+                    print(f"尝试解锁 {attempt+1} 成功发送命令，但尚未报告解锁，重试...")
+            except Exception as e:
+                print(f"尝试解锁失败 ({attempt+1}): {e}")
+                await asyncio.sleep(1)
+
+        if not armed:
+            print("错误：无法解锁（arming failed / TIMEOUT）。请检查飞控、遥控器安全开关或仿真配置。")
+            return
+
+        # 爬升到起飞高度即进入任务（不再固定等待），超时则降落
+        phases = MissionPhases(drone, hub, rates)
+        print("-- Taking off")
+        try:
+            await phases.takeoff(timeout=30.0)
+        except PhaseTimeout as e:
+            print(f"错误：{e}，降落")
+            await phases.land()
+            return
+
+        if FLIGHT_MODE == "mission":
+            # 上传任务
+            mission_plan = mission.MissionPlan(mission_items)
+            await drone.mission.upload_mission(mission_plan)
+
+        # 实时记录GPS轨迹（非阻塞异步任务）
+        # 写入二进制日志，结束后导出为 gps_trajectory_complete.csv 供绘图脚本使用
+        async def record_gps():
+            logger = TelemetryLogger("gps_trajectory_complete.bin")
+            sub = hub.subscribe('position')
+            try:
+                async for position in sub:  # 每条新位置记录一次，不再逐次重新订阅
                     ts = asyncio.get_event_loop().time()
-                    f.write(f"{position.latitude_deg:.6f},{position.longitude_deg:.6f},{position.relative_altitude_m:.2f},{ts:.2f}\n")
-                    f.flush()
+                    with metrics.time('disk_write'):
+                        logger.append_position(position, ts)
                     print(f"当前位置：{position.latitude_deg:.6f}, {position.longitude_deg:.6f}, 高度：{position.relative_altitude_m:.2f}m")
-                    break
-                await asyncio.sleep(0.1)  # 10Hz记录频率
-
-    # 启动GPS记录任务
-    record_task = asyncio.create_task(record_gps())
-
-    # 监听任务完成状态
-    async for mission_progress in drone.mission.mission_progress():
-        print(f"任务进度：{mission_progress.current}/{mission_progress.total}")
-        if mission_progress.current == mission_progress.total:
-            print("-- 航点任务完成（已返回原点），开始降落")
-            await drone.action.land()
-            record_task.cancel()  # 停止GPS记录
-            break
-
-    # 等待降落完成
-    async for in_air in drone.telemetry.in_air():
-        if not in_air:
-            print("-- 无人机已降落至起飞点")
-            break
+            finally:
+                sub.close()
+                logger.close()
+                export_trajectory_csv(logger.path, "gps_trajectory_complete.csv")
+
+        # 启动GPS记录任务
+        record_task = asyncio.create_task(record_gps())
+
+        if FLIGHT_MODE == "mission":
+            # 启动任务并监听完成状态
+            print("-- 启动航点任务（圆形轨迹+返回原点）")
+            try:
+                await phases.run_mission(on_progress=lambda p: print(f"任务进度：{p.current}/{p.total}"))
+                print("-- 航点任务完成（已返回原点），开始降落")
+            except PhaseTimeout as e:
+                print(f"错误：{e}，直接降落")
+        else:
+            # 起飞点在本地NED中的位置：当前水平位置，高度由相对高度换算
+            ned = (await first(drone.telemetry.position_velocity_ned())).position
+            current = await hub.get('position')
+            origin_down = ned.down_m + current.relative_altitude_m - position.relative_altitude_m
+            print("-- 启动offboard连续轨迹（圆形轨迹+返回原点）")
+            phases.enter(MISSION)
+            try:
+                streamer = await fly(drone, circle_path.shifted(ned.north_m, ned.east_m, origin_down))
+                print(f"-- 轨迹完成：{streamer.summary()}")
+            except Exception as e:
+                print(f"错误：offboard 飞行失败（{e}），直接降落")
+        record_task.cancel()  # 停止GPS记录
+        await asyncio.gather(record_task, return_exceptions=True)  # 等待日志写盘并导出CSV
+
+        # 降落并等待完成
+        await phases.land()
+        print("-- 无人机已降落至起飞点")
+        print(phases.summary())
+        print(metrics.summary())
+        metrics.dump("gps_trajectory_metrics.json")
+    finally:
+        await hub.stop()
+        await metrics.stop_printer()
 
 
 if __name__ == "__main__":
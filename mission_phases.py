@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# 任务阶段状态机：解锁 -> 起飞爬升 -> 航点任务 -> 降落，每个阶段由遥测事件推进（armed / in_air /
+# 高度到达容差 / mission_progress），并设置超时，不再使用固定的 asyncio.sleep
+import asyncio
+import time
+
+from preflight import first
+
+# 阶段名称
+IDLE = 'idle'
+ARMING = 'arming'
+TAKEOFF = 'takeoff'
+HOVER = 'hover'
+MISSION = 'mission'
+LANDING = 'landing'
+LANDED = 'landed'
+
+
+class PhaseTimeout(Exception):
+    """某个阶段在超时时间内没有等到推进条件"""
+
+    def __init__(self, phase, timeout):
+        super().__init__(f"阶段 {phase} 超时（{timeout:.1f} s）")
+        self.phase = phase
+        self.timeout = timeout
+
+
+class MissionPhases:
+    """
+    任务阶段状态机
+
+    参数:
+        drone: mavsdk.System
+        hub: 可选的 TelemetryHub；其中已订阅的遥测流从 hub 读取，其余直接订阅 drone.telemetry
+        rates: 可选的 rate_profile.RateProfile；进入每个阶段时在后台切换该阶段的遥测频率并实测
+        verbose: 是否打印阶段切换
+
+    用法:
+        phases = MissionPhases(drone, hub)
+        await phases.arm()
+        await phases.takeoff(altitude=3.0)
+        await phases.run_mission()
+        await phases.land()
+        print(phases.summary())
+    """
+
+    def __init__(self, drone, hub=None, rates=None, verbose=True):
+        self.drone = drone
+        self.hub = hub
+        self.rates = rates
+        self._rate_task = None
+        self.verbose = verbose
+        self.phase = IDLE
+        self.history = []   # [(阶段, 开始时间, 结束时间)]，时间为 time.monotonic()
+        self._phase_start = time.monotonic()
+
+    def enter(self, phase):
+        """切换到指定阶段并记录上一阶段用时（航点任务以外的飞行方式可直接调用）"""
+        now = time.monotonic()
+        self.history.append((self.phase, self._phase_start, now))
+        if self.verbose:
+            print(f"-- 阶段 {self.phase} -> {phase}（{self.phase} 用时 {now - self._phase_start:.2f} s）")
+        self.phase = phase
+        self._phase_start = now
+        if self.rates is not None:
+            # 频率切换和实测在后台进行，不拖慢阶段推进；上一次未完成的实测直接取消
+            if self._rate_task is not None:
+                self._rate_task.cancel()
+            self._rate_task = asyncio.create_task(self.rates.set_phase(phase))
+
+    async def _wait(self, name, predicate, timeout):
+        try:
+            if self.hub is not None and name in self.hub.streams:
+                return await self.hub.wait_for(name, predicate, timeout)
+            return await asyncio.wait_for(first(getattr(self.drone.telemetry, name)(), predicate), timeout)
+        except asyncio.TimeoutError:
+            raise PhaseTimeout(self.phase, timeout) from None
+
+    async def arm(self, timeout=10.0):
+        """发送解锁命令并等待 armed 为 True"""
+        self.enter(ARMING)
+        await self.drone.action.arm()
+        await self._wait('armed', bool, timeout)
+
+    async def takeoff(self, altitude=None, tolerance=0.3, timeout=30.0):
+        """
+        起飞并等待相对高度到达 altitude - tolerance
+
+        参数:
+            altitude: 目标相对高度(米)；为 None 时使用飞控当前的起飞高度设置
+            tolerance: 高度容差(米)
+            timeout: 超时(秒)
+        """
+        if altitude is None:
+            altitude = await self.drone.action.get_takeoff_altitude()
+        else:
+            await self.drone.action.set_takeoff_altitude(altitude)
+        self.enter(TAKEOFF)
+        await self.drone.action.takeoff()
+        start = time.monotonic()
+        await self._wait('in_air', bool, timeout)
+        position = await self._wait('position', lambda p: p.relative_altitude_m >= altitude - tolerance,
+                                    max(0.0, timeout - (time.monotonic() - start)))
+        if self.verbose:
+            print(f"-- 已到达目标高度 {position.relative_altitude_m:.2f} m（目标 {altitude:.2f} m）")
+        return position
+
+    async def hover(self, seconds):
+        """悬停指定时间（需要固定悬停时长时使用）"""
+        self.enter(HOVER)
+        await asyncio.sleep(seconds)
+
+    async def run_mission(self, timeout=600.0, on_progress=None):
+        """
+        启动已上传的航点任务并等待 mission_progress 到达最后一个航点
+
+        参数:
+            timeout: 超时(秒)
+            on_progress: 可选回调 on_progress(progress)，每次进度更新调用
+        """
+        self.enter(MISSION)
+        await self.drone.mission.start_mission()
+
+        async def done():
+            async for progress in self.drone.mission.mission_progress():
+                if on_progress is not None:
+                    on_progress(progress)
+                if progress.total and progress.current == progress.total:
+                    return progress
+
+        try:
+            return await asyncio.wait_for(done(), timeout)
+        except asyncio.TimeoutError:
+            raise PhaseTimeout(MISSION, timeout) from None
+
+    async def land(self, timeout=60.0):
+        """发送降落命令并等待 in_air 为 False"""
+        self.enter(LANDING)
+        await self.drone.action.land()
+        await self._wait('in_air', lambda in_air: not in_air, timeout)
+        self.enter(LANDED)
+
+    def durations(self):
+        """各阶段用时(秒)，当前阶段计到现在"""
+        result = {}
+        for phase, start, end in self.history + [(self.phase, self._phase_start, time.monotonic())]:
+            result[phase] = result.get(phase, 0.0) + end - start
+        return result
+
+    def summary(self):
+        parts = [f"{phase} {seconds:.2f} s" for phase, seconds in self.durations().items()
+                 if phase not in (IDLE, LANDED)]
+        return "阶段用时: " + " | ".join(parts)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# Offboard 设定点流：在独立的异步任务中按固定频率（20-100 Hz，漂移补偿）持续发送设定点，
+# 目标值从"最新值槽"读取，输入源（stdin / UDP / 轨迹文件）只负责更新槽，不会阻塞发送循环
+# PX4 在约 0.5 s 收不到设定点时会退出 offboard 模式，因此设定点必须持续流式发送
+import asyncio
+import json
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from rate_loop import RateLoop
+
+try:
+    from mavsdk.offboard import PositionNedYaw, VelocityNedYaw
+except ImportError:
+    # 未安装 mavsdk 时（如 sim_system 测试）使用字段相同的替代类型
+    PositionNedYaw = namedtuple('PositionNedYaw', 'north_m east_m down_m yaw_deg')
+    VelocityNedYaw = namedtuple('VelocityNedYaw', 'north_m_s east_m_s down_m_s yaw_deg')
+
+
+class TargetSlot:
+    """
+    最新值槽：写入方直接覆盖，读取方总是拿到最新的目标
+
+    在同一事件循环（或 CPython 的多线程）中，一次属性赋值是原子的，不需要加锁；
+    值为 (版本号, 写入时刻, 设定点) 元组，读取时整体取出，不会读到一半更新的数据
+    """
+
+    def __init__(self, setpoint=None):
+        self._value = (0, time.monotonic(), setpoint)
+
+    def set(self, setpoint):
+        version = self._value[0] + 1
+        self._value = (version, time.monotonic(), setpoint)
+
+    def get(self):
+        """返回 (版本号, 写入时刻, 设定点)"""
+        return self._value
+
+    @property
+    def setpoint(self):
+        return self._value[2]
+
+    @property
+    def version(self):
+        return self._value[0]
+
+
+async def send_setpoint(drone, setpoint):
+    """
+    按设定点类型发送：
+        PositionNedYaw               -> set_position_ned
+        VelocityNedYaw               -> set_velocity_ned
+        (PositionNedYaw, VelocityNedYaw) -> set_position_velocity_ned
+    """
+    if isinstance(setpoint, tuple) and len(setpoint) == 2:
+        await drone.offboard.set_position_velocity_ned(*setpoint)
+    elif hasattr(setpoint, 'north_m_s'):
+        await drone.offboard.set_velocity_ned(setpoint)
+    else:
+        await drone.offboard.set_position_ned(setpoint)
+
+
+class OffboardStreamer:
+    """
+    固定频率 offboard 设定点发送器
+
+    参数:
+        drone: mavsdk.System
+        rate_hz: 发送频率，PX4 要求至少 2 Hz，一般 20-100 Hz
+        slot: TargetSlot，为 None 时新建
+        sender: 发送函数 sender(drone, setpoint)，默认 send_setpoint
+        source: 可选的取样函数 source(t)，t 为从开始发送起的节拍时刻(秒)；给出时每拍由它生成设定点
+                （如 trajectory.Trajectory.setpoint），不再读取 slot
+        window: 抖动统计窗口（保留最近的发送间隔个数）
+
+    用法:
+        streamer = OffboardStreamer(drone, 50)
+        streamer.slot.set(PositionNedYaw(0, 0, -2, 0))
+        await streamer.start()        # 开始发送并切换到 offboard 模式
+        ...                           # 任意位置更新 streamer.slot
+        await streamer.stop()
+    """
+
+    def __init__(self, drone, rate_hz=50.0, slot=None, sender=send_setpoint, source=None, window=1000):
+        self.drone = drone
+        self.rate_hz = rate_hz
+        self.slot = slot if slot is not None else TargetSlot()
+        self.sender = sender
+        self.source = source
+        self.clock = None
+        self.intervals = deque(maxlen=window)   # 相邻两次发送的实际间隔(秒)
+        self.send_times = deque(maxlen=window)  # 每次发送调用耗时(秒)
+        self.sent = 0
+        self.errors = 0
+        self.max_age = 0.0                      # 发送时目标值距上次更新的最长时间
+        self._last_send = None
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        self.clock = RateLoop(self.rate_hz)
+        start = None
+        async for tick in self.clock:
+            if self.source is not None:
+                start = tick if start is None else start
+                updated, setpoint = time.monotonic(), self.source(tick - start)
+            else:
+                _, updated, setpoint = self.slot.get()
+            if setpoint is None:
+                continue
+            now = loop.time()
+            if self._last_send is not None:
+                self.intervals.append(now - self._last_send)
+            self._last_send = now
+            try:
+                await self.sender(self.drone, setpoint)
+                self.sent += 1
+            except Exception as e:
+                self.errors += 1
+                if self.errors <= 3:
+                    print(f"发送设定点失败: {e}")
+            self.send_times.append(loop.time() - now)
+            self.max_age = max(self.max_age, time.monotonic() - updated)
+
+    def run(self):
+        """只启动发送任务（不切换模式）；重复调用无副作用"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def start(self, start_offboard=True):
+        """
+        启动发送任务，发出第一个设定点后切换到 offboard 模式（PX4 要求先有设定点）
+
+        切换失败时停止发送并抛出原异常（OffboardError）
+        """
+        if self.source is None and self.slot.setpoint is None:
+            raise ValueError("启动前需要先在 slot 中设置初始设定点")
+        self.run()
+        while self.sent == 0 and not self._task.done():
+            await asyncio.sleep(0.5 / self.rate_hz)
+        if start_offboard:
+            try:
+                await self.drone.offboard.start()
+            except Exception:
+                await self.stop(stop_offboard=False)
+                raise
+
+    async def stop(self, stop_offboard=True):
+        """退出 offboard 模式（可选）并停止发送任务；退出模式失败时仍停止发送并抛出原异常"""
+        try:
+            if stop_offboard:
+                await self.drone.offboard.stop()
+        finally:
+            if self._task is not None:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+                self._task = None
+
+    def stats(self):
+        """发送频率与抖动统计（抖动 = 实际发送间隔 - 标称周期）"""
+        result = dict(self.clock.stats()) if self.clock is not None else {'target_hz': self.rate_hz}
+        result.update({'sent': self.sent, 'errors': self.errors, 'max_target_age_ms': self.max_age * 1000})
+        if self.intervals:
+            jitter = np.abs(np.asarray(self.intervals) - 1.0 / self.rate_hz) * 1000
+            result.update({
+                'jitter_p50_ms': float(np.percentile(jitter, 50)),
+                'jitter_p99_ms': float(np.percentile(jitter, 99)),
+                'jitter_max_ms': float(jitter.max()),
+            })
+        if self.send_times:
+            send = np.asarray(self.send_times) * 1000
+            result.update({'send_avg_ms': float(send.mean()), 'send_max_ms': float(send.max())})
+        return result
+
+    def summary(self):
+        s = self.stats()
+        text = f"设定点 {s['sent']} 个 | 失败 {s['errors']}"
+        if self.clock is not None:
+            text += " | " + self.clock.summary()
+        if 'jitter_p50_ms' in s:
+            text += (f" | 抖动 p50 {s['jitter_p50_ms']:.2f} ms / p99 {s['jitter_p99_ms']:.2f} ms"
+                     f" / 最大 {s['jitter_max_ms']:.2f} ms | 发送耗时 {s['send_avg_ms']:.2f} ms")
+        return text
+
+
+# ---------------- 输入源：只更新 slot，不阻塞发送循环 ----------------
+def parse_target(text):
+    """
+    解析一条目标: "北 东 高 航向"（高度为正数，向上为正，与 offboard-position.py 的输入一致）
+    或 JSON {"north": , "east": , "up": , "yaw": }，返回 PositionNedYaw，格式错误抛出 ValueError
+    """
+    text = text.strip()
+    if text.startswith('{'):
+        data = json.loads(text)
+        north, east, up, yaw = (float(data.get(k, 0.0)) for k in ('north', 'east', 'up', 'yaw'))
+    else:
+        north, east, up, yaw = map(float, text.replace(',', ' ').split())
+    return PositionNedYaw(north, east, -up, yaw)
+
+
+async def ainput(prompt=""):
+    """在线程中执行 input()，等待键盘输入时事件循环（发送任务）照常运行"""
+    return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+
+
+async def stdin_source(slot, prompt="北 东 高 航向> "):
+    """从标准输入读取目标，输入 q 结束"""
+    while True:
+        line = await ainput(prompt)
+        if line.strip() == 'q':
+            return
+        try:
+            slot.set(parse_target(line))
+        except ValueError:
+            print("输入无效，请重试.")
+
+
+class _TargetProtocol(asyncio.DatagramProtocol):
+    def __init__(self, slot):
+        self.slot = slot
+        self.received = 0
+        self.invalid = 0
+
+    def datagram_received(self, data, addr):
+        try:
+            self.slot.set(parse_target(data.decode('utf-8')))
+            self.received += 1
+        except (ValueError, UnicodeDecodeError):
+            self.invalid += 1
+
+
+async def udp_source(slot, host="0.0.0.0", port=14600):
+    """
+    监听 UDP 目标报文（文本或 JSON，格式同 parse_target），返回 (transport, protocol)；
+    报文在事件循环的回调中直接写入 slot，用 transport.close() 停止
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(lambda: _TargetProtocol(slot), local_addr=(host, port))
+
+
+def load_target_file(path):
+    """读取轨迹文件（CSV: t,north,east,up,yaw，首行表头），返回各列数组"""
+    data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    return data[:, 0], data[:, 1], data[:, 2], data[:, 3], data[:, 4]
+
+
+async def file_source(slot, path, rate_hz=20.0):
+    """按文件中的时间列回放目标点（以 rate_hz 更新 slot，取不晚于当前时间的最后一行）"""
+    t, north, east, up, yaw = load_target_file(path)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    async for now in RateLoop(rate_hz):
+        i = int(np.searchsorted(t, now - start + t[0], side='right')) - 1
+        i = max(i, 0)
+        slot.set(PositionNedYaw(float(north[i]), float(east[i]), -float(up[i]), float(yaw[i])))
+        if i == len(t) - 1:
+            return
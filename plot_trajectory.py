@@ -1,42 +1,199 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
 import numpy as np
 
-# 关键：配置中文字体
-plt.rcParams["font.family"] = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC"]  # 适配不同系统的中文字体
-plt.rcParams["axes.unicode_minus"] = False  # 解决负号显示问题
-
-# 读取CSV文件
-df = pd.read_csv("gps_trajectory_complete.csv")
-
-# 提取数据并转换为NumPy数组
-lat = df["latitude"].to_numpy()
-lon = df["longitude"].to_numpy()
-alt = df["altitude"].to_numpy()
-
-# 采样：每5个点取1个
-sample_interval = 5
-lat_sample = lat[::sample_interval]
-lon_sample = lon[::sample_interval]
-alt_sample = alt[::sample_interval]
-
-# 绘制二维轨迹图
-plt.figure(figsize=(10, 8))
-scatter = plt.scatter(lon_sample, lat_sample, c=alt_sample, cmap="viridis", s=10)
-plt.plot(lon, lat, color="blue", linewidth=1, alpha=0.5)
-plt.scatter(lon[0], lat[0], color="red", s=100, label="起飞点", zorder=5)
-plt.scatter(lon[-1], lat[-1], color="green", s=100, label="降落点", zorder=5)
-
-# 添加颜色条
-cbar = plt.colorbar(scatter)
-cbar.set_label("相对高度 (m)")
-
-# 图表设置（中文标签）
-plt.xlabel("经度 (deg)")
-plt.ylabel("纬度 (deg)")
-plt.title("无人机圆形轨迹飞行图（采样优化）")
-plt.legend()
-plt.grid(True, alpha=0.3)
-plt.axis("equal")
-plt.savefig("trajectory_2d_sampled.png", dpi=300, bbox_inches="tight")
-plt.show()
\ No newline at end of file
+from geodesy import LocalFrame
+
+# 绘图点数上限：任意长度的记录都抽稀到不超过该点数再绘制
+POINT_BUDGET = 5000
+# 分块读取的行数（内存占用与记录长度无关）
+CHUNK_ROWS = 200000
+# 批量模式识别的记录文件后缀
+LOG_SUFFIXES = ('.csv', '.txt', '.bin')
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    分块读取轨迹，逐块返回 (纬度, 经度, 相对高度, 时间戳) 数组
+
+    gps_trajectory_complete.csv 按行分块解析；.bin 为内存映射按块切片；
+    其他格式（log/gps_position_*、X,Y,Z）经 flight_replay.load_log 整体读取后分块
+    """
+    if path.endswith('.bin'):
+        from telemetry_logger import read_log
+        data = read_log(path)
+        for i in range(0, len(data), chunk_rows):
+            chunk = data[i:i + chunk_rows]
+            yield (np.asarray(chunk['latitude']), np.asarray(chunk['longitude']),
+                   np.asarray(chunk['relative_altitude'], dtype=float), np.asarray(chunk['timestamp']))
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.readline().strip()
+        if header == "latitude,longitude,altitude,timestamp":
+            while True:
+                lines = list(islice(f, chunk_rows))
+                if not lines:
+                    return
+                table = np.loadtxt(lines, delimiter=',', ndmin=2)
+                yield table[:, 0], table[:, 1], table[:, 2], table[:, 3]
+
+    from flight_replay import load_log
+    data = load_log(path)
+    for i in range(0, len(data), chunk_rows):
+        chunk = data[i:i + chunk_rows]
+        yield chunk['latitude'], chunk['longitude'], chunk['relative_altitude'].astype(float), chunk['timestamp']
+
+
+def lttb(points, budget):
+    """
+    Largest-Triangle-Three-Buckets 抽稀：按顺序分桶，每桶保留与前一保留点、下一桶均值
+    构成三角形面积最大的点，保留转弯、爬升等形状特征；首尾点始终保留
+
+    参数:
+        points: (N, 3) 或 (N, 2) 米制坐标（ENU），按时间顺序
+        budget: 保留点数上限（>= 3）
+    返回保留点的下标数组
+    """
+    n = len(points)
+    if n <= budget or budget < 3:
+        return np.arange(n)
+    points = np.asarray(points, dtype=float)
+    if points.shape[1] == 2:
+        points = np.column_stack([points, np.zeros(n)])
+    edges = np.linspace(1, n - 1, budget - 1).astype(int)
+    # 各桶均值一次算出（最后一桶为终点）
+    means = np.add.reduceat(points[1:n - 1], edges[:-1] - 1) / np.diff(edges)[:, None]
+    means = np.vstack([means, points[-1]])
+    keep = np.empty(budget, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    selected = points[0]
+    for b in range(budget - 2):
+        lo, hi = edges[b], edges[b + 1]
+        u = points[lo:hi] - selected
+        v = means[b + 1] - selected
+        # 三角形面积 ∝ |u × v|，比较平方即可
+        cx = u[:, 1] * v[2] - u[:, 2] * v[1]
+        cy = u[:, 2] * v[0] - u[:, 0] * v[2]
+        cz = u[:, 0] * v[1] - u[:, 1] * v[0]
+        k = lo + int(np.argmax(cx * cx + cy * cy + cz * cz))
+        keep[b + 1] = k
+        selected = points[k]
+    return keep
+
+
+def decimate_log(path, budget=POINT_BUDGET, chunk_rows=CHUNK_ROWS):
+    """
+    流式读取并抽稀整条记录：每块先抽稀到 budget，累计点数超过 2*budget 时再整体抽稀，
+    内存只与块大小和 budget 有关。抽稀在米制 ENU 坐标（首点为原点）中进行
+
+    返回 (纬度, 经度, 相对高度, 时间戳, 原始点数)
+    """
+    frame = None
+    kept = []        # [(纬度, 经度, 高度, 时间戳, east, north, up)]
+    total = 0
+    for lat, lon, alt, t in read_chunks(path, chunk_rows):
+        if not len(lat):
+            continue
+        total += len(lat)
+        if frame is None:
+            frame = LocalFrame(lat[0], lon[0], 0.0)
+        east, north, up = frame.geodetic_to_enu(lat, lon, alt)
+        enu = np.column_stack([east, north, up])
+        idx = lttb(enu, budget)
+        kept.append(np.column_stack([lat[idx], lon[idx], alt[idx], t[idx], enu[idx]]))
+        if sum(len(k) for k in kept) > 2 * budget:
+            merged = np.concatenate(kept)
+            kept = [merged[lttb(merged[:, 4:], budget)]]
+    if not kept:
+        raise ValueError(f"记录为空: {path}")
+    merged = np.concatenate(kept)
+    merged = merged[lttb(merged[:, 4:], budget)]
+    return merged[:, 0], merged[:, 1], merged[:, 2], merged[:, 3], total
+
+
+def plot_log(path, png_path="trajectory_2d_sampled.png", budget=POINT_BUDGET, show=False):
+    """抽稀后绘制二维轨迹（颜色为相对高度），保存为 PNG，返回 (原始点数, 绘制点数)"""
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # 关键：配置中文字体
+    plt.rcParams["font.family"] = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC"]  # 适配不同系统的中文字体
+    plt.rcParams["axes.unicode_minus"] = False  # 解决负号显示问题
+
+    lat, lon, alt, _, total = decimate_log(path, budget)
+
+    # 绘制二维轨迹图
+    fig = plt.figure(figsize=(10, 8))
+    scatter = plt.scatter(lon, lat, c=alt, cmap="viridis", s=10)
+    plt.plot(lon, lat, color="blue", linewidth=1, alpha=0.5)
+    plt.scatter(lon[0], lat[0], color="red", s=100, label="起飞点", zorder=5)
+    plt.scatter(lon[-1], lat[-1], color="green", s=100, label="降落点", zorder=5)
+
+    # 添加颜色条
+    cbar = plt.colorbar(scatter)
+    cbar.set_label("相对高度 (m)")
+
+    # 图表设置（中文标签）
+    plt.xlabel("经度 (deg)")
+    plt.ylabel("纬度 (deg)")
+    plt.title("无人机圆形轨迹飞行图（采样优化）")
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.axis("equal")
+    plt.savefig(png_path, dpi=300, bbox_inches="tight")
+    if show:
+        plt.show()
+    plt.close(fig)
+    return total, len(lat)
+
+
+def _render(args):
+    path, png_path, budget = args
+    try:
+        total, drawn = plot_log(path, png_path, budget)
+        return path, png_path, total, drawn, None
+    except Exception as e:
+        return path, png_path, 0, 0, str(e)
+
+
+def batch(log_dir, out_dir=None, budget=POINT_BUDGET, workers=None):
+    """
+    无界面批量模式：把目录下所有记录文件并行（多进程）渲染为同名 PNG
+
+    参数:
+        log_dir: 记录目录
+        out_dir: PNG 输出目录，默认与记录相同
+        budget: 每张图的点数上限
+        workers: 进程数，默认 CPU 核数
+    """
+    out_dir = out_dir or log_dir
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(os.path.join(log_dir, name), os.path.join(out_dir, os.path.splitext(name)[0] + ".png"), budget)
+            for name in sorted(os.listdir(log_dir)) if name.endswith(LOG_SUFFIXES)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, png_path, total, drawn, error in pool.map(_render, jobs):
+            if error:
+                print(f"{path}: 失败 - {error}")
+            else:
+                print(f"{path} -> {png_path}（{total} 点 -> {drawn} 点）")
+            results.append((path, png_path, error))
+    return results
+
+
+if __name__ == "__main__":
+    # 用法:
+    #   python plot_trajectory.py [记录文件]                 绘制并显示（默认 gps_trajectory_complete.csv）
+    #   python plot_trajectory.py --batch 目录 [输出目录]     批量渲染为 PNG（多进程，无界面）
+    if len(sys.argv) > 2 and sys.argv[1] == '--batch':
+        batch(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        csv_path = sys.argv[1] if len(sys.argv) > 1 else "gps_trajectory_complete.csv"
+        plot_log(csv_path, "trajectory_2d_sampled.png", show=True)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# 无人机位置 UDP 二进制报文格式（发送端 Get_uav_position_udp.py，接收端 udp_receiver_test.py）
+#
+# 报文头 18 字节（小端）:
+#   magic 'FP' | 版本 u8 | 标志 u8 | 飞机编号 u8 | 样本数 u8 | 首样本序号 u32 | 基准时间 f8(epoch秒)
+# 每个样本 24 字节:
+#   纬度 f8 | 经度 f8 | 高度 f4 | 相对基准时间的偏移 f4(秒)
+# 同一报文内样本序号连续递增，接收端可据此统计丢包
+# 旧版 JSON 报文（{"x1", "y1", "z1", "timestamp"}）仍可解码
+import json
+import struct
+import time
+from collections import namedtuple
+from datetime import datetime
+
+MAGIC = b'FP'
+VERSION = 1
+HEADER = struct.Struct('<2sBBBBId')
+SAMPLE = struct.Struct('<ddff')
+MAX_SAMPLES = 255
+MAX_PACKET_SIZE = HEADER.size + SAMPLE.size * MAX_SAMPLES
+
+# seq 为 None 表示来自旧版 JSON 报文（无序号）
+PositionSample = namedtuple('PositionSample', 'vehicle_id seq timestamp lat lon alt')
+
+
+class PacketEncoder:
+    """
+    把位置样本打包为二进制报文；攒够 batch 个样本或首个样本等待超过 max_delay 秒即输出
+    （超时在 add 或 poll 时检查）
+
+    参数:
+        vehicle_id: 飞机编号（0-255）
+        batch: 每个报文最多携带的样本数
+        max_delay: 样本在编码器中最长停留时间(秒)，batch=1 时无意义
+        fmt: 'binary' 或 'json'（旧格式，每样本一个报文）
+    """
+
+    def __init__(self, vehicle_id=1, batch=1, max_delay=0.2, fmt='binary'):
+        if not 1 <= batch <= MAX_SAMPLES:
+            raise ValueError(f"batch 取值范围 1-{MAX_SAMPLES}: {batch}")
+        if fmt not in ('binary', 'json'):
+            raise ValueError(f"不支持的报文格式: {fmt}")
+        self.vehicle_id = vehicle_id
+        self.batch = batch
+        self.max_delay = max_delay
+        self.fmt = fmt
+        self.seq = 0  # 下一个样本的序号
+        self._pending = []
+
+    def add(self, lat, lon, alt, timestamp=None):
+        """加入一个样本，返回需要发送的报文列表（可能为空）"""
+        if timestamp is None:
+            timestamp = time.time()
+        if self.fmt == 'json':
+            self.seq += 1
+            return [json.dumps({"x1": lat, "y1": lon, "z1": alt,
+                                "timestamp": datetime.fromtimestamp(timestamp).isoformat()}).encode('utf-8')]
+        self._pending.append((lat, lon, alt, timestamp))
+        if len(self._pending) >= self.batch or timestamp - self._pending[0][3] >= self.max_delay:
+            return [self.flush()]
+        return []
+
+    def poll(self, now=None):
+        """
+        检查缓存中的样本是否已等待超过 max_delay 秒，返回需要发送的报文列表（可能为空）；
+        位置流停顿时 add 不会被调用，需由发送端定时调用本方法
+        """
+        now = time.time() if now is None else now
+        if self._pending and now - self._pending[0][3] >= self.max_delay:
+            return [self.flush()]
+        return []
+
+    def flush(self):
+        """立即打包缓存中的样本，无样本时返回 None"""
+        if not self._pending:
+            return None
+        base = self._pending[0][3]
+        buf = bytearray(HEADER.size + SAMPLE.size * len(self._pending))
+        HEADER.pack_into(buf, 0, MAGIC, VERSION, 0, self.vehicle_id, len(self._pending), self.seq, base)
+        offset = HEADER.size
+        for lat, lon, alt, ts in self._pending:
+            SAMPLE.pack_into(buf, offset, lat, lon, alt, ts - base)
+            offset += SAMPLE.size
+        self.seq = (self.seq + len(self._pending)) & 0xFFFFFFFF
+        self._pending = []
+        return bytes(buf)
+
+
+def decode(data):
+    """
+    解码一个 UDP 报文（二进制或旧版 JSON），返回 PositionSample 列表
+
+    格式错误时抛出 ValueError
+    """
+    if data[:2] == MAGIC:
+        if len(data) < HEADER.size:
+            raise ValueError("报文长度不足")
+        _, version, _, vehicle_id, count, seq, base = HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"不支持的报文版本: {version}")
+        if len(data) < HEADER.size + SAMPLE.size * count:
+            raise ValueError("报文样本数据不完整")
+        return [PositionSample(vehicle_id, (seq + i) & 0xFFFFFFFF, base + dt, lat, lon, alt)
+                for i, (lat, lon, alt, dt) in enumerate(SAMPLE.iter_unpack(
+                    memoryview(data)[HEADER.size:HEADER.size + SAMPLE.size * count]))]
+    try:
+        position_data = json.loads(data.decode('utf-8'))
+        timestamp = datetime.fromisoformat(position_data['timestamp']).timestamp()
+        return [PositionSample(position_data.get('vehicle_id', 0), None, timestamp,
+                               position_data['x1'], position_data['y1'], position_data['z1'])]
+    except (UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"无法解析的报文: {e}")
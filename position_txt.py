@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# log/gps_position_*.txt 解析：read_position_continuously 写出的可读文本记录
+#   标题/分隔线/空行
+#   --- 频率统计时间: 2025-10-16 21:39:55.588 | 总读取次数: 11 | 当前频率: 2.11 Hz ---
+#   2025-10-16 21:39:50.547 | 30.5339879 | 104.0011518 | 0.000 | 486.665 | 1 | 2.11
+# 逐行按固定分隔符切分（不用正则），分块生成 NumPy 结构化数组，内存占用与文件长度无关；
+# 数据行转为 telemetry_logger.RECORD_DTYPE（与 .bin 日志、flight_replay.load_log 一致），
+# 穿插的频率统计行单独成为一个序列
+#
+# 用法:
+#   python position_txt.py xxx.txt [输出.bin]
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from telemetry_logger import HEADER, MAGIC, RECORD, RECORD_DTYPE, VERSION
+
+SEPARATOR = ' | '
+STATS_PREFIX = '--- 频率统计'
+# 数据行字段：时间戳, 纬度, 经度, 相对高度, GPS高度, 读取次数, 频率
+DATA_FIELDS = 7
+
+# 频率统计序列：统计时间(epoch秒), 总读取次数, 当前频率(Hz)
+STATS_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('read_count', '<u4'),
+    ('rate_hz', '<f4'),
+])
+
+
+def local_epoch(stamps):
+    """'YYYY-mm-dd HH:MM:SS.fff' 本地时间字符串数组 -> epoch 秒（与记录时的 datetime.now() 一致）"""
+    stamps = np.asarray(stamps)
+    if not len(stamps):
+        return np.zeros(0)
+    naive = (np.array(stamps, dtype='datetime64[ms]') - np.datetime64(0, 'ms')) / np.timedelta64(1, 's')
+    # 用首个时间戳求本地时区偏移，整次飞行内视为不变
+    offset = datetime.strptime(str(stamps[0]), '%Y-%m-%d %H:%M:%S.%f').timestamp() - naive[0]
+    return naive + offset
+
+
+def iter_lines(path):
+    """
+    逐行分类生成 ('data', 字段列表) 或 ('stats', (时间, 总读取次数, 频率))，
+    标题、分隔线、空行和不完整的行（如记录中断时的最后一行）跳过
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith(STATS_PREFIX):
+                parts = line.strip().strip('-').strip().split(SEPARATOR)
+                if len(parts) != 3:
+                    continue
+                stamp, count, rate = (part.partition(': ')[2] for part in parts)
+                yield 'stats', (stamp, count, rate.replace('Hz', '').strip())
+            elif line[:1].isdigit():
+                fields = line.rstrip('\n').split(SEPARATOR)
+                if len(fields) == DATA_FIELDS:
+                    yield 'data', fields
+
+
+def _data_chunk(stamps, rows):
+    table = np.array(rows, dtype=float).reshape(-1, DATA_FIELDS - 1)
+    data = np.zeros(len(stamps), dtype=RECORD_DTYPE)
+    data['timestamp'] = local_epoch(stamps)
+    data['latitude'] = table[:, 0]
+    data['longitude'] = table[:, 1]
+    data['relative_altitude'] = table[:, 2]
+    data['gps_altitude'] = table[:, 3]
+    data['sequence'] = table[:, 4]
+    return data
+
+
+def _stats_chunk(stats):
+    result = np.zeros(len(stats), dtype=STATS_DTYPE)
+    if stats:
+        stamps, counts, rates = zip(*stats)
+        result['timestamp'] = local_epoch(stamps)
+        result['read_count'] = np.array(counts, dtype=float)
+        result['rate_hz'] = np.array(rates, dtype=float)
+    return result
+
+
+def iter_chunks(path, chunk_rows=65536):
+    """
+    分块解析，生成 (数据块 RECORD_DTYPE 数组, 频率统计块 STATS_DTYPE 数组)；
+    每块最多 chunk_rows 条数据行，只在块内缓存字符串
+    """
+    stamps, rows, stats = [], [], []
+    for kind, value in iter_lines(path):
+        if kind == 'data':
+            stamps.append(value[0])
+            rows.append(value[1:])
+            if len(stamps) >= chunk_rows:
+                yield _data_chunk(stamps, rows), _stats_chunk(stats)
+                stamps, rows, stats = [], [], []
+        else:
+            stats.append(value)
+    if stamps or stats:
+        yield _data_chunk(stamps, rows), _stats_chunk(stats)
+
+
+def read_txt(path):
+    """整文件解析，返回 (数据 RECORD_DTYPE 数组, 频率统计 STATS_DTYPE 数组)"""
+    data, stats = [], []
+    for d, s in iter_chunks(path):
+        data.append(d)
+        stats.append(s)
+    if not data:
+        return np.zeros(0, dtype=RECORD_DTYPE), np.zeros(0, dtype=STATS_DTYPE)
+    return np.concatenate(data), np.concatenate(stats)
+
+
+def export_bin(path, bin_path):
+    """分块转换为 telemetry_logger 的二进制日志（可直接用于 read_log / 回放 / 导出 CSV），返回记录条数"""
+    count = 0
+    with open(bin_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0.0))
+        for data, _ in iter_chunks(path):
+            if count == 0 and len(data):
+                # 文件头的开始时间取首条记录时间
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, float(data['timestamp'][0])))
+                f.seek(0, 2)
+            f.write(data.tobytes())
+            count += len(data)
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python position_txt.py xxx.txt [输出.bin]")
+        sys.exit(1)
+    txt_path = sys.argv[1]
+    data, stats = read_txt(txt_path)
+    duration = float(data['timestamp'][-1] - data['timestamp'][0]) if len(data) > 1 else 0.0
+    print(f"{txt_path}: 数据 {len(data)} 条, 时长 {duration:.1f} s, 频率统计 {len(stats)} 条")
+    if len(stats):
+        print(f"统计频率: 平均 {stats['rate_hz'].mean():.2f} Hz, 最低 {stats['rate_hz'].min():.2f} Hz, "
+              f"最高 {stats['rate_hz'].max():.2f} Hz")
+    if len(sys.argv) > 2:
+        print(f"已写入 {export_bin(txt_path, sys.argv[2])} 条记录到 {sys.argv[2]}")
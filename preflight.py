@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# 起飞前就绪检查：连接、GPS/Home、电池、GPS信息、飞控信息等检查并发执行，
+# 每项单独超时 + 总超时，失败的调用按指数退避重试，最后给出结构化的就绪报告
+# 总耗时约等于最慢的一项，而不是各项耗时之和
+import asyncio
+import time
+from collections import namedtuple
+
+# 单项检查定义
+#   name: 名称
+#   run: 无参协程函数，返回检查得到的值；抛出异常表示本次失败（会重试）
+#   timeout: 该项超时(秒)
+#   required: 是否为必需项（必需项失败则 report.ready 为 False）
+Check = namedtuple('Check', 'name run timeout required')
+
+# 单项检查结果
+CheckResult = namedtuple('CheckResult', 'name ok value elapsed attempts error required')
+
+
+async def first(stream, predicate=None):
+    """取异步流中第一个满足 predicate 的值（predicate 为 None 时取第一个值）"""
+    async for value in stream:
+        if predicate is None or predicate(value):
+            return value
+
+
+async def with_backoff(call, base_delay=0.1, max_delay=2.0, factor=2.0, counter=None):
+    """
+    反复调用 call() 直到成功，失败后按 base_delay * factor^n 退避（上限 max_delay）；
+    由外层超时取消。counter 为列表时，counter[0] 记录尝试次数，最近一次异常存入 counter[1]
+    """
+    delay = base_delay
+    while True:
+        if counter is not None:
+            counter[0] += 1
+        try:
+            return await call()
+        except Exception as e:
+            if counter is not None:
+                counter[1] = e
+            await asyncio.sleep(delay)
+            delay = min(delay * factor, max_delay)
+
+
+def telemetry_first(drone, name, predicate=None, hub=None):
+    """
+    遥测流 name 中第一个满足 predicate 的值；hub 中已订阅该流时从 hub 等待，不再另开一条 gRPC 流
+    """
+    if hub is not None and name in hub.streams:
+        return hub.wait_for(name, predicate or (lambda value: True))
+    return first(getattr(drone.telemetry, name)(), predicate)
+
+
+def default_checks(drone, timeout=30.0, require_home=True, require_armable=False, info=True, hub=None):
+    """
+    常用检查项
+
+    参数:
+        drone: mavsdk.System（或 sim_system.SimSystem）
+        timeout: 每项超时(秒)
+        require_home: GPS 检查是否同时要求 Home 点就绪
+        require_armable: 是否要求 health.is_armable
+        info: 是否获取飞行信息/版本/产品信息（非必需项，失败只记录）
+        hub: 可选的已启动 TelemetryHub；health、battery 等已订阅的流从 hub 读取
+    """
+    checks = [
+        Check('connection', lambda: first(drone.core.connection_state(), lambda s: s.is_connected),
+              timeout, True),
+        Check('gps', lambda: telemetry_first(
+                  drone, 'health', lambda h: h.is_global_position_ok and (h.is_home_position_ok or not require_home),
+                  hub),
+              timeout, True),
+        Check('battery', lambda: telemetry_first(drone, 'battery', hub=hub), timeout, True),
+        Check('gps_info', lambda: telemetry_first(drone, 'gps_info', hub=hub), timeout, False),
+    ]
+    if require_armable:
+        checks.append(Check('armable', lambda: telemetry_first(drone, 'health',
+                                                               lambda h: getattr(h, 'is_armable', False), hub),
+                            timeout, True))
+    if info:
+        # 飞控刚连上时 info 接口会返回 InfoError，需要重试
+        checks += [
+            Check('flight_information', lambda: drone.info.get_flight_information(), timeout, False),
+            Check('version', lambda: drone.info.get_version(), timeout, False),
+            Check('product', lambda: drone.info.get_product(), timeout, False),
+        ]
+    return checks
+
+
+class ReadinessReport:
+    """就绪报告：results 为按检查顺序排列的 CheckResult 列表"""
+
+    def __init__(self, results, elapsed):
+        self.results = results
+        self.elapsed = elapsed
+        self.by_name = {r.name: r for r in results}
+
+    @property
+    def ready(self):
+        return all(r.ok for r in self.results if r.required)
+
+    def value(self, name, default=None):
+        r = self.by_name.get(name)
+        return r.value if r is not None and r.ok else default
+
+    def failed(self):
+        return [r.name for r in self.results if not r.ok]
+
+    def stats(self):
+        return {
+            'ready': self.ready,
+            'elapsed': self.elapsed,
+            'checks': {r.name: {'ok': r.ok, 'elapsed': r.elapsed, 'attempts': r.attempts,
+                                'required': r.required, 'error': r.error} for r in self.results},
+        }
+
+    def summary(self):
+        lines = [f"就绪检查: {'通过' if self.ready else '未通过'}，总耗时 {self.elapsed:.2f} s"]
+        for r in self.results:
+            state = "OK" if r.ok else ("失败" if r.required else "跳过")
+            detail = r.value if r.ok else r.error
+            lines.append(f"  {r.name:<20} {state:<4} {r.elapsed:6.2f} s  尝试 {r.attempts} 次  {detail}")
+        return "\n".join(lines)
+
+
+async def _run_check(check, deadline):
+    counter = [0, None]
+    start = time.monotonic()
+    timeout = max(0.0, min(check.timeout, deadline - start))
+    try:
+        value = await asyncio.wait_for(with_backoff(check.run, counter=counter), timeout)
+        return CheckResult(check.name, True, value, time.monotonic() - start, counter[0], None, check.required)
+    except asyncio.TimeoutError:
+        error = f"超时（{timeout:.1f} s）" + (f"，最近错误: {counter[1]}" if counter[1] is not None else "")
+        return CheckResult(check.name, False, None, time.monotonic() - start, counter[0], error, check.required)
+
+
+async def bring_up(drone, checks=None, timeout=30.0, verbose=True, hub=None):
+    """
+    并发执行所有检查，返回 ReadinessReport
+
+    参数:
+        drone: 已调用 connect() 的 System
+        checks: Check 列表，默认 default_checks(drone, hub=hub)
+        timeout: 总超时(秒)，各项超时不会超过总超时
+        verbose: 是否打印每项完成情况和最终报告
+        hub: 可选的已启动 TelemetryHub，只在使用默认检查项时生效
+    """
+    checks = default_checks(drone, hub=hub) if checks is None else checks
+    start = time.monotonic()
+    deadline = start + timeout
+
+    async def run(check):
+        result = await _run_check(check, deadline)
+        if verbose:
+            print(f"-- {check.name}: {'OK' if result.ok else result.error} ({result.elapsed:.2f} s)")
+        return result
+
+    results = await asyncio.gather(*(run(check) for check in checks))
+    report = ReadinessReport(list(results), time.monotonic() - start)
+    if verbose:
+        print(report.summary())
+    return report
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# 固定频率异步循环：按事件循环的单调时钟排期，累计误差不漂移，且不阻塞事件循环
+# 替代在 async 函数里 time.sleep(0.1) 或 asyncio.sleep(固定值) 的写法
+import asyncio
+
+
+class RateLoop:
+    """
+    漂移补偿的固定频率节拍器
+
+    每个节拍的目标时刻为 起始时刻 + n * 周期，而不是 "上次醒来 + 周期"，
+    因此处理耗时不会累积成频率偏低。处理耗时超过一个周期时跳过错过的节拍并计数。
+
+    参数:
+        rate_hz: 目标频率
+        late_tolerance: 醒来时间晚于目标时刻超过该值(秒)记为迟到，默认半个周期
+
+    用法:
+        async for tick_time in RateLoop(10):
+            ...
+    """
+
+    def __init__(self, rate_hz, late_tolerance=None):
+        if rate_hz <= 0:
+            raise ValueError(f"频率必须为正数: {rate_hz}")
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.late_tolerance = self.period / 2 if late_tolerance is None else late_tolerance
+        self.ticks = 0          # 已执行的节拍数
+        self.late = 0           # 迟到的节拍数
+        self.missed = 0         # 因上一拍处理过慢而整拍跳过的节拍数
+        self.max_lateness = 0.0
+        self._start = None
+        self._next = None
+
+    async def wait(self):
+        """等待下一个节拍，返回该节拍的目标时刻（loop.time() 时基）"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._next is None:
+            self._start = self._next = now
+        else:
+            self._next += self.period
+            if now - self._next >= self.period:
+                skipped = int((now - self._next) // self.period)
+                self.missed += skipped
+                self._next += skipped * self.period
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+        lateness = loop.time() - self._next
+        if lateness > self.late_tolerance:
+            self.late += 1
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+        self.ticks += 1
+        return self._next
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.wait()
+
+    def stats(self):
+        """返回节拍统计（实际频率按已运行时间计算）"""
+        elapsed = asyncio.get_running_loop().time() - self._start if self._start is not None else 0.0
+        return {
+            'target_hz': self.rate_hz,
+            'actual_hz': self.ticks / elapsed if elapsed > 0 else 0.0,
+            'ticks': self.ticks,
+            'late': self.late,
+            'missed': self.missed,
+            'max_lateness_ms': self.max_lateness * 1000,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"目标 {s['target_hz']:.1f} Hz | 实际 {s['actual_hz']:.2f} Hz | 节拍 {s['ticks']} | "
+                f"迟到 {s['late']} | 跳过 {s['missed']} | 最大延迟 {s['max_lateness_ms']:.1f} ms")
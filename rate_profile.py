@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# 遥测频率配置：按飞行阶段调用 drone.telemetry.set_rate_xxx 设置位置/姿态/电池等流的频率
+# （地面低频，任务中高频），并实测各流的实际频率，确认飞控确实按要求输出
+# 不设置时 MAVSDK 使用飞控默认频率，位置流常常只有约 2 Hz
+import asyncio
+
+# 各阶段的遥测频率(Hz)，键为 set_rate_ 后面的流名称
+GROUND = {'position': 2.0, 'attitude_euler': 2.0, 'battery': 1.0, 'position_velocity_ned': 2.0}
+CLIMB = {'position': 20.0, 'attitude_euler': 20.0, 'battery': 1.0, 'position_velocity_ned': 20.0}
+MISSION = {'position': 50.0, 'attitude_euler': 30.0, 'battery': 1.0, 'position_velocity_ned': 50.0}
+
+# 阶段名称与 mission_phases.py 一致
+PROFILES = {
+    'idle': GROUND,
+    'arming': GROUND,
+    'takeoff': CLIMB,
+    'hover': CLIMB,
+    'mission': MISSION,
+    'landing': CLIMB,
+    'landed': GROUND,
+}
+
+# 需要实测的流（其余只设置不校验）
+VERIFY_STREAMS = ('position', 'attitude_euler')
+
+
+async def measure_rate(stream, window=2.0, min_samples=3):
+    """
+    订阅异步流 window 秒，按首末样本时间差计算实际频率(Hz)；样本不足时返回 0
+    """
+    loop = asyncio.get_running_loop()
+    stamps = []
+
+    async def collect():
+        async for _ in stream:
+            stamps.append(loop.time())
+
+    try:
+        await asyncio.wait_for(collect(), window)
+    except asyncio.TimeoutError:
+        pass
+    if len(stamps) < min_samples or stamps[-1] <= stamps[0]:
+        return 0.0
+    return (len(stamps) - 1) / (stamps[-1] - stamps[0])
+
+
+class RateProfile:
+    """
+    遥测频率配置管理
+
+    参数:
+        drone: mavsdk.System
+        hub: 可选的 TelemetryHub；已在 hub 中订阅的流按 hub 的计数实测，不再额外订阅
+        profiles: {阶段: {流名称: 频率}}，默认 PROFILES
+        tolerance: 实测频率低于请求值的 (1 - tolerance) 倍视为未达标
+        verify_window: 每次实测的时长(秒)
+        verbose: 是否打印设置与校验结果
+    """
+
+    def __init__(self, drone, hub=None, profiles=PROFILES, tolerance=0.2, verify_window=2.0, verbose=True):
+        self.drone = drone
+        self.hub = hub
+        self.profiles = profiles
+        self.tolerance = tolerance
+        self.verify_window = verify_window
+        self.verbose = verbose
+        self.phase = None
+        self.requested = {}   # 当前请求的频率
+        self.observed = {}    # 最近一次实测频率
+        self.failed = {}      # set_rate 调用失败的流 -> 错误信息
+
+    async def apply(self, phase):
+        """并发设置该阶段所有流的频率，返回设置失败的流名称列表"""
+        rates = self.profiles[phase]
+        self.phase = phase
+
+        async def set_rate(name, hz):
+            try:
+                await getattr(self.drone.telemetry, f"set_rate_{name}")(hz)
+                self.requested[name] = hz
+                self.failed.pop(name, None)
+            except Exception as e:
+                self.failed[name] = str(e)
+
+        await asyncio.gather(*(set_rate(name, hz) for name, hz in rates.items()))
+        failed = [name for name in rates if name in self.failed]
+        if self.verbose:
+            text = ", ".join(f"{name} {hz:g} Hz" for name, hz in rates.items())
+            print(f"-- 遥测频率[{phase}]: {text}" + (f"（设置失败: {', '.join(failed)}）" if failed else ""))
+        return failed
+
+    async def verify(self, streams=VERIFY_STREAMS):
+        """
+        并发实测各流频率，返回 {流名称: (请求频率, 实测频率, 是否达标)}
+        """
+        names = [name for name in streams if name in self.requested]
+
+        async def observe(name):
+            if self.hub is not None and name in self.hub.streams:
+                count = self.hub.count(name)
+                await asyncio.sleep(self.verify_window)
+                return (self.hub.count(name) - count) / self.verify_window
+            return await measure_rate(getattr(self.drone.telemetry, name)(), self.verify_window)
+
+        observed = await asyncio.gather(*(observe(name) for name in names))
+        report = {}
+        for name, hz in zip(names, observed):
+            self.observed[name] = hz
+            requested = self.requested[name]
+            report[name] = (requested, hz, hz >= requested * (1 - self.tolerance))
+        if self.verbose:
+            for name, (requested, hz, ok) in report.items():
+                flag = "" if ok else "  <-- 未达到请求频率（链路带宽或飞控参数限制）"
+                print(f"   {name}: 请求 {requested:g} Hz，实测 {hz:.1f} Hz{flag}")
+        return report
+
+    async def set_phase(self, phase, verify=True):
+        """切换到某阶段的频率配置，verify 为 True 时随后实测；未配置或配置与当前相同的阶段忽略"""
+        if phase not in self.profiles:
+            return None
+        if self.phase is not None and self.profiles[phase] == self.profiles[self.phase]:
+            self.phase = phase
+            return None
+        await self.apply(phase)
+        if verify:
+            return await self.verify()
+        return None
+
+    def stats(self):
+        return {
+            'phase': self.phase,
+            'requested': dict(self.requested),
+            'observed': dict(self.observed),
+            'failed': dict(self.failed),
+        }
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+# 本地 MAVSDK 替身：不需要 mavsdk_server 和飞控即可运行脚本，用于性能和回归测试
+# 实现脚本中用到的 core / telemetry / action / mission / offboard / info 接口，
+# 位置等遥测按可配置频率（1 Hz - 1 kHz）由运动学模型或录制的轨迹生成
+#
+# 脚本中用 `from sim_system import System` 代替 `from mavsdk import System`：
+#   环境变量 F450_SIM 未设置时仍返回真实的 mavsdk.System
+#   F450_SIM=1           使用运动学模型
+#   F450_SIM=xxx.csv     回放录制的轨迹（flight_replay.py 支持的任一记录格式）
+#   F450_SIM_RATE=50     位置流频率(Hz)
+import asyncio
+import enum
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from geodesy import LocalFrame
+from rate_loop import RateLoop
+
+# ---------------- 遥测数据类型（字段名与 mavsdk 保持一致） ----------------
+ConnectionState = namedtuple('ConnectionState', 'uuid is_connected')
+Position = namedtuple('Position', 'latitude_deg longitude_deg absolute_altitude_m relative_altitude_m')
+EulerAngle = namedtuple('EulerAngle', 'roll_deg pitch_deg yaw_deg timestamp_us')
+Battery = namedtuple('Battery', 'id temperature_degc voltage_v current_battery_a '
+                                'capacity_consumed_ah remaining_percent')
+Health = namedtuple('Health', 'is_gyrometer_calibration_ok is_accelerometer_calibration_ok '
+                              'is_magnetometer_calibration_ok is_local_position_ok '
+                              'is_global_position_ok is_home_position_ok is_armable')
+GpsInfo = namedtuple('GpsInfo', 'num_satellites fix_type')
+PositionNed = namedtuple('PositionNed', 'north_m east_m down_m')
+VelocityNed = namedtuple('VelocityNed', 'north_m_s east_m_s down_m_s')
+PositionVelocityNed = namedtuple('PositionVelocityNed', 'position velocity')
+MissionProgress = namedtuple('MissionProgress', 'current total')
+StatusText = namedtuple('StatusText', 'type text')
+FlightInfo = namedtuple('FlightInfo', 'time_boot_ms flight_uid')
+Version = namedtuple('Version', 'flight_sw_major flight_sw_minor flight_sw_patch')
+Product = namedtuple('Product', 'vendor_id vendor_name product_id product_name')
+
+
+class LandedState(enum.Enum):
+    UNKNOWN = 0
+    ON_GROUND = 1
+    IN_AIR = 2
+    TAKING_OFF = 3
+    LANDING = 4
+
+
+class OffboardError(Exception):
+    """与 mavsdk.offboard.OffboardError 相同的用法：error._result.result"""
+
+    def __init__(self, result, message=""):
+        super().__init__(message)
+        self._result = namedtuple('OffboardResult', 'result result_str')(result, message)
+
+
+# 默认遥测频率(Hz)
+DEFAULT_RATES = {
+    'position': 10.0,
+    'attitude_euler': 10.0,
+    'battery': 1.0,
+    'health': 1.0,
+    'in_air': 5.0,
+    'armed': 5.0,
+    'landed_state': 5.0,
+    'gps_info': 1.0,
+    'position_velocity_ned': 10.0,
+    'mission_progress': 5.0,
+    'connection_state': 1.0,
+}
+
+# 默认起飞点（log/gps_position_20251016_213634.csv 的记录位置）
+DEFAULT_HOME = (30.5339964, 104.0011512, 486.664)
+
+
+class KinematicModel:
+    """
+    简单运动学模型（NED，米）：朝当前目标点以限定速度直线运动
+
+    参数:
+        horizontal_speed: 默认水平速度(m/s)，任务航点给出速度时以航点为准
+        climb_rate / descent_rate: 上升/下降速度(m/s)
+    """
+
+    def __init__(self, horizontal_speed=5.0, climb_rate=2.0, descent_rate=1.0):
+        self.horizontal_speed = horizontal_speed
+        self.climb_rate = climb_rate
+        self.descent_rate = descent_rate
+        self.position = np.zeros(3)
+        self.velocity = np.zeros(3)
+        self.yaw_deg = 0.0
+        self.armed = False
+        self.mode = 'idle'          # idle / takeoff / hold / mission / land / offboard / rtl
+        self.target = np.zeros(3)
+        self.speed = horizontal_speed
+        self.takeoff_altitude = 2.5
+        self.rtl_altitude = 30.0
+        self.battery = 100.0
+        self.mission = []           # [(ned数组, 速度, 接受半径)]
+        self.mission_current = 0
+        self.offboard_position = None
+        self.offboard_velocity = None
+        self.offboard_yaw = None
+
+    @property
+    def in_air(self):
+        return self.position[2] < -0.1 or self.mode in ('takeoff',)
+
+    def landed_state(self):
+        if self.mode == 'takeoff':
+            return LandedState.TAKING_OFF
+        if self.mode == 'land' and self.in_air:
+            return LandedState.LANDING
+        return LandedState.IN_AIR if self.in_air else LandedState.ON_GROUND
+
+    def _reached(self, radius=0.3):
+        return np.linalg.norm(self.target - self.position) <= radius
+
+    def step(self, dt):
+        if not self.armed:
+            self.velocity[:] = 0.0
+            return
+        if self.mode == 'takeoff':
+            self.target = np.array([self.position[0], self.position[1], -self.takeoff_altitude])
+            if self._reached(0.1):
+                self.mode = 'hold'
+        elif self.mode == 'mission':
+            if self.mission_current < len(self.mission):
+                ned, speed, radius = self.mission[self.mission_current]
+                self.target = ned
+                self.speed = speed if speed > 0 else self.horizontal_speed
+                if self._reached(max(radius, 0.3)):
+                    self.mission_current += 1
+            else:
+                self.mode = 'hold'
+        elif self.mode == 'land':
+            self.target = np.array([self.position[0], self.position[1], 0.0])
+        elif self.mode == 'rtl':
+            if np.hypot(*self.position[:2]) > 0.3:
+                self.target = np.array([0.0, 0.0, min(self.position[2], -self.rtl_altitude)])
+                if abs(self.position[2] - self.target[2]) < 0.3:
+                    self.target[:2] = 0.0
+            else:
+                self.mode = 'land'
+        elif self.mode == 'offboard':
+            if self.offboard_velocity is not None:
+                self.target = self.position + self.offboard_velocity * dt
+            elif self.offboard_position is not None:
+                self.target = self.offboard_position
+            if self.offboard_yaw is not None:
+                self.yaw_deg = self.offboard_yaw
+
+        delta = self.target - self.position
+        horizontal = np.hypot(delta[0], delta[1])
+        max_h = (self.speed if self.mode == 'mission' else self.horizontal_speed) * dt
+        if horizontal > max_h:
+            delta[:2] *= max_h / horizontal
+        delta[2] = np.clip(delta[2], -self.climb_rate * dt, self.descent_rate * dt)
+        self.velocity = delta / dt
+        self.position = self.position + delta
+        if horizontal > 0.05:
+            self.yaw_deg = float(np.degrees(np.arctan2(delta[1], delta[0])))
+        if self.position[2] > 0:
+            self.position[2] = 0.0
+        if self.mode == 'land' and self.position[2] >= -0.01:
+            self.mode = 'idle'
+            self.armed = False
+        if self.in_air:
+            self.battery = max(0.0, self.battery - 0.02 * dt)
+
+
+class _Plugin:
+    def __init__(self, system):
+        self._system = system
+
+
+class Core(_Plugin):
+    async def connection_state(self):
+        async for _ in self._system._ticks('connection_state'):
+            yield ConnectionState(1, self._system._connected)
+
+
+class Telemetry(_Plugin):
+    """遥测流：每个流按 self._system.rates 中的频率输出，调用 set_rate_xxx 可修改"""
+
+    def _stream(self, name, make):
+        async def gen():
+            async for _ in self._system._ticks(name):
+                self._system.emitted[name] = self._system.emitted.get(name, 0) + 1
+                yield make()
+        return gen()
+
+    def position(self):
+        return self._stream('position', self._system._position)
+
+    def attitude_euler(self):
+        return self._stream('attitude_euler', lambda: EulerAngle(
+            0.0, 0.0, self._system.model.yaw_deg, int(self._system.time() * 1e6)))
+
+    def battery(self):
+        return self._stream('battery', lambda: Battery(
+            0, 25.0, 12.6 - 0.024 * (100 - self._system.model.battery), 0.0, 0.0,
+            self._system.model.battery))
+
+    def health(self):
+        return self._stream('health', lambda: Health(True, True, True, True, True, True,
+                                                     not self._system.model.armed))
+
+    def in_air(self):
+        return self._stream('in_air', self._system._in_air)
+
+    def armed(self):
+        return self._stream('armed', lambda: self._system.model.armed)
+
+    def landed_state(self):
+        return self._stream('landed_state', self._system.model.landed_state)
+
+    def gps_info(self):
+        return self._stream('gps_info', lambda: GpsInfo(18, 3))
+
+    def position_velocity_ned(self):
+        def make():
+            p, v = self._system.model.position, self._system.model.velocity
+            return PositionVelocityNed(PositionNed(*p.tolist()), VelocityNed(*v.tolist()))
+        return self._stream('position_velocity_ned', make)
+
+    async def status_text(self):
+        while True:
+            yield await self._system._status.get()
+
+    def __getattr__(self, name):
+        # set_rate_position / set_rate_attitude_euler / set_rate_battery ...
+        if name.startswith('set_rate_'):
+            stream = name[len('set_rate_'):]
+            stream = {'attitude': 'attitude_euler'}.get(stream, stream)
+
+            async def set_rate(rate_hz):
+                self._system.rates[stream] = float(rate_hz)
+            return set_rate
+        raise AttributeError(name)
+
+
+class Action(_Plugin):
+    async def arm(self):
+        self._system.model.armed = True
+
+    async def disarm(self):
+        self._system.model.armed = False
+        self._system.model.mode = 'idle'
+
+    async def set_takeoff_altitude(self, altitude):
+        self._system.model.takeoff_altitude = float(altitude)
+
+    async def get_takeoff_altitude(self):
+        return self._system.model.takeoff_altitude
+
+    async def takeoff(self):
+        self._system.model.mode = 'takeoff'
+        self._system._status_text('INFO', 'Takeoff detected')
+
+    async def land(self):
+        self._system.model.mode = 'land'
+
+    async def hold(self):
+        self._system.model.mode = 'hold'
+        self._system.model.target = self._system.model.position.copy()
+
+    async def return_to_launch(self):
+        self._system.model.mode = 'rtl'
+
+    async def set_return_to_launch_altitude(self, altitude):
+        self._system.model.rtl_altitude = float(altitude)
+
+    async def get_return_to_launch_altitude(self):
+        return self._system.model.rtl_altitude
+
+
+class Mission(_Plugin):
+    async def upload_mission(self, mission_plan):
+        items = mission_plan.mission_items
+        frame = self._system.frame
+        lat = np.array([item.latitude_deg for item in items])
+        lon = np.array([item.longitude_deg for item in items])
+        alt = np.array([item.relative_altitude_m for item in items])
+        north, east, down = frame.geodetic_to_ned(lat, lon, alt + frame.alt0)
+        self._system.model.mission = [
+            (np.array([n, e, d]), float(item.speed_m_s), float(item.acceptance_radius_m or 0.0))
+            for n, e, d, item in zip(north.tolist(), east.tolist(), down.tolist(), items)]
+        self._system.model.mission_current = 0
+
+    async def start_mission(self):
+        self._system.model.mode = 'mission'
+
+    async def pause_mission(self):
+        await self._system.action.hold()
+
+    async def clear_mission(self):
+        self._system.model.mission = []
+        self._system.model.mission_current = 0
+
+    async def set_return_to_launch_after_mission(self, enable):
+        pass
+
+    async def mission_progress(self):
+        last = None
+        async for _ in self._system._ticks('mission_progress'):
+            progress = MissionProgress(self._system.model.mission_current, len(self._system.model.mission))
+            if progress != last:
+                last = progress
+                yield progress
+
+
+class Offboard(_Plugin):
+    async def set_position_ned(self, position_ned_yaw):
+        m = self._system.model
+        m.offboard_position = np.array([position_ned_yaw.north_m, position_ned_yaw.east_m,
+                                        position_ned_yaw.down_m])
+        m.offboard_velocity = None
+        m.offboard_yaw = position_ned_yaw.yaw_deg
+
+    async def set_velocity_ned(self, velocity_ned_yaw):
+        m = self._system.model
+        m.offboard_velocity = np.array([velocity_ned_yaw.north_m_s, velocity_ned_yaw.east_m_s,
+                                        velocity_ned_yaw.down_m_s])
+        m.offboard_yaw = velocity_ned_yaw.yaw_deg
+
+    async def set_position_velocity_ned(self, position_ned_yaw, velocity_ned_yaw):
+        # 简化：以位置为目标（速度作为前馈在运动学模型中忽略）
+        await self.set_position_ned(position_ned_yaw)
+        self._system.setpoints += 1
+
+    async def start(self):
+        m = self._system.model
+        if m.offboard_position is None and m.offboard_velocity is None:
+            raise OffboardError('NO_SETPOINT_SET', "start() 前需要先发送一次设定点")
+        m.mode = 'offboard'
+
+    async def stop(self):
+        m = self._system.model
+        m.mode = 'hold'
+        m.target = m.position.copy()
+
+    async def is_active(self):
+        return self._system.model.mode == 'offboard'
+
+
+class Info(_Plugin):
+    async def get_flight_information(self):
+        return FlightInfo(int(self._system.time() * 1000), 0)
+
+    async def get_version(self):
+        return Version(1, 14, 0)
+
+    async def get_product(self):
+        return Product(0, 'sim', 0, 'F450-sim')
+
+
+class SimSystem:
+    """
+    模拟的 mavsdk.System
+
+    参数:
+        home: 起飞点 (纬度, 经度, GPS高度)
+        rates: 遥测频率，覆盖 DEFAULT_RATES 中的项，如 {'position': 200}
+        sim_rate: 运动学模型积分频率(Hz)
+        recorded: 回放的轨迹 (时间戳, 纬度, 经度, 相对高度) 数组元组，给出时位置不再由模型生成
+        noise_m: 位置高斯噪声标准差(米)，随机种子固定，结果可复现
+        mavsdk_server_address / port: 与 mavsdk.System 参数兼容，忽略
+    """
+
+    def __init__(self, mavsdk_server_address=None, port=None, home=DEFAULT_HOME, rates=None,
+                 sim_rate=100.0, recorded=None, noise_m=0.0, seed=0):
+        self.frame = LocalFrame(*home)
+        self.rates = dict(DEFAULT_RATES)
+        self.rates.update(rates or {})
+        self.sim_rate = sim_rate
+        self.model = KinematicModel()
+        self.recorded = recorded
+        self.noise_m = noise_m
+        self._rng = np.random.default_rng(seed)
+        self._connected = False
+        self._start = None
+        self._task = None
+        self._status = asyncio.Queue()
+        self.emitted = {}     # 各遥测流已输出的样本数
+        self.setpoints = 0    # 收到的 offboard 位置+速度设定点数
+
+        self.core = Core(self)
+        self.telemetry = Telemetry(self)
+        self.action = Action(self)
+        self.mission = Mission(self)
+        self.offboard = Offboard(self)
+        self.info = Info(self)
+
+    async def connect(self, system_address=None):
+        loop = asyncio.get_running_loop()
+        self._start = loop.time()
+        self._connected = True
+        if self._task is None:
+            self._task = asyncio.create_task(self._simulate())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def time(self):
+        """仿真时间（秒，从 connect 开始，基于事件循环单调时钟）"""
+        if self._start is None:
+            return 0.0
+        return asyncio.get_running_loop().time() - self._start
+
+    async def _simulate(self):
+        dt = 1.0 / self.sim_rate
+        async for _ in RateLoop(self.sim_rate):
+            self.model.step(dt)
+
+    async def _ticks(self, name):
+        # 按当前配置频率产生节拍；频率被 set_rate_xxx 修改后重新排期
+        while True:
+            rate = self.rates.get(name, 1.0)
+            clock = RateLoop(rate)
+            async for _ in clock:
+                yield
+                if self.rates.get(name, 1.0) != rate:
+                    break
+
+    def _status_text(self, kind, text):
+        self._status.put_nowait(StatusText(kind, text))
+
+    def _recorded_sample(self):
+        ts, lat, lon, rel = self.recorded
+        t = ts[0] + self.time() % max(ts[-1] - ts[0], 1e-9)
+        return (float(np.interp(t, ts, lat)), float(np.interp(t, ts, lon)), float(np.interp(t, ts, rel)))
+
+    def _position(self):
+        if self.recorded is not None:
+            lat, lon, rel = self._recorded_sample()
+            return Position(lat, lon, rel + self.frame.alt0, rel)
+        north, east, down = self.model.position
+        if self.noise_m:
+            north, east, down = np.array([north, east, down]) + self._rng.normal(0, self.noise_m, 3)
+        lat, lon, alt = self.frame.ned_to_geodetic(north, east, down)
+        return Position(float(lat), float(lon), float(alt), float(alt) - self.frame.alt0)
+
+    def _in_air(self):
+        if self.recorded is not None:
+            return self._recorded_sample()[2] > 0.3
+        return self.model.in_air
+
+
+def load_recorded(path):
+    """读取飞行记录（flight_replay.load_log 支持的任一格式），返回 recorded 参数所需的数组元组"""
+    from flight_replay import load_log
+
+    data = load_log(path)
+    return (data['timestamp'], data['latitude'], data['longitude'],
+            data['relative_altitude'].astype(float))
+
+
+def System(*args, **kwargs):
+    """
+    按环境变量 F450_SIM 选择真实 mavsdk.System 或 SimSystem（参数与 mavsdk.System 相同）
+    """
+    sim = os.environ.get('F450_SIM')
+    if not sim:
+        from mavsdk import System as MavsdkSystem
+        return MavsdkSystem(*args, **kwargs)
+    rates = {}
+    if os.environ.get('F450_SIM_RATE'):
+        rates['position'] = float(os.environ['F450_SIM_RATE'])
+    if sim in ('1', 'true', 'kinematic'):
+        return SimSystem(*args, rates=rates, **kwargs)
+    recorded = load_recorded(sim)
+    home = (recorded[1][0], recorded[2][0], DEFAULT_HOME[2])
+    return SimSystem(*args, rates=rates, recorded=recorded, home=home, **kwargs)
@@ -3,7 +3,7 @@
 import asyncio
 from mavsdk import System
 from mavsdk.offboard import PositionNedYaw
-from mavsdk.info import InfoError
+from preflight import bring_up, default_checks, first
 
 async def run():
     drone = System()
@@ -11,82 +11,25 @@ async def run():
     await drone.connect(system_address="udp://:14445")
     status_text_task = asyncio.ensure_future(print_status_text(drone))
     print("等待连接...")
-    async for state in drone.core.connection_state():
-        if state.is_connected:
-            print(f"-- 连接成功!")
-            break
-    print("GPS定点估算...")
-    # async for health in drone.telemetry.health():
-    #     if health.is_global_position_ok and health.is_home_position_ok:
-    #         print("-- GPS位置就绪")
-            # break
-        
-    #获取坐标
-    # global_origin = await drone.telemetry.get_gps_global_origin()
-    # g = global_origin.altitude_m
-    # x = global_origin.latitude_deg
-    # y = global_origin.longitude_deg
-    # print(g,x,y)
-    #获取无人机信息
-    # x3 = await drone.info.get_flight_information()
-    # print(x3)
-    # y3 =await drone.info.get_version()
-    # print(y3)
-    # z3= await drone.info.get_product()
-    # print(z3)
-    # 获取无人机信息（添加重试机制）
-    max_retries = 10
-    retry_delay = 1  # 每次重试间隔1秒
-    x3 = None
-    for _ in range(max_retries):
-        try:
-            x3 = await drone.info.get_flight_information()
-            break
-        except InfoError:
-            await asyncio.sleep(retry_delay)
-    if x3:
-        print(x3)
-    else:
-        print("无法获取飞行信息")
-    
-    # 获取版本信息（同理添加重试）
-    y3 = None
-    for _ in range(max_retries):
-        try:
-            y3 = await drone.info.get_version()
-            break
-        except InfoError:
-            await asyncio.sleep(retry_delay)
-    if y3:
-        print(y3)
-    else:
-        print("无法获取版本信息")
-    
-    # 获取产品信息（同理添加重试）
-    z3 = None
-    for _ in range(max_retries):
-        try:
-            z3 = await drone.info.get_product()
-            break
-        except InfoError:
-            await asyncio.sleep(retry_delay)
-    if z3:
-        print(z3)
-    else:
-        print("无法获取产品信息")
-        
+    # 连接、电池、GPS信息及飞控信息（InfoError 时指数退避重试）并发检查；本脚本不等待GPS定位
+    checks = [check for check in default_checks(drone) if check.name != 'gps']
+    report = await bring_up(drone, checks, timeout=60.0)
+    if not report.ready:
+        print(f"就绪检查未通过: {', '.join(report.failed())}")
+        status_text_task.cancel()
+        await asyncio.gather(status_text_task, return_exceptions=True)
+        return
+    for name, label in (('flight_information', "飞行信息"), ('version', "版本信息"), ('product', "产品信息")):
+        value = report.value(name)
+        print(value if value is not None else f"无法获取{label}")
+
     #电池电压百分比
-    async for bat in drone.telemetry.battery():
-        x4 = bat.voltage_v
-        y4 = bat.remaining_percent*100
-        print('%.2f'%x4,"V",'%.1f'%y4,"%")
-        break
+    bat = report.value('battery')
+    print('%.2f'%bat.voltage_v,"V",'%.1f'%(bat.remaining_percent*100),"%")
     #GPS状态及卫星数量
-    async for a1 in drone.telemetry.gps_info(): 
-        x5=a1.fix_type
-        y5=a1.num_satellites
-        print("gps：",x5,y5)
-        break
+    a1 = report.value('gps_info')
+    if a1 is not None:
+        print("gps：",a1.fix_type,a1.num_satellites)
     #解锁起飞降落等指令
     await drone.action.set_takeoff_altitude(2)
     print("-- Arming")
@@ -123,22 +66,20 @@ async def run():
     #     break
     # 获取更新GPS时间，经纬度等
 #获取当前位置航向信息
-async def send_position_data(drone):
-    # 删除重复的 drone = System()
-    async for position_data in drone.telemetry.position_velocity_ned():
-        current_position = position_data.position
-        async for heading in drone.telemetry.attitude_euler():
-            print(f"Heading: {heading.yaw_deg}")
-            # 注意：这里需要在循环内创建 PositionNedYaw，否则 heading 未定义
-            position_ned_yaw = PositionNedYaw(
-                north_m=current_position.north_m,
-                east_m=current_position.east_m,
-                down_m=current_position.down_m,
-                yaw_deg=heading.yaw_deg
-            )
-            # 注意：set_rate_position_velocity_ned 是设置更新频率，不是发布位置
-            await drone.telemetry.set_rate_position_velocity_ned(10)  # 设置10Hz更新
-        break  # 避免无限循环
+# set_rate_position_velocity_ned 只设置更新频率（设置一次即可），不是发布位置；
+# 返回当前位置和航向组成的 PositionNedYaw（例如作为 offboard 的初始设定点）
+async def send_position_data(drone, rate_hz=10):
+    await drone.telemetry.set_rate_position_velocity_ned(rate_hz)
+    position_data = await first(drone.telemetry.position_velocity_ned())
+    heading = await first(drone.telemetry.attitude_euler())
+    print(f"Heading: {heading.yaw_deg}")
+    current_position = position_data.position
+    return PositionNedYaw(
+        north_m=current_position.north_m,
+        east_m=current_position.east_m,
+        down_m=current_position.down_m,
+        yaw_deg=heading.yaw_deg
+    )
 
 async def print_status_text(drone):
     # drone = System()
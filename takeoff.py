@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 
 import asyncio
-from mavsdk import System
+from sim_system import System
 from mavsdk.offboard import PositionNedYaw
 from mavsdk.action import ActionError
+from mission_phases import MissionPhases, PhaseTimeout
+from preflight import first
 
 async def run():
     drone = System()
@@ -53,13 +55,18 @@ async def run():
     #解锁起飞降落等指令
     # await drone.action.set_takeoff_altitude(2)
 
-    print("-- Arming")
-    await drone.action.arm()
-    print("-- Taking off")
-    await drone.action.takeoff()
-    await asyncio.sleep(10)
+    # 按遥测事件推进：解锁确认 -> 爬升到起飞高度 -> 降落至 in_air 为 False
+    phases = MissionPhases(drone)
+    try:
+        print("-- Arming")
+        await phases.arm()
+        print("-- Taking off")
+        await phases.takeoff()
+    except PhaseTimeout as e:
+        print(f"{e}，直接降落")
     print("-- Landing")
-    await drone.action.land()
+    await phases.land()
+    print(phases.summary())
     #电池电压百分比
     async for bat in drone.telemetry.battery():
         x4 = bat.voltage_v
@@ -85,22 +92,21 @@ async def run():
     #     break
     # 获取更新GPS时间，经纬度等
 #获取当前位置航向信息
-async def send_position_data(drone):
-    drone = System()
-    async for position_data in drone.telemetry.position_velocity_ned():
-        # 获取当前位置和航向信息
-        current_position = position_data.position
-        async for heading in drone.telemetry.attitude_euler():
-            print(f"Heading: {heading.yaw_deg}")
-        # 创建 PositionNedYaw 对象
-        position_ned_yaw = PositionNedYaw(
-            north_m=current_position.north_m,
-            east_m=current_position.east_m,
-            down_m=current_position.down_m,
-            yaw_deg=heading.yaw_deg
-            )
-        # 发布位置信息
-        await drone.telemetry.set_rate_position_velocity_ned(position_ned_yaw)
+# set_rate_position_velocity_ned 只设置更新频率（设置一次即可），不是发布位置；
+# 返回当前位置和航向组成的 PositionNedYaw
+async def send_position_data(drone, rate_hz=10):
+    await drone.telemetry.set_rate_position_velocity_ned(rate_hz)
+    position_data = await first(drone.telemetry.position_velocity_ned())
+    heading = await first(drone.telemetry.attitude_euler())
+    print(f"Heading: {heading.yaw_deg}")
+    # 创建 PositionNedYaw 对象
+    current_position = position_data.position
+    return PositionNedYaw(
+        north_m=current_position.north_m,
+        east_m=current_position.east_m,
+        down_m=current_position.down_m,
+        yaw_deg=heading.yaw_deg
+        )
 async def print_status_text(drone):
     # drone = System()
     try:
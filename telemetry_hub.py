@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# 遥测分发中心：每个 MAVSDK 遥测流只订阅一次，再把数据分发给任意多个使用者
+# 避免每个使用者（或每次采样）都重新打开一条 drone.telemetry.xxx() gRPC 流
+import asyncio
+import time
+
+# 默认订阅的遥测流（对应 drone.telemetry 下的方法名）
+DEFAULT_STREAMS = ('position', 'attitude_euler', 'battery', 'health', 'in_air')
+
+
+class Subscription:
+    """
+    有界队列订阅：队列满时丢弃最旧的数据，使用者始终拿到最新值
+
+    用法:
+        async for position in hub.subscribe('position'):
+            ...
+    """
+
+    def __init__(self, hub, name, maxsize=1):
+        self._hub = hub
+        self.name = name
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0  # 因使用者处理过慢而被丢弃的数据条数
+
+    def _push(self, value, arrived):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self._hub.metrics is not None:
+                self._hub.metrics.drop(self.name)
+        self.queue.put_nowait((arrived, value))
+        if self._hub.metrics is not None:
+            self._hub.metrics.queue_depth(self.name, self.queue.qsize())
+
+    async def get(self):
+        arrived, value = await self.queue.get()
+        if self._hub.metrics is not None:
+            # 从 MAVSDK 到达到被使用者取走的延迟
+            self._hub.metrics.latency(self.name, time.monotonic() - arrived)
+        return value
+
+    def close(self):
+        self._hub._unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TelemetryHub:
+    """
+    遥测分发中心
+
+    参数:
+        drone: 已连接的 mavsdk.System
+        streams: 需要订阅的遥测流名称
+        metrics: 可选的 metrics.Metrics；记录各流的到达频率/间隔、订阅队列深度和取走延迟
+    """
+
+    def __init__(self, drone, streams=DEFAULT_STREAMS, metrics=None):
+        self.drone = drone
+        self.streams = tuple(streams)
+        self.metrics = metrics
+        self._latest = {name: None for name in self.streams}
+        self._counts = {name: 0 for name in self.streams}
+        self._subscribers = {name: [] for name in self.streams}
+        self._tasks = []
+
+    def start(self):
+        """为每个遥测流启动一个后台读取任务（重复调用无副作用）"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._pump(name)) for name in self.streams]
+        return self
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _pump(self, name):
+        stream = getattr(self.drone.telemetry, name)()
+        async for value in stream:
+            arrived = self.metrics.mark(name) if self.metrics is not None else time.monotonic()
+            self._latest[name] = value
+            self._counts[name] += 1
+            for sub in self._subscribers[name]:
+                sub._push(value, arrived)
+
+    def latest(self, name):
+        """返回该遥测流的最新值（尚未收到数据时为 None），不等待"""
+        return self._latest[name]
+
+    def count(self, name):
+        """该遥测流累计收到的数据条数"""
+        return self._counts[name]
+
+    def subscribe(self, name, maxsize=1):
+        """新建一个订阅；maxsize=1 即只保留最新值"""
+        if name not in self._subscribers:
+            raise KeyError(f"未订阅的遥测流: {name}")
+        sub = Subscription(self, name, maxsize)
+        self._subscribers[name].append(sub)
+        return sub
+
+    def _unsubscribe(self, sub):
+        if sub in self._subscribers[sub.name]:
+            self._subscribers[sub.name].remove(sub)
+
+    async def get(self, name):
+        """返回最新值；尚未收到任何数据时等待第一条"""
+        value = self._latest[name]
+        if value is not None:
+            return value
+        return await self.next(name)
+
+    async def next(self, name, timeout=None):
+        """等待该遥测流的下一条新数据"""
+        with self.subscribe(name) as sub:
+            return await asyncio.wait_for(sub.get(), timeout)
+
+    async def wait_for(self, name, predicate, timeout=None):
+        """等待直到该遥测流出现满足 predicate 的数据（先检查当前最新值），返回该数据"""
+        value = self._latest[name]
+        if value is not None and predicate(value):
+            return value
+
+        async def _wait(sub):
+            async for value in sub:
+                if predicate(value):
+                    return value
+
+        with self.subscribe(name) as sub:
+            return await asyncio.wait_for(_wait(sub), timeout)
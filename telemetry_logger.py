@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# 二进制定长遥测日志：替代逐行 write + flush 的 CSV/TXT 记录方式
+# 文件结构：32字节文件头 + N条定长记录（时间戳, 纬度, 经度, 相对高度, GPS高度, 序号）
+# 记录先写入预分配的内存块，满一块才整体写盘，不做逐条 flush/fsync
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+MAGIC = b'F450TLM\x00'
+VERSION = 1
+
+# 文件头：魔数, 版本, 单条记录字节数, 开始时间(epoch秒), 保留
+HEADER = struct.Struct('<8sHHd12x')
+# 记录：时间戳(epoch秒), 纬度, 经度, 相对高度, GPS高度, 序号
+RECORD = struct.Struct('<dddffI')
+
+# 与 RECORD 字节布局一致的 NumPy 结构化类型，读取时零拷贝映射为列
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('latitude', '<f8'),
+    ('longitude', '<f8'),
+    ('relative_altitude', '<f4'),
+    ('gps_altitude', '<f4'),
+    ('sequence', '<u4'),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+
+class TelemetryLogger:
+    """
+    分块写入的二进制位置日志
+
+    参数:
+        path: 日志文件路径（建议后缀 .bin）
+        chunk_records: 每块缓存的记录条数，满块后一次性写盘
+    """
+
+    def __init__(self, path, chunk_records=256):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.start_time = time.time()
+        self.count = 0
+        self._chunk = bytearray(RECORD.size * chunk_records)  # 预分配缓存块
+        self._pending = 0
+
+        log_dir = os.path.dirname(path)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.start_time))
+
+    def append(self, latitude, longitude, relative_altitude, gps_altitude, timestamp=None):
+        """追加一条位置记录，返回其序号（从1开始）"""
+        if timestamp is None:
+            timestamp = time.time()
+        self.count += 1
+        RECORD.pack_into(self._chunk, self._pending * RECORD.size,
+                         timestamp, latitude, longitude,
+                         relative_altitude, gps_altitude, self.count)
+        self._pending += 1
+        if self._pending == self.chunk_records:
+            self._write_chunk()
+        return self.count
+
+    def append_position(self, position, timestamp=None):
+        """直接追加 MAVSDK telemetry.position() 返回的 Position 对象"""
+        return self.append(position.latitude_deg, position.longitude_deg,
+                           position.relative_altitude_m, position.absolute_altitude_m,
+                           timestamp)
+
+    def _write_chunk(self):
+        if self._pending:
+            self._file.write(memoryview(self._chunk)[:self._pending * RECORD.size])
+            self._pending = 0
+
+    def flush(self):
+        """把缓存块写入文件（不强制 fsync）"""
+        self._write_chunk()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_header(path):
+    """读取文件头，返回 (版本, 记录字节数, 开始时间)"""
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise ValueError(f"文件过短，不是遥测日志: {path}")
+    magic, version, record_size, start_time = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"魔数不匹配，不是遥测日志: {path}")
+    if version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"不支持的日志版本 {version} / 记录长度 {record_size}")
+    return version, record_size, start_time
+
+
+def read_log(path, mmap=True):
+    """
+    读取二进制日志为 NumPy 结构化数组（按列访问: data['latitude'] 等）
+
+    参数:
+        path: 日志文件路径
+        mmap: True 时使用内存映射，不把整个文件读入内存
+    """
+    read_header(path)
+    size = os.path.getsize(path) - HEADER.size
+    n = size // RECORD.size  # 忽略异常中断时写了一半的尾部记录
+    if n == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    if mmap:
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(n,))
+    return np.fromfile(path, dtype=RECORD_DTYPE, count=n, offset=HEADER.size)
+
+
+def export_trajectory_csv(path, csv_path="gps_trajectory_complete.csv"):
+    """导出为 miss2.py 的 gps_trajectory_complete.csv 格式（plot_trajectory.py 可直接读取）"""
+    data = read_log(path)
+    table = np.column_stack([data['latitude'], data['longitude'],
+                             data['relative_altitude'], data['timestamp']])
+    np.savetxt(csv_path, table, fmt=['%.6f', '%.6f', '%.2f', '%.2f'], delimiter=',',
+               header="latitude,longitude,altitude,timestamp", comments='')
+    return csv_path
+
+
+def export_position_csv(path, csv_path):
+    """导出为 log/gps_position_*.csv 格式（时间戳,纬度,经度,相对高度,GPS高度,读取次数,频率）"""
+    data = read_log(path)
+    ts = data['timestamp']
+    elapsed = ts - ts[0] if len(ts) else ts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frequency = np.where(elapsed > 0, data['sequence'] / elapsed, 0.0)
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write("时间戳,纬度(度),经度(度),相对高度(米),GPS高度(米),读取次数,频率(Hz)\n")
+        lines = []
+        for t, lat, lon, rel, gps, seq, hz in zip(ts.tolist(), data['latitude'].tolist(),
+                                                 data['longitude'].tolist(),
+                                                 data['relative_altitude'].tolist(),
+                                                 data['gps_altitude'].tolist(),
+                                                 data['sequence'].tolist(), frequency.tolist()):
+            stamp = datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+            lines.append(f"{stamp},{lat},{lon},{rel},{gps},{seq},{hz:.2f}\n")
+        f.writelines(lines)
+    return csv_path
+
+
+if __name__ == "__main__":
+    # 用法: python telemetry_logger.py xxx.bin [trajectory|position] [输出csv]
+    if len(sys.argv) < 2:
+        print("用法: python telemetry_logger.py <日志.bin> [trajectory|position] [输出.csv]")
+        sys.exit(1)
+    log_path = sys.argv[1]
+    layout = sys.argv[2] if len(sys.argv) > 2 else 'trajectory'
+    default_out = os.path.splitext(log_path)[0] + '.csv'
+    out_path = sys.argv[3] if len(sys.argv) > 3 else default_out
+    if layout == 'position':
+        export_position_csv(log_path, out_path)
+    else:
+        export_trajectory_csv(log_path, out_path)
+    print(f"已导出 {len(read_log(log_path))} 条记录到 {out_path}")
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# 轨迹跟踪误差分析：把实际飞行轨迹投影到任务的本地坐标系，与计划路径逐点比较
+# 计划路径建立均匀网格索引，百万级轨迹点按块向量化求最近线段，无逐点 Python 循环
+import sys
+
+import numpy as np
+
+from geodesy import LocalFrame
+from waypoints import circle
+
+# 每次查询的点数：候选矩阵 (QUERY_CHUNK × 候选数) 保持在缓存友好的大小
+QUERY_CHUNK = 16384
+
+
+class PathIndex:
+    """
+    计划路径（折线）的网格索引
+
+    每个网格登记所有"可能是网格内某点最近线段"的线段：网格中心到线段的距离不超过
+    中心到最近线段的距离 + √2 倍边长（网格内任一点到中心不超过半条对角线）。
+    网格范围内的查询点只需在所在网格的候选中找最近者，结果总是精确的；
+    候选表按网格存为定宽表，查询点按所在网格的候选数分组，每组按块一次取出候选行，
+    没有逐候选展开。网格范围外的点交给更粗一级的网格，网格已足够粗时暴力搜索
+
+    参数:
+        east, north: 计划路径顶点（米）
+        up: 计划路径顶点高度（米），可省略
+        cell_size: 网格边长（米），默认取路径包围盒的 1/32
+    """
+
+    def __init__(self, east, north, up=None, cell_size=None):
+        east = np.asarray(east, dtype=float)
+        north = np.asarray(north, dtype=float)
+        if len(east) < 2:
+            raise ValueError("计划路径至少需要两个点")
+        up = np.zeros_like(east) if up is None else np.asarray(up, dtype=float)
+        self.east, self.north, self.up = east, north, up
+
+        seg_len = np.hypot(np.diff(east), np.diff(north))
+        self.segment_length = seg_len
+        self.cum_length = np.concatenate([[0.0], np.cumsum(seg_len)])
+        self.total_length = float(self.cum_length[-1])
+        self.segments = len(seg_len)
+
+        if cell_size is None:
+            extent = max(np.ptp(east), np.ptp(north), 1e-3)
+            cell_size = extent / 32
+        self.cell_size = float(cell_size)
+        self._inv_cell = 1.0 / self.cell_size
+        self._coarse = None
+
+        self._ax, self._ay = east[:-1], north[:-1]
+        self._vx, self._vy = np.diff(east), np.diff(north)
+        vv = self._vx ** 2 + self._vy ** 2
+        # 零长度线段取倒数为 0，投影参数恒为 0（即端点）
+        self._inv_vv = np.divide(1.0, vv, out=np.zeros_like(vv), where=vv > 0)
+
+        # 网格范围：路径包围盒外扩一个网格边长
+        margin = self.cell_size
+        self._x0 = east.min() - margin
+        self._y0 = north.min() - margin
+        self._nx = int(np.ceil((east.max() + margin - self._x0) / self.cell_size)) + 1
+        self._ny = int(np.ceil((north.max() + margin - self._y0) / self.cell_size)) + 1
+
+        # 按网格分块计算中心到各线段的距离，登记距离不超过 最近距离 + √2 倍边长 的线段
+        ncell = self._nx * self._ny
+        centers_x = self._x0 + (np.arange(ncell) // self._ny + 0.5) * self.cell_size
+        centers_y = self._y0 + (np.arange(ncell) % self._ny + 0.5) * self.cell_size
+        reach = np.sqrt(2.0) * self.cell_size * (1 + 1e-9)
+        all_segs = np.arange(self.segments)[None, :]
+        cells, segs = [], []
+        step = max(1, (1 << 20) // self.segments)
+        for i in range(0, ncell, step):
+            d2, _ = self._project(centers_x[i:i + step, None], centers_y[i:i + step, None], all_segs)
+            d = np.sqrt(d2)
+            c, sg = np.nonzero(d <= d.min(axis=1, keepdims=True) + reach)
+            cells.append(c + i)
+            segs.append(sg)
+        cells, segs = np.concatenate(cells), np.concatenate(segs)
+        # 定宽候选表：行内线段序号递增，每行只使用前 count 列
+        count = np.bincount(cells, minlength=ncell)
+        start = np.cumsum(count) - count
+        self._cell_table = np.zeros((ncell, int(count.max())), dtype=np.int64)
+        self._cell_table[cells, np.arange(len(cells)) - start[cells]] = segs
+        self._cell_count = count
+
+    def _cell_x(self, x):
+        v = (x - self._x0) * self._inv_cell
+        np.clip(v, 0, self._nx - 1, out=v)
+        return v.astype(np.int64)
+
+    def _cell_y(self, y):
+        v = (y - self._y0) * self._inv_cell
+        np.clip(v, 0, self._ny - 1, out=v)
+        return v.astype(np.int64)
+
+    def _project(self, px, py, seg):
+        """点到线段的投影：返回 (距离平方, 线段参数 t∈[0,1])"""
+        ex = px - self._ax[seg]
+        ey = py - self._ay[seg]
+        vx, vy = self._vx[seg], self._vy[seg]
+        t = ex * vx
+        t += ey * vy
+        t *= self._inv_vv[seg]
+        np.clip(t, 0.0, 1.0, out=t)
+        ex -= t * vx
+        ey -= t * vy
+        ex *= ex
+        ey *= ey
+        ex += ey
+        return ex, t
+
+    def _brute_force(self, px, py, chunk=4096):
+        best = np.empty(len(px), dtype=np.int64)
+        for i in range(0, len(px), chunk):
+            qx, qy = px[i:i + chunk, None], py[i:i + chunk, None]
+            d2, _ = self._project(qx, qy, np.arange(self.segments)[None, :])
+            best[i:i + chunk] = d2.argmin(axis=1)
+        return best
+
+    def nearest(self, px, py):
+        """
+        批量查询最近点
+
+        返回 (线段序号, 线段内参数 t, 最近点east, 最近点north)
+        """
+        px = np.asarray(px, dtype=float)
+        py = np.asarray(py, dtype=float)
+        n = len(px)
+        seg = np.zeros(n, dtype=np.int64)
+        t = np.zeros(n)
+        if n == 0:
+            return seg, t, np.zeros(0), np.zeros(0)
+
+        # 按所在网格的候选数 width 分组，每组按块取出前 width 列候选求最近者
+        cells = self._cell_x(px) * self._ny + self._cell_y(py)
+        lens = self._cell_count[cells]
+        widths = np.flatnonzero(np.bincount(lens))
+        for width in widths[widths > 0].tolist():
+            group = np.flatnonzero(lens == width)
+            for i in range(0, len(group), QUERY_CHUNK):
+                q = group[i:i + QUERY_CHUNK]
+                rows = self._cell_table[cells[q], :width]
+                d2, tq = self._project(px[q, None], py[q, None], rows)
+                # 距离相同（如正好在顶点处）时取序号最大的线段（行内线段序号递增）
+                col = width - 1 - np.argmin(d2[:, ::-1], axis=1)
+                k = np.arange(len(q))
+                seg[q] = rows[k, col]
+                t[q] = tq[k, col]
+
+        # 网格范围外的点交给粗一级网格（边长×4，范围更大）查询，网格已足够粗时暴力搜索
+        outside = ((px < self._x0) | (px >= self._x0 + self._nx * self.cell_size) |
+                   (py < self._y0) | (py >= self._y0 + self._ny * self.cell_size))
+        if outside.any():
+            if self._nx * self._ny <= 64:
+                seg_far = self._brute_force(px[outside], py[outside])
+                _, t[outside] = self._project(px[outside], py[outside], seg_far)
+                seg[outside] = seg_far
+            else:
+                if self._coarse is None:
+                    self._coarse = PathIndex(self.east, self.north, self.up, self.cell_size * 4)
+                seg[outside], t[outside], _, _ = self._coarse.nearest(px[outside], py[outside])
+
+        near_e = self._ax[seg] + t * self._vx[seg]
+        near_n = self._ay[seg] + t * self._vy[seg]
+        return seg, t, near_e, near_n
+
+
+class TrackingResult:
+    """跟踪误差分析结果，数组可直接用于绘图叠加"""
+
+    def __init__(self, path, east, north, up, timestamp, segment, t, near_east, near_north,
+                 cross_track, along_track, vertical_error, lag):
+        self.path = path
+        self.east, self.north, self.up = east, north, up
+        self.timestamp = timestamp
+        self.segment = segment
+        self.t = t
+        self.near_east, self.near_north = near_east, near_north
+        self.cross_track = cross_track          # 有符号横向误差（米），左正右负
+        self.along_track = along_track          # 沿路径的投影里程（米）
+        self.vertical_error = vertical_error    # 高度误差（米）
+        self.lag = lag                          # 沿航迹滞后（米），未给出计划速度时为 None
+        abs_ct = np.abs(cross_track)
+        self.segment_max = np.zeros(path.segments)
+        np.maximum.at(self.segment_max, segment, abs_ct)
+        self.segment_count = np.bincount(segment, minlength=path.segments)
+
+    def stats(self):
+        abs_ct = np.abs(self.cross_track)
+        s = {
+            'points': int(len(abs_ct)),
+            'cross_track_rms_m': float(np.sqrt(np.mean(abs_ct ** 2))) if len(abs_ct) else 0.0,
+            'cross_track_mean_m': float(abs_ct.mean()) if len(abs_ct) else 0.0,
+            'cross_track_p95_m': float(np.percentile(abs_ct, 95)) if len(abs_ct) else 0.0,
+            'cross_track_max_m': float(abs_ct.max()) if len(abs_ct) else 0.0,
+            'vertical_rms_m': float(np.sqrt(np.mean(self.vertical_error ** 2))) if len(abs_ct) else 0.0,
+            'segment_max_m': self.segment_max.tolist(),
+        }
+        if self.lag is not None and len(self.lag):
+            s['lag_mean_m'] = float(self.lag.mean())
+            s['lag_max_m'] = float(np.abs(self.lag).max())
+        return s
+
+    def report(self):
+        s = self.stats()
+        lines = [
+            f"轨迹点数: {s['points']}，计划路径长度: {self.path.total_length:.2f} m，线段数: {self.path.segments}",
+            f"横向误差: RMS {s['cross_track_rms_m']:.3f} m | 平均 {s['cross_track_mean_m']:.3f} m | "
+            f"P95 {s['cross_track_p95_m']:.3f} m | 最大 {s['cross_track_max_m']:.3f} m",
+            f"高度误差: RMS {s['vertical_rms_m']:.3f} m",
+        ]
+        if 'lag_mean_m' in s:
+            lines.append(f"沿航迹滞后: 平均 {s['lag_mean_m']:.3f} m | 最大 {s['lag_max_m']:.3f} m")
+        lines.append("各线段最大横向误差(m): " + ", ".join(
+            f"{i}:{v:.2f}" for i, v in enumerate(s['segment_max_m']) if self.segment_count[i]))
+        return "\n".join(lines)
+
+
+def analyze(path, east, north, up=None, timestamp=None, speed=None, planned_time=None):
+    """
+    计算跟踪误差
+
+    参数:
+        path: PathIndex 计划路径
+        east, north, up: 实际轨迹（本地坐标，米）
+        timestamp: 实际轨迹时间戳（秒），用于计算沿航迹滞后
+        speed: 计划匀速（米/秒），与 planned_time 二选一
+        planned_time: 计划路径各顶点的到达时间（秒，相对轨迹起点）
+    """
+    east = np.asarray(east, dtype=float)
+    north = np.asarray(north, dtype=float)
+    up = np.zeros_like(east) if up is None else np.asarray(up, dtype=float)
+    seg, t, near_e, near_n = path.nearest(east, north)
+
+    # 有符号横向误差：线段方向左侧为正
+    ex = east - near_e
+    ey = north - near_n
+    cross = np.hypot(ex, ey)
+    cross *= np.sign(np.diff(path.east)[seg] * ey - np.diff(path.north)[seg] * ex)
+    along = path.cum_length[seg] + t * path.segment_length[seg]
+    planned_up = path.up[seg] + t * np.diff(path.up)[seg]
+
+    lag = None
+    if timestamp is not None and (speed is not None or planned_time is not None):
+        ts = np.asarray(timestamp, dtype=float)
+        if planned_time is None:
+            planned_time = path.cum_length / speed
+        expected = np.interp(ts - ts[0], planned_time, path.cum_length)
+        lag = expected - along
+    return TrackingResult(path, east, north, up, timestamp, seg, t, near_e, near_n,
+                          cross, along, up - planned_up, lag)
+
+
+def load_trajectory_csv(csv_path="gps_trajectory_complete.csv"):
+    """读取 gps_trajectory_complete.csv（latitude,longitude,altitude,timestamp）"""
+    data = np.loadtxt(csv_path, delimiter=',', skiprows=1, ndmin=2)
+    return data[:, 0], data[:, 1], data[:, 2], data[:, 3]
+
+
+def circle_mission_path(radius=5.0, num_points=20, altitude=3.0):
+    """miss2.py 的计划路径：起飞点 -> 圆周（闭合）-> 返回起飞点"""
+    east, north, up = circle(radius, num_points, altitude, closed=True)
+    east = np.concatenate([[0.0], east, [0.0]])
+    north = np.concatenate([[0.0], north, [0.0]])
+    up = np.concatenate([[altitude], up, [altitude]])
+    return east, north, up
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "gps_trajectory_complete.csv"
+    lat, lon, alt, ts = load_trajectory_csv(csv_path)
+    # 圆心为起飞点（首个记录点）
+    frame = LocalFrame(lat[0], lon[0], 0.0)
+    east, north, _ = frame.geodetic_to_enu(lat, lon, np.zeros_like(lat))
+    plan = PathIndex(*circle_mission_path(5.0, 20, 3.0))
+    result = analyze(plan, east, north, alt, ts, speed=0.5)
+    print(result.report())
+
+    plt.figure(figsize=(8, 8))
+    plt.plot(plan.east, plan.north, 'k--', linewidth=1, label='计划路径')
+    sc = plt.scatter(result.east, result.north, c=np.abs(result.cross_track), cmap='plasma', s=6)
+    plt.colorbar(sc, label='横向误差 (m)')
+    plt.xlabel('East (m)')
+    plt.ylabel('North (m)')
+    plt.axis('equal')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.savefig("tracking_error.png", dpi=200, bbox_inches="tight")
+    plt.show()
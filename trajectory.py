@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# 连续轨迹 offboard 飞行：预先按时间参数化生成平滑路径（位置、速度、航向前馈，NumPy 数组），
+# offboard 循环中按时间 O(1) 取样并用 set_position_velocity_ned 发送，
+# 跟踪效果不再取决于上传多少个任务航点
+#
+# 坐标为 NED（米），圆周角从东向起逆时针（与 waypoints.circle 的 ENU 约定一致）
+import asyncio
+
+import numpy as np
+
+from offboard_stream import OffboardStreamer, PositionNedYaw, VelocityNedYaw
+
+
+def _trapezoid(length, v_max, a_max, dt):
+    """
+    梯形速度曲线：从静止加速到 v_max，匀速，再减速到静止（距离不够时为三角形）
+    返回按 dt 采样的 (弧长 s, 速度 v)，首尾均为静止
+    """
+    if length <= 0:
+        return np.zeros(1), np.zeros(1)
+    v_peak = min(v_max, np.sqrt(length * a_max))
+    t_acc = v_peak / a_max
+    t_const = (length - v_peak * t_acc) / v_peak
+    total = 2 * t_acc + t_const
+    t = np.append(np.arange(0.0, total, dt), total)
+    t_dec = t - t_acc - t_const
+    v = np.where(t < t_acc, a_max * t,
+                 np.where(t_dec < 0, v_peak, np.maximum(v_peak - a_max * t_dec, 0.0)))
+    s = np.where(t < t_acc, 0.5 * a_max * t ** 2,
+                 np.where(t_dec < 0, 0.5 * v_peak * t_acc + v_peak * (t - t_acc),
+                          length - 0.5 * a_max * np.maximum(t_acc - t_dec, 0.0) ** 2))
+    return np.minimum(s, length), v
+
+
+class Trajectory:
+    """
+    均匀时间采样的轨迹
+
+    参数:
+        dt: 采样间隔(秒)
+        position: (N, 3) NED 位置(米)
+        velocity: (N, 3) NED 速度(m/s)
+        yaw: (N,) 航向(度)
+    """
+
+    def __init__(self, dt, position, velocity, yaw):
+        self.dt = float(dt)
+        self.position = np.asarray(position, dtype=float)
+        self.velocity = np.asarray(velocity, dtype=float)
+        self.yaw = np.asarray(yaw, dtype=float)
+        self._inv_dt = 1.0 / self.dt
+        self._last = len(self.yaw) - 1
+
+    @property
+    def duration(self):
+        return self._last * self.dt
+
+    def __len__(self):
+        return len(self.yaw)
+
+    def sample(self, t):
+        """
+        按时间取样（相邻两点线性插值，O(1)），t 超出范围时取首/末点，
+        返回 (位置, 速度, 航向)
+        """
+        x = t * self._inv_dt
+        if x <= 0:
+            return self.position[0], self.velocity[0], self.yaw[0]
+        i = int(x)
+        if i >= self._last:
+            return self.position[-1], self.velocity[-1], self.yaw[-1]
+        w = x - i
+        dyaw = (self.yaw[i + 1] - self.yaw[i] + 180.0) % 360.0 - 180.0
+        return (self.position[i] + w * (self.position[i + 1] - self.position[i]),
+                self.velocity[i] + w * (self.velocity[i + 1] - self.velocity[i]),
+                self.yaw[i] + w * dyaw)
+
+    def setpoint(self, t):
+        """t 时刻的 (PositionNedYaw, VelocityNedYaw)，可直接交给 set_position_velocity_ned"""
+        (n, e, d), (vn, ve, vd), yaw = self.sample(t)
+        yaw = float(yaw)
+        return (PositionNedYaw(float(n), float(e), float(d), yaw),
+                VelocityNedYaw(float(vn), float(ve), float(vd), yaw))
+
+    def shifted(self, north=0.0, east=0.0, down=0.0):
+        """平移后的轨迹（例如以当前本地位置为原点）"""
+        return Trajectory(self.dt, self.position + np.array([north, east, down]), self.velocity, self.yaw)
+
+    @classmethod
+    def concat(cls, parts):
+        """首尾相接（各段首尾均为静止，速度连续）；相邻段重复的衔接点只保留一个"""
+        dt = parts[0].dt
+        position = [parts[0].position] + [p.position[1:] for p in parts[1:]]
+        velocity = [parts[0].velocity] + [p.velocity[1:] for p in parts[1:]]
+        yaw = [parts[0].yaw] + [p.yaw[1:] for p in parts[1:]]
+        return cls(dt, np.concatenate(position), np.concatenate(velocity), np.concatenate(yaw))
+
+
+def _heading(velocity, initial):
+    """速度方向作为航向（度）；静止时保持上一航向，始终静止且未给出 initial 时为 0"""
+    speed = np.hypot(velocity[:, 0], velocity[:, 1])
+    yaw = np.degrees(np.arctan2(velocity[:, 1], velocity[:, 0]))
+    moving = speed > 1e-3
+    if not moving.any():
+        return np.full(len(velocity), 0.0 if initial is None else float(initial))
+    # 用最近一个运动中的航向填充静止点
+    idx = np.where(moving, np.arange(len(yaw)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    yaw = yaw[idx]
+    first = np.argmax(moving)
+    yaw[:first] = yaw[first] if initial is None else initial
+    return yaw
+
+
+def line(start, end, speed=1.0, accel=0.5, dt=0.02, yaw=None):
+    """
+    两点间直线段（NED），首尾静止
+
+    参数:
+        yaw: 固定航向(度)；为 None 时沿运动方向
+    """
+    start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+    delta = end - start
+    length = float(np.linalg.norm(delta))
+    s, v = _trapezoid(length, speed, accel, dt)
+    direction = delta / length if length > 0 else np.zeros(3)
+    position = start + s[:, None] * direction
+    velocity = v[:, None] * direction
+    heading = np.full(len(s), yaw) if yaw is not None else _heading(velocity, None)
+    return Trajectory(dt, position, velocity, heading)
+
+
+def arc(center, radius, down, start_angle=0.0, sweep=2 * np.pi, speed=0.5, accel=0.5, dt=0.02, yaw=None):
+    """
+    圆弧段（NED 水平面，高度 down 固定），首尾静止
+
+    参数:
+        center: 圆心 (north, east)
+        start_angle: 起始角(弧度)，从东向起逆时针
+        sweep: 扫过的角度(弧度)，正数为逆时针
+        yaw: 固定航向(度)；为 None 时沿切线方向
+    """
+    s, v = _trapezoid(abs(sweep) * radius, speed, accel, dt)
+    sign = 1.0 if sweep >= 0 else -1.0
+    theta = start_angle + sign * s / radius
+    omega = sign * v / radius
+    cos, sin = np.cos(theta), np.sin(theta)
+    position = np.column_stack([center[0] + radius * sin, center[1] + radius * cos, np.full(len(s), down)])
+    velocity = np.column_stack([radius * omega * cos, -radius * omega * sin, np.zeros(len(s))])
+    heading = np.full(len(s), yaw) if yaw is not None else _heading(velocity, None)
+    return Trajectory(dt, position, velocity, heading)
+
+
+def circle_mission(radius=5.0, altitude=3.0, speed=0.5, laps=1, accel=0.5, transit_speed=2.0, dt=0.02):
+    """
+    与 miss2.py 航点任务相同的飞行：从圆心（起飞点上方）飞到圆周起点（正东），
+    沿圆周飞 laps 圈，再返回圆心；原点为起飞点，返回的轨迹需按当前本地位置平移
+
+    参数:
+        radius: 半径(米)
+        altitude: 相对起飞点高度(米)
+        speed: 圆周速度(m/s)
+        laps: 圈数
+        accel: 加速度上限(m/s²)
+        transit_speed: 进出圆周的直线段速度(m/s)
+        dt: 采样间隔(秒)
+    """
+    down = -float(altitude)
+    center = np.array([0.0, 0.0, down])
+    start = np.array([0.0, radius, down])
+    lead_in = line(center, start, transit_speed, accel, dt)
+    lap = arc((0.0, 0.0), radius, down, 0.0, 2 * np.pi * laps, speed, accel, dt)
+    lead_out = line(start, center, transit_speed, accel, dt)
+    # 直线段以圆周起点的切线方向为航向，避免进入圆周时原地转向
+    tangent = float(lap.yaw[1]) if len(lap) > 1 else 0.0
+    lead_in.yaw[:] = tangent
+    lead_out.yaw[:] = float(lap.yaw[-2]) if len(lap) > 1 else tangent
+    return Trajectory.concat([lead_in, lap, lead_out])
+
+
+async def fly(drone, trajectory, rate_hz=50.0, settle=1.0):
+    """
+    offboard 模式下按轨迹飞行：以 rate_hz 取样并发送 set_position_velocity_ned，
+    飞完后在终点保持 settle 秒再退出 offboard 模式，返回发送器（含频率与抖动统计）
+
+    起飞、解锁由调用方完成；切换 offboard 失败时抛出 OffboardError
+    """
+    streamer = OffboardStreamer(drone, rate_hz, source=trajectory.setpoint)
+    await streamer.start()
+    try:
+        await asyncio.sleep(trajectory.duration + settle)
+    finally:
+        await streamer.stop()
+    return streamer
@@ -1,33 +1,289 @@
-import pandas as pd
-import folium
-
-# 读取CSV文件
-df = pd.read_csv("gps_trajectory_complete.csv")
-
-# 提取经纬度，取中点作为地图中心
-center_lat = (df["latitude"].min() + df["latitude"].max()) / 2
-center_lon = (df["longitude"].min() + df["longitude"].max()) / 2
-
-# 创建地图对象（初始缩放级别18，可根据轨迹范围调整）
-m = folium.Map(location=[center_lat, center_lon], zoom_start=18)
-
-# 添加轨迹线
-points = list(zip(df["latitude"], df["longitude"]))
-folium.PolyLine(points, color="blue", weight=3, opacity=0.7, tooltip="飞行轨迹").add_to(m)
-
-# 标记起飞点和降落点
-folium.Marker(
-    location=[df["latitude"].iloc[0], df["longitude"].iloc[0]],
-    popup="起飞点",
-    icon=folium.Icon(color="red", icon="plane")
-).add_to(m)
-
-folium.Marker(
-    location=[df["latitude"].iloc[-1], df["longitude"].iloc[-1]],
-    popup="降落点",
-    icon=folium.Icon(color="green", icon="flag")
-).add_to(m)
-
-# 保存地图为HTML文件
-m.save("trajectory_map.html")
-print("地图已保存为 trajectory_map.html，可在浏览器中打开查看")
\ No newline at end of file
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from plot_trajectory import decimate_log
+from geodesy import LocalFrame
+
+# 每条记录先流式抽稀到该点数（与记录长度无关），再按缩放级别逐级简化
+POINT_BUDGET = 20000
+# 生成简化层的缩放级别范围（OSM 瓦片最大 19 级），低于最小级别沿用最小级别的层
+MIN_ZOOM = 10
+MAX_ZOOM = 19
+# 简化容差（屏幕像素）：偏离不超过该像素数的点在该级别下看不出差别，直接省略
+PIXEL_TOLERANCE = 1.0
+# 编码折线精度（小数位）：6 位约 0.1 m，5 位（Google 默认）约 1 m 对小范围飞行太粗
+PRECISION = 6
+# 颜色分级（viridis），低值 -> 高值
+PALETTE = ['#440154', '#46327e', '#365c8d', '#277f8e', '#1fa187', '#4ac16d', '#a0da39', '#fde725']
+# 分色依据 -> 色标标题
+COLOR_BY = {'altitude': "相对高度 (m)", 'speed': "速度 (m/s)"}
+
+
+def encode_polyline(lat, lon, precision=PRECISION):
+    """Google 编码折线（逐点差分 + 5 位分组的可打印字符），比 JSON 坐标数组小 3-5 倍"""
+    coords = np.round(np.column_stack([lat, lon]) * 10 ** precision).astype(np.int64)
+    deltas = np.diff(coords, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+    out = []
+    for v in values.tolist():
+        while v >= 0x20:
+            out.append(chr((0x20 | (v & 0x1f)) + 63))
+            v >>= 5
+        out.append(chr(v + 63))
+    return ''.join(out)
+
+
+def meters_per_pixel(lat, zoom):
+    """Web 墨卡托瓦片在纬度 lat、缩放级别 zoom 下每像素对应的地面距离(米)"""
+    return 156543.03392 * math.cos(math.radians(lat)) / 2 ** zoom
+
+
+def dp_significance(points):
+    """
+    Douglas-Peucker 重要度：每个点在 DP 递归中被选为分割点时的偏离距离（不超过父分割点的值），
+    首尾为无穷大；保留 重要度 >= 容差 的点即为该容差下的 DP 简化结果，一次计算适用于所有缩放级别
+
+    参数:
+        points: (N, D) 米制坐标
+    """
+    n = len(points)
+    sig = np.zeros(n)
+    sig[0] = sig[-1] = np.inf
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        i, j, parent = stack.pop()
+        if j - i < 2:
+            continue
+        a, b = points[i], points[j]
+        seg = points[i + 1:j] - a
+        ab = b - a
+        length2 = float(ab @ ab)
+        if length2 > 0:
+            # 到线段的距离（投影截断到端点之间）
+            u = np.clip(seg @ ab / length2, 0.0, 1.0)
+            d = np.linalg.norm(seg - u[:, None] * ab, axis=1)
+        else:
+            d = np.linalg.norm(seg, axis=1)
+        k = int(np.argmax(d))
+        value = min(float(d[k]), parent)
+        m = i + 1 + k
+        sig[m] = value
+        stack.append((i, m, value))
+        stack.append((m, j, value))
+    return sig
+
+
+def _runs(values, idx, vmin, vmax):
+    """按颜色分级把折线切成同色段，相邻段共用端点；values 为每段（相邻两点之间）的数值"""
+    scale = (len(PALETTE) - 1) / (vmax - vmin) if vmax > vmin else 0.0
+    bins = np.clip(np.round((values - vmin) * scale), 0, len(PALETTE) - 1).astype(int)
+    cuts = np.flatnonzero(np.diff(bins)) + 1
+    starts = np.concatenate([[0], cuts])
+    ends = np.concatenate([cuts, [len(bins)]])
+    # 第 s..e-1 段覆盖点 s..e
+    return [(PALETTE[bins[s]], idx[s:e + 1]) for s, e in zip(starts, ends)]
+
+
+class FlightLayers:
+    """
+    一条飞行记录的逐级简化结果
+
+    参数:
+        path: 记录文件（plot_trajectory.read_chunks 支持的任一格式）
+        name: 显示名称，默认取文件名
+        budget: 流式抽稀点数上限
+    """
+
+    def __init__(self, path, name=None, budget=POINT_BUDGET):
+        self.path = path
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.lat, self.lon, self.alt, self.t, self.total = decimate_log(path, budget)
+        frame = LocalFrame(self.lat[0], self.lon[0], 0.0)
+        self.enu = np.column_stack(frame.geodetic_to_enu(self.lat, self.lon, self.alt))
+        self.significance = dp_significance(self.enu)
+
+    def bounds(self):
+        return [[float(self.lat.min()), float(self.lon.min())], [float(self.lat.max()), float(self.lon.max())]]
+
+    def segment_values(self, idx, color_by):
+        """简化后各段的数值：高度取两端平均，速度取段长/用时（即该段平均速度）"""
+        if color_by == 'speed':
+            dist = np.linalg.norm(np.diff(self.enu[idx], axis=0), axis=1)
+            dt = np.diff(self.t[idx])
+            return np.divide(dist, dt, out=np.zeros_like(dist), where=dt > 0)
+        return (self.alt[idx][:-1] + self.alt[idx][1:]) / 2
+
+    def levels(self, color_by='altitude', vmin=None, vmax=None, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+        """
+        各缩放级别的简化层，点数相同的相邻级别合并，返回
+        [{'minzoom', 'maxzoom', 'points', 'runs': [(颜色, 下标数组)]}]
+        """
+        lat0 = float(np.mean(self.lat))
+        result = []
+        for zoom in range(min_zoom, max_zoom + 1):
+            idx = np.flatnonzero(self.significance >= meters_per_pixel(lat0, zoom) * PIXEL_TOLERANCE)
+            if result and len(result[-1]['idx']) == len(idx):
+                result[-1]['maxzoom'] = zoom
+                continue
+            result.append({'minzoom': zoom, 'maxzoom': zoom, 'idx': idx})
+        result[0]['minzoom'] = 0
+        result[-1]['maxzoom'] = 30
+        for level in result:
+            idx = level.pop('idx')
+            values = self.segment_values(idx, color_by)
+            lo = float(values.min()) if vmin is None else vmin
+            hi = float(values.max()) if vmax is None else vmax
+            level['points'] = len(idx)
+            level['runs'] = _runs(values, idx, lo, hi)
+        return result
+
+    def value_range(self, color_by):
+        values = self.segment_values(np.arange(len(self.lat)), color_by)
+        return float(values.min()), float(values.max())
+
+
+_RENDER_JS = """
+(function() {
+    var map = %(map)s;
+    var flights = %(data)s;
+    var factor = %(factor)s;
+    function decode(s) {
+        var points = [], i = 0, lat = 0, lon = 0;
+        while (i < s.length) {
+            var b, shift = 0, result = 0;
+            do { b = s.charCodeAt(i++) - 63; result |= (b & 0x1f) << shift; shift += 5; } while (b >= 0x20);
+            lat += (result & 1) ? ~(result >> 1) : (result >> 1);
+            shift = 0; result = 0;
+            do { b = s.charCodeAt(i++) - 63; result |= (b & 0x1f) << shift; shift += 5; } while (b >= 0x20);
+            lon += (result & 1) ? ~(result >> 1) : (result >> 1);
+            points.push([lat / factor, lon / factor]);
+        }
+        return points;
+    }
+    flights.forEach(function(f) { f.group = L.layerGroup().addTo(map); f.shown = null; });
+    function render() {
+        var zoom = map.getZoom();
+        flights.forEach(function(f) {
+            var level = f.levels.filter(function(l) { return zoom >= l[0] && zoom <= l[1]; })[0];
+            if (!level || level === f.shown) { return; }
+            f.group.clearLayers();
+            level[2].forEach(function(run) {
+                if (typeof run[1] === 'string') { run[1] = decode(run[1]); }
+                L.polyline(run[1], {color: run[0], weight: 3, opacity: 0.8}).bindTooltip(f.name).addTo(f.group);
+            });
+            f.shown = level;
+        });
+    }
+    map.on('zoomend', render);
+    render();
+})();
+"""
+
+_LEGEND_HTML = """
+<div style="position: fixed; bottom: 30px; left: 30px; z-index: 1000; background: white; padding: 6px 10px;
+            border-radius: 4px; box-shadow: 0 0 4px rgba(0,0,0,0.4); font-size: 12px;">
+    <div>%(label)s</div>
+    <div style="width: 160px; height: 10px; background: linear-gradient(to right, %(colors)s);"></div>
+    <div style="display: flex; justify-content: space-between;"><span>%(vmin).1f</span><span>%(vmax).1f</span></div>
+</div>
+"""
+
+
+def to_geojson(flights, layers):
+    """GeoJSON FeatureCollection：每个同色段一个 LineString，属性含航迹名称、颜色与适用缩放级别"""
+    features = []
+    for flight, levels in zip(flights, layers):
+        for level in levels:
+            for color, idx in level['runs']:
+                features.append({
+                    'type': 'Feature',
+                    'geometry': {'type': 'LineString',
+                                 'coordinates': [[round(float(lon), 7), round(float(lat), 7)]
+                                                 for lat, lon in zip(flight.lat[idx], flight.lon[idx])]},
+                    'properties': {'flight': flight.name, 'color': color,
+                                   'minzoom': level['minzoom'], 'maxzoom': level['maxzoom']},
+                })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def export_map(paths, html_path="trajectory_map.html", color_by='altitude', geojson_path=None, budget=POINT_BUDGET):
+    """
+    把一条或多条飞行记录导出为网页地图：每条轨迹按缩放级别预先简化（DP，1 像素容差），
+    以编码折线内嵌，浏览器缩放时切换到对应级别的层；轨迹按高度或速度分色（多条轨迹共用色标）
+
+    参数:
+        paths: 记录文件列表
+        html_path: 输出 HTML
+        color_by: 'altitude' 或 'speed'
+        geojson_path: 可选，另存全部简化层为 GeoJSON（供 QGIS / 其他网页地图使用）
+        budget: 每条记录流式抽稀的点数上限
+    返回 [(名称, 原始点数, 最精细层点数)]
+    """
+    import folium
+    from branca.element import MacroElement, Template
+
+    flights = [FlightLayers(path, budget=budget) for path in paths]
+    ranges = [flight.value_range(color_by) for flight in flights]
+    vmin, vmax = min(r[0] for r in ranges), max(r[1] for r in ranges)
+    layers = [flight.levels(color_by, vmin, vmax) for flight in flights]
+
+    corners = np.array([flight.bounds() for flight in flights])
+    south_west = corners[:, 0].min(axis=0).tolist()
+    north_east = corners[:, 1].max(axis=0).tolist()
+    center = [(south_west[0] + north_east[0]) / 2, (south_west[1] + north_east[1]) / 2]
+
+    # 按轨迹范围自动确定缩放级别
+    m = folium.Map(location=center, zoom_start=18)
+    m.fit_bounds([south_west, north_east])
+
+    # 标记起飞点和降落点
+    for flight in flights:
+        prefix = f"{flight.name} " if len(flights) > 1 else ""
+        folium.Marker(
+            location=[float(flight.lat[0]), float(flight.lon[0])],
+            popup=prefix + "起飞点",
+            icon=folium.Icon(color="red", icon="plane")
+        ).add_to(m)
+        folium.Marker(
+            location=[float(flight.lat[-1]), float(flight.lon[-1])],
+            popup=prefix + "降落点",
+            icon=folium.Icon(color="green", icon="flag")
+        ).add_to(m)
+
+    data = [{'name': flight.name,
+             'levels': [[level['minzoom'], level['maxzoom'],
+                         [[color, encode_polyline(flight.lat[idx], flight.lon[idx])] for color, idx in level['runs']]]
+                        for level in levels]}
+            for flight, levels in zip(flights, layers)]
+    js = _RENDER_JS % {'map': m.get_name(), 'data': json.dumps(data, ensure_ascii=False, separators=(',', ':')),
+                       'factor': 10 ** PRECISION}
+    # 作为地图的子元素在地图脚本之后输出（直接加到根 script 会排在 L.map(...) 之前，map 变量尚未定义）；
+    # 脚本通过表达式输出而不是拼进模板，编码折线中的 "{{" 不会被当作模板语法
+    layer_script = MacroElement()
+    layer_script._template = Template("{% macro script(this, kwargs) %}{{ this.js }}{% endmacro %}")
+    layer_script.js = js
+    layer_script.add_to(m)
+    m.get_root().html.add_child(folium.Element(_LEGEND_HTML % {
+        'label': COLOR_BY[color_by], 'colors': ', '.join(PALETTE), 'vmin': vmin, 'vmax': vmax}))
+    m.save(html_path)
+
+    if geojson_path:
+        with open(geojson_path, 'w', encoding='utf-8') as f:
+            json.dump(to_geojson(flights, layers), f, ensure_ascii=False, separators=(',', ':'))
+    return [(flight.name, flight.total, levels[-1]['points']) for flight, levels in zip(flights, layers)]
+
+
+if __name__ == "__main__":
+    # 用法: python trajectory_map.py [记录文件 ...] [--speed] [--geojson]
+    #   默认读取 gps_trajectory_complete.csv，按高度分色；多个文件叠加在同一张地图上
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    paths = args or ["gps_trajectory_complete.csv"]
+    color_by = 'speed' if '--speed' in sys.argv else 'altitude'
+    geojson_path = "trajectory_map.geojson" if '--geojson' in sys.argv else None
+    for name, total, points in export_map(paths, "trajectory_map.html", color_by, geojson_path):
+        print(f"{name}: {total} 点 -> 最精细层 {points} 点")
+    print("地图已保存为 trajectory_map.html，可在浏览器中打开查看")
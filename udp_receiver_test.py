@@ -1,29 +1,229 @@
 import socket
-import json
+import select
 import time
+from collections import OrderedDict, deque
+import numpy as np
 import rospy
 from nav_msgs.msg import Path
 from geometry_msgs.msg import PoseStamped
 from std_msgs.msg import Header
+from position_packet import decode, MAX_PACKET_SIZE
+from geodesy import LocalFrame
 
 # UDP接收配置
 UDP_IP = "192.168.137.3"
 UDP_PORT = 12346
+DRAIN_BATCH = 256  # 每轮最多连续读取的报文数
 
 # ROS配置
-MAX_PATH_POINTS = 1000  # 最大路径点数量，避免内存过度使用
-TOPIC_NAME = '/uav_path'  # ROS topic名称
+MAX_PATH_POINTS = 1000  # 每架飞机的最大路径点数量，避免内存过度使用
+TOPIC_NAME = '/uav_path'  # ROS topic名称前缀，每架飞机发布到 /uav_path/<飞机名>
+POSE_TOPIC_NAME = '/uav_pose'  # 最新位置（增量）topic前缀，None 则不发布
+PUBLISH_RATE_HZ = 10.0  # 每架飞机 Path 的最高发布频率
+MAP_ORIGIN = None  # map坐标系原点 (纬度, 经度, 高度)，None 则以收到的第一个位置为原点，所有飞机共用
+STATS_INTERVAL = 5.0  # 各来源统计打印间隔(秒)
+MAX_MISSING = 4096  # 每个来源记住的缺失序号数，迟到的样本只有在其中才算乱序（否则视为重复）
+
+
+class MapFrame:
+    """所有飞机共用的 map 坐标系（ENU，米）"""
+
+    def __init__(self, origin=MAP_ORIGIN):
+        self.frame = LocalFrame(*origin) if origin is not None else None
+
+    def to_map(self, lat, lon, alt):
+        if self.frame is None:
+            self.frame = LocalFrame(lat[0], lon[0], alt[0])
+            print(f"map坐标系原点: {lat[0]}, {lon[0]}, {alt[0]}")
+        return self.frame.geodetic_to_enu(lat, lon, alt)
+
+
+class PathAccumulator:
+    """
+    固定长度的滚动路径：deque(maxlen) 追加和淘汰最旧点都是 O(1)，
+    只在按频率发布时才组装一次 Path 消息；经纬高换算为以原点为中心的 map 坐标（ENU，米）
+    """
+
+    def __init__(self, path_pub, pose_pub=None, map_frame=None, max_points=MAX_PATH_POINTS,
+                 rate_hz=PUBLISH_RATE_HZ, frame_id="map"):
+        self.path_pub = path_pub
+        self.pose_pub = pose_pub
+        self.poses = deque(maxlen=max_points)
+        self.period = 1.0 / rate_hz
+        self.map_frame = map_frame if map_frame is not None else MapFrame()
+        self.frame_id = frame_id
+        self.path_msg = Path()
+        self.path_msg.header.frame_id = frame_id
+        self.dirty = False
+        self.last_publish = 0.0
+        self.received = 0
+        self.published = 0
+
+    def add(self, lat, lon, alt):
+        """批量加入位置（经纬高数组），整批一次换算为 map 坐标"""
+        east, north, up = self.map_frame.to_map(np.asarray(lat, dtype=float),
+                                                np.asarray(lon, dtype=float),
+                                                np.asarray(alt, dtype=float))
+        stamp = rospy.Time.now()
+        for x, y, z in zip(east.tolist(), north.tolist(), up.tolist()):
+            # 创建PoseStamped消息
+            pose_stamped = PoseStamped()
+            pose_stamped.header.stamp = stamp
+            pose_stamped.header.frame_id = self.frame_id
+
+            # 设置位置信息（米）
+            pose_stamped.pose.position.x = x
+            pose_stamped.pose.position.y = y
+            pose_stamped.pose.position.z = z
+
+            # 设置方向（这里设置为默认值，如果有方向数据可以修改）
+            pose_stamped.pose.orientation.w = 1.0
+
+            # 添加到路径中，超过 max_points 时自动淘汰最旧的点
+            self.poses.append(pose_stamped)
+        self.received += len(east)
+        self.dirty = True
+        # 增量发布本批最新位置
+        if self.pose_pub is not None and len(east):
+            self.pose_pub.publish(self.poses[-1])
+
+    def maybe_publish(self, now=None):
+        """距上次发布超过一个周期且有新数据时发布 Path，返回是否发布"""
+        now = time.monotonic() if now is None else now
+        if not self.dirty or now - self.last_publish < self.period:
+            return False
+        self.path_msg.poses = list(self.poses)
+        self.path_msg.header.stamp = rospy.Time.now()
+        self.path_pub.publish(self.path_msg)
+        self.last_publish = now
+        self.dirty = False
+        self.published += 1
+        return True
+
+
+class SourceStats:
+    """
+    单个来源的接收统计：频率、丢包（序号间隙）、乱序、重复、延迟
+
+    延迟 = 接收时刻 - 发送端样本时间戳，依赖两端时钟同步（如 NTP）
+    """
+
+    def __init__(self):
+        self.packets = 0
+        self.samples = 0
+        self.lost = 0
+        self.reordered = 0
+        self.duplicates = 0
+        self.last_seq = None
+        self.missing = OrderedDict()  # 已计入 lost 的序号（按缺失先后，最多 MAX_MISSING 个）
+        self.latency = deque(maxlen=1000)
+        self._window_start = time.monotonic()
+        self._window_samples = 0
+
+    def update(self, samples, recv_time):
+        """统计一个报文的样本，返回其中应当使用的样本（重复的样本被丢弃）"""
+        self.packets += 1
+        accepted = []
+        for sample in samples:
+            if sample.seq is not None and self.last_seq is not None:
+                gap = (sample.seq - self.last_seq - 1) & 0xFFFFFFFF
+                if gap >= 0x80000000:
+                    # 序号回退：之前计入丢失的序号迟到为乱序，否则为重复报文
+                    if sample.seq in self.missing:
+                        del self.missing[sample.seq]
+                        self.reordered += 1
+                        self.lost -= 1
+                    else:
+                        self.duplicates += 1
+                        continue
+                else:
+                    self.lost += gap
+                    # 只记住最近的 MAX_MISSING 个缺失序号
+                    for i in range(max(gap - MAX_MISSING, 0), gap):
+                        self.missing[(self.last_seq + 1 + i) & 0xFFFFFFFF] = None
+                    while len(self.missing) > MAX_MISSING:
+                        self.missing.popitem(last=False)
+                    self.last_seq = sample.seq
+            elif sample.seq is not None:
+                self.last_seq = sample.seq
+            self.latency.append(recv_time - sample.timestamp)
+            accepted.append(sample)
+        self.samples += len(accepted)
+        self._window_samples += len(accepted)
+        return accepted
+
+    def summary(self, now=None):
+        """返回统计字符串并开始新的频率统计窗口"""
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._window_start
+        rate = self._window_samples / elapsed if elapsed > 0 else 0.0
+        self._window_start = now
+        self._window_samples = 0
+        expected = self.samples + self.lost
+        loss = self.lost / expected * 100 if expected else 0.0
+        if self.latency:
+            lat = np.asarray(self.latency) * 1000
+            latency = f"延迟 p50 {np.percentile(lat, 50):.1f} ms / p99 {np.percentile(lat, 99):.1f} ms"
+        else:
+            latency = "延迟 -"
+        return (f"{rate:.1f} Hz | 报文 {self.packets} | 样本 {self.samples} | "
+                f"丢失 {self.lost} ({loss:.2f}%) | 乱序 {self.reordered} | 重复 {self.duplicates} | {latency}")
+
+
+class VehicleStream:
+    """单架飞机的路径与统计，首次收到数据时创建对应的 ROS 发布器"""
+
+    def __init__(self, name, map_frame):
+        self.name = name
+        path_pub = rospy.Publisher(f"{TOPIC_NAME}/{name}", Path, queue_size=10)
+        pose_pub = (rospy.Publisher(f"{POSE_TOPIC_NAME}/{name}", PoseStamped, queue_size=10)
+                    if POSE_TOPIC_NAME else None)
+        self.path = PathAccumulator(path_pub, pose_pub, map_frame)
+        self.stats = SourceStats()
+        print(f"新飞机 {name}，topic: {TOPIC_NAME}/{name}")
+
+
+def vehicle_name(sample, addr, sources):
+    """
+    二进制报文按 (发送地址, 飞机编号) 区分：编号首次出现的来源命名为 uav<编号>，
+    其他地址再用同一编号发送时（如多架飞机都用默认编号 1）单独命名并打印警告，
+    避免两架飞机的路径和丢包统计混在一起；旧版 JSON 报文没有编号，按发送地址区分
+
+    参数:
+        sources: {(发送地址, 飞机编号): 名称}，由调用方保存
+    """
+    if sample.seq is None:
+        return f"uav_{addr[0].replace('.', '_')}_{addr[1]}"
+    key = (addr, sample.vehicle_id)
+    name = sources.get(key)
+    if name is None:
+        name = f"uav{sample.vehicle_id}"
+        if name in sources.values():
+            name = f"uav{sample.vehicle_id}_{addr[0].replace('.', '_')}_{addr[1]}"
+            print(f"警告：飞机编号 {sample.vehicle_id} 来自多个地址，{addr[0]}:{addr[1]} 单独发布为 {name}"
+                  f"（请为每架飞机设置不同的 VEHICLE_ID）")
+        sources[key] = name
+    return name
+
+
+def drain(sock, limit=DRAIN_BATCH):
+    """非阻塞地一次读出 socket 中积压的报文（最多 limit 个）"""
+    packets = []
+    while len(packets) < limit:
+        try:
+            packets.append(sock.recvfrom(MAX_PACKET_SIZE))
+        except (BlockingIOError, InterruptedError):
+            break
+    return packets
+
 
 def main():
     # 初始化ROS节点
     rospy.init_node('uav_path_publisher', anonymous=True)
     
-    # 创建Path发布器
-    path_pub = rospy.Publisher(TOPIC_NAME, Path, queue_size=10)
-    
-    # 初始化Path消息
-    path_msg = Path()
-    path_msg.header.frame_id = "map"  # 设置坐标系
+    map_frame = MapFrame()
+    vehicles = {}
+    sources = {}
     
     # 创建UDP socket
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -55,59 +255,47 @@ def main():
     
     print(f"UDP接收器启动，监听 {UDP_IP}:{port_to_try}")
     print("等待接收无人机位置数据...")
-    print(f"ROS Path发布器已启动，topic: {TOPIC_NAME}")
+    print(f"ROS Path发布器已启动，topic前缀: {TOPIC_NAME}")
+    
+    sock.setblocking(False)
+    period = 1.0 / PUBLISH_RATE_HZ
+    last_stats = time.monotonic()
     
     try:
-        while True and not rospy.is_shutdown():
-            # 接收数据
-            data, addr = sock.recvfrom(1024)
-            
-            try:
-                # 解析JSON数据
-                position_data = json.loads(data.decode('utf-8'))
-                x = position_data['x1']
-                y = position_data['y1'] 
-                z = position_data['z1']
-                
-                print(f"收到位置数据: x1={x}, y1={y}, z1={z}")
-                print(f"时间戳: {position_data['timestamp']}")
-                print(f"发送方: {addr}")
-                
-                # 创建PoseStamped消息
-                pose_stamped = PoseStamped()
-                pose_stamped.header.stamp = rospy.Time.now()
-                pose_stamped.header.frame_id = "map"
-                
-                # 设置位置信息
-                pose_stamped.pose.position.x = x
-                pose_stamped.pose.position.y = y
-                pose_stamped.pose.position.z = z
-                
-                # 设置方向（这里设置为默认值，如果有方向数据可以修改）
-                pose_stamped.pose.orientation.x = 0.0
-                pose_stamped.pose.orientation.y = 0.0
-                pose_stamped.pose.orientation.z = 0.0
-                pose_stamped.pose.orientation.w = 1.0
-                
-                # 添加到路径中
-                path_msg.poses.append(pose_stamped)
-                
-                # 限制路径点数量，避免内存过度使用
-                if len(path_msg.poses) > MAX_PATH_POINTS:
-                    path_msg.poses.pop(0)  # 移除最旧的点
-                
-                path_msg.header.stamp = rospy.Time.now()
-                
-                # 发布Path消息
-                path_pub.publish(path_msg)
-                
-                print(f"已发布Path消息，当前路径点数: {len(path_msg.poses)}")
-                print("-" * 50)
-                
-            except json.JSONDecodeError:
-                print(f"收到非JSON数据: {data.decode('utf-8')}")
-            except KeyError as e:
-                print(f"JSON数据缺少必要字段: {e}")
+        while not rospy.is_shutdown():
+            # 等待数据，最多等一个发布周期，保证没有新报文时也能把积压的新点发布出去
+            readable, _, _ = select.select([sock], [], [], period)
+            batches = {}
+            if readable:
+                recv_time = time.time()
+                for data, addr in drain(sock):
+                    try:
+                        samples = decode(data)
+                    except ValueError as e:
+                        print(f"收到无法解析的数据（{addr}）: {e}")
+                        continue
+                    if not samples:
+                        continue
+                    name = vehicle_name(samples[0], addr, sources)
+                    if name not in vehicles:
+                        vehicles[name] = VehicleStream(name, map_frame)
+                    batches.setdefault(name, []).extend(vehicles[name].stats.update(samples, recv_time))
+
+            # 每架飞机本轮的样本整批加入路径
+            for name, samples in batches.items():
+                if not samples:
+                    continue
+                vehicles[name].path.add([s.lat for s in samples], [s.lon for s in samples],
+                                        [s.alt for s in samples])
+
+            now = time.monotonic()
+            for vehicle in vehicles.values():
+                vehicle.path.maybe_publish(now)
+
+            if now - last_stats >= STATS_INTERVAL:
+                last_stats = now
+                for name, vehicle in vehicles.items():
+                    print(f"{name}: {vehicle.stats.summary(now)} | 路径点数 {len(vehicle.path.poses)}")
                 
     except KeyboardInterrupt:
         print("\n接收器停止")
@@ -115,4 +303,4 @@ def main():
         sock.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
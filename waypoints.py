@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# 航点批量生成：先在本地ENU平面（米）里描述形状，再用 LocalFrame 一次性精确换算为经纬度
+# 替代 1/111111.0 度/米 的近似换算（该近似会让圆变成椭圆，且误差随半径增大）
+import numpy as np
+
+from geodesy import LocalFrame
+
+
+# ---------------- 形状（本地ENU坐标，单位米，返回 east, north, up 三个数组） ----------------
+
+def circle(radius, num_points=20, altitude=3.0, center=(0.0, 0.0), closed=True, start_angle=0.0):
+    """圆形：从正东方向开始逆时针，closed=True 时最后一点与第一点重合"""
+    angles = start_angle + np.linspace(0, 2 * np.pi, num_points, endpoint=closed)
+    east = center[0] + radius * np.cos(angles)
+    north = center[1] + radius * np.sin(angles)
+    return east, north, np.full(num_points, float(altitude))
+
+
+def helix(radius, turns, alt_start, alt_end, points_per_turn=20, center=(0.0, 0.0)):
+    """螺旋线：绕圆心 turns 圈，高度从 alt_start 线性变化到 alt_end"""
+    n = int(round(turns * points_per_turn)) + 1
+    angles = np.linspace(0, 2 * np.pi * turns, n)
+    east = center[0] + radius * np.cos(angles)
+    north = center[1] + radius * np.sin(angles)
+    return east, north, np.linspace(alt_start, alt_end, n)
+
+
+def lawnmower(width, height, spacing, altitude=3.0, heading_deg=0.0, origin=(0.0, 0.0)):
+    """
+    割草机（往返扫描）航线
+
+    参数:
+        width: 每条扫描线长度（米）
+        height: 扫描区域宽度（米），按 spacing 间隔排列扫描线
+        spacing: 扫描线间距（米）
+        heading_deg: 扫描线方向，0 为正东，逆时针为正
+    """
+    lines = int(np.floor(height / spacing)) + 1
+    offsets = np.arange(lines) * spacing
+    # 每条线两个端点，奇数行反向
+    x = np.empty(2 * lines)
+    x[0::2] = 0.0
+    x[1::2] = width
+    x[2::4], x[3::4] = width, 0.0
+    y = np.repeat(offsets, 2)
+    theta = np.radians(heading_deg)
+    east = origin[0] + x * np.cos(theta) - y * np.sin(theta)
+    north = origin[1] + x * np.sin(theta) + y * np.cos(theta)
+    return east, north, np.full(len(x), float(altitude))
+
+
+def polygon(vertices, altitude=3.0, points_per_edge=1, closed=True):
+    """
+    多边形航线
+
+    参数:
+        vertices: [(east, north), ...] 顶点（米）
+        points_per_edge: 每条边插值的点数（1 即只有顶点）
+        closed: 是否回到第一个顶点
+    """
+    v = np.asarray(vertices, dtype=float)
+    if closed:
+        v = np.vstack([v, v[:1]])
+    t = np.arange(points_per_edge) / points_per_edge
+    start, end = v[:-1], v[1:]
+    pts = (start[:, None, :] + (end - start)[:, None, :] * t[None, :, None]).reshape(-1, 2)
+    pts = np.vstack([pts, v[-1:]])
+    return pts[:, 0], pts[:, 1], np.full(len(pts), float(altitude))
+
+
+# ---------------- 经纬度换算与偏差报告 ----------------
+
+def legacy_offsets(center_lat, center_lon, east, north):
+    """旧脚本中 1/111111.0 度/米（经度做 cos 修正）的近似换算，仅用于对比"""
+    lat = center_lat + np.asarray(north) / 111111.0
+    lon = center_lon + np.asarray(east) / (111111.0 * np.cos(np.radians(center_lat)))
+    return lat, lon
+
+
+def path_deviation(east, north, path_east, path_north, chunk=4096):
+    """
+    连续形状（密集采样点）到航点折线的水平距离（米）：航点之间按直线飞行，
+    对圆来说最大值即弦高 r·(1 - cos(π/N))，N 为航段数
+
+    参数:
+        east, north: 航点（按飞行顺序）
+        path_east, path_north: 要求的连续形状的密集采样
+        chunk: 每次计算的采样点数，内存占用约 chunk × 航段数
+    返回每个采样点到折线的最近距离数组
+    """
+    pts = np.column_stack([east, north]).astype(float)
+    path = np.column_stack([path_east, path_north]).astype(float)
+    if len(pts) < 2:
+        return np.hypot(*(path - pts[:1]).T) if len(pts) else np.zeros(len(path))
+    start = pts[:-1]
+    seg = pts[1:] - start
+    seg_len2 = np.maximum((seg ** 2).sum(axis=1), 1e-18)
+    dist = np.empty(len(path))
+    for i in range(0, len(path), chunk):
+        rel = path[i:i + chunk, None, :] - start[None, :, :]
+        t = np.clip((rel * seg[None]).sum(axis=2) / seg_len2, 0.0, 1.0)
+        d = rel - t[:, :, None] * seg[None]
+        dist[i:i + chunk] = np.sqrt((d ** 2).sum(axis=2).min(axis=1))
+    return dist
+
+
+def generate_waypoints(center_lat, center_lon, east, north, up, frame=None, path=None):
+    """
+    把本地ENU形状整批换算为经纬度
+
+    up 直接作为航点的相对高度(米)返回，经纬度由本地切平面精确反算。
+    path 为要求的连续形状 (east, north) 的密集采样，给出时报告直线航段偏离形状的距离。
+    返回 (lat, lon, alt, report)，report 为 deviation_report 的结果
+    """
+    if frame is None:
+        frame = LocalFrame(center_lat, center_lon, 0.0)
+    east = np.asarray(east, dtype=float)
+    north = np.asarray(north, dtype=float)
+    up = np.asarray(up, dtype=float)
+    lat, lon, _ = frame.enu_to_geodetic(east, north, np.zeros_like(east))
+    report = deviation_report(frame, lat, lon, east, north, path)
+    return lat, lon, up, report
+
+
+def deviation_report(frame, lat, lon, east, north, path=None):
+    """
+    航点的水平偏差（米）
+
+    max/rms_error_m 为经纬度换算回米制后与输入航点的差（同一切平面往返，只反映数值误差），
+    legacy_* 为旧近似换算的同一偏差作对比；给出 path 时，path_* 为连续形状到
+    （换算后的）航点折线的距离，即直线航段实际偏离要求路径的程度
+    """
+    e, n, _ = frame.geodetic_to_enu(lat, lon, np.zeros_like(lat))
+    err = np.hypot(e - east, n - north)
+    legacy_lat, legacy_lon = legacy_offsets(frame.lat0, frame.lon0, east, north)
+    le, ln, _ = frame.geodetic_to_enu(legacy_lat, legacy_lon, np.zeros_like(legacy_lat))
+    legacy_err = np.hypot(le - east, ln - north)
+    report = {
+        'points': int(len(err)),
+        'max_error_m': float(err.max()) if len(err) else 0.0,
+        'rms_error_m': float(np.sqrt(np.mean(err ** 2))) if len(err) else 0.0,
+        'legacy_max_error_m': float(legacy_err.max()) if len(err) else 0.0,
+        'legacy_rms_error_m': float(np.sqrt(np.mean(legacy_err ** 2))) if len(err) else 0.0,
+    }
+    if path is not None:
+        path_err = path_deviation(e, n, *path)
+        report['path_max_error_m'] = float(path_err.max()) if len(path_err) else 0.0
+        report['path_rms_error_m'] = float(np.sqrt(np.mean(path_err ** 2))) if len(path_err) else 0.0
+    return report
+
+
+def format_report(report):
+    text = f"航点 {report['points']} 个 | "
+    if 'path_max_error_m' in report:
+        text += (f"直线航段偏离形状 最大 {report['path_max_error_m'] * 100:.2f} cm, "
+                 f"RMS {report['path_rms_error_m'] * 100:.2f} cm | ")
+    return text + (f"换算往返误差 最大 {report['max_error_m'] * 1000:.3f} mm | "
+                   f"旧近似换算 最大 {report['legacy_max_error_m'] * 100:.2f} cm, "
+                   f"RMS {report['legacy_rms_error_m'] * 100:.2f} cm")
+
+
+def to_mission_items(lat, lon, alt, speed=2.0, is_fly_through=True, loiter_time=float('nan'),
+                     camera_photo_interval=1.0, acceptance_radius=0.0, yaw=0.0):
+    """
+    经纬高数组 -> MissionItem 列表
+
+    speed / loiter_time / yaw 可为标量或与航点等长的数组。
+    兼容带/不带 vehicle_action 参数的不同 mavsdk 版本
+    """
+    from mavsdk import mission
+
+    n = len(lat)
+    speed = np.broadcast_to(np.asarray(speed, dtype=float), (n,)).tolist()
+    loiter_time = np.broadcast_to(np.asarray(loiter_time, dtype=float), (n,)).tolist()
+    yaw = np.broadcast_to(np.asarray(yaw, dtype=float), (n,)).tolist()
+    item_cls = mission.MissionItem
+    tail = (item_cls.VehicleAction.NONE,) if hasattr(item_cls, 'VehicleAction') else ()
+    camera_none = item_cls.CameraAction.NONE
+    return [
+        item_cls(la, lo, al, sp, is_fly_through, float('nan'), float('nan'), camera_none,
+                 lt, camera_photo_interval, acceptance_radius, yw, 0, *tail)
+        for la, lo, al, sp, lt, yw in zip(np.asarray(lat).tolist(), np.asarray(lon).tolist(),
+                                           np.asarray(alt).tolist(), speed, loiter_time, yaw)
+    ]